@@ -78,13 +78,139 @@ WSGI_APPLICATION = 'app.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/2.1/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+# PostgreSQL when DB_HOST is set (see docker-compose.yml), SQLite otherwise.
+# Connections are kept for DB_CONN_MAX_AGE seconds and, with health checks
+# on, tested with SELECT 1 before their first use in each request. With
+# DB_POOL_MAX_SIZE > 0 every request instead takes a connection from an
+# in-process pool of that size, waiting up to DB_POOL_TIMEOUT seconds for
+# one to free up (see core.db.postgresql).
+if os.environ.get('DB_HOST'):
+    POSTGRES = {
+        'ENGINE': 'core.db.postgresql',
+        'HOST': os.environ['DB_HOST'],
+        'PORT': os.environ.get('DB_PORT', ''),
+        'NAME': os.environ.get('DB_NAME', 'app'),
+        'USER': os.environ.get('DB_USER', 'postgres'),
+        'PASSWORD': os.environ.get('DB_PASS', ''),
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': os.environ.get(
+            'DB_CONN_HEALTH_CHECKS', '1'
+        ) == '1',
+        'POOL': {
+            'MAX_SIZE': int(os.environ.get('DB_POOL_MAX_SIZE', 0)),
+            'TIMEOUT': float(os.environ.get('DB_POOL_TIMEOUT', 5)),
+        },
     }
+    if POSTGRES['POOL']['MAX_SIZE']:
+        # Pooled connections go back to the pool after every request
+        POSTGRES['CONN_MAX_AGE'] = 0
+    DATABASES = {'default': POSTGRES}
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        }
+    }
+
+# Read replicas as comma separated "host=weight" entries, or SQLite file
+# names next to db.sqlite3 without DB_HOST. Safe-method API requests read
+# from a replica picked by weight (see core.db.replicas), unless the user
+# wrote within DATABASE_REPLICA_PIN_SECONDS, which should exceed the
+# replication lag. A replica failing to connect is skipped for
+# DATABASE_REPLICA_RETRY_SECONDS and reads fall back to the primary.
+DATABASE_REPLICAS = {}
+for number, replica in enumerate(filter(None, os.environ.get(
+        'DB_REPLICA_HOSTS', '').split(',')), 1):
+    host, _, weight = replica.strip().partition('=')
+    alias = f'replica{number}'
+    if os.environ.get('DB_HOST'):
+        DATABASES[alias] = dict(POSTGRES, HOST=host)
+    else:
+        DATABASES[alias] = dict(
+            DATABASES['default'], NAME=os.path.join(BASE_DIR, host)
+        )
+    # Tests run against the primary's test database
+    DATABASES[alias]['TEST'] = {'MIRROR': 'default'}
+    DATABASE_REPLICAS[alias] = int(weight or 1)
+
+DATABASE_ROUTERS = ['core.db.replicas.ReplicaRouter']
+DATABASE_REPLICA_PIN_SECONDS = 5
+DATABASE_REPLICA_RETRY_SECONDS = 30
+# Alias of the cache holding the pins; use a shared backend when running
+# several app servers, or a user's next read may hit a lagging replica.
+DATABASE_REPLICA_CACHE_ALIAS = 'default'
+
+
+# Cache
+# https://docs.djangoproject.com/en/2.1/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
 }
 
+# Alias of the cache holding recipe API list responses and the names
+# versions that keep ?prefix= autocomplete indexes current; point it at a
+# shared backend (memcached, redis) when running several app servers.
+# Otherwise other processes only see changes once their entries expire.
+RECIPE_CACHE_ALIAS = 'default'
+RECIPE_CACHE_TIMEOUT = 300
+
+# Token to user lookups of user.authentication.CachedTokenAuthentication
+# are only cached in a backend shared by every app process (memcached,
+# redis), as deleted tokens and deactivated users are invalidated there.
+# Unset, tokens are looked up on every request; per-process backends such
+# as LocMemCache are rejected by the user.E001 check.
+AUTH_TOKEN_CACHE_ALIAS = os.environ.get('AUTH_TOKEN_CACHE_ALIAS') or None
+AUTH_TOKEN_CACHE_TIMEOUT = 60
+
+# Preferred password hasher, 'pbkdf2', 'argon2' (needs argon2-cffi) or
+# 'bcrypt' (needs bcrypt), and its costs. Hashes made by another hasher
+# or with other costs are replaced on the user's next login.
+PASSWORD_HASHER = os.environ.get('PASSWORD_HASHER', 'pbkdf2')
+PASSWORD_PBKDF2_ITERATIONS = int(
+    os.environ.get('PASSWORD_PBKDF2_ITERATIONS', 120000)
+)
+PASSWORD_ARGON2_TIME_COST = int(os.environ.get('PASSWORD_ARGON2_TIME_COST', 2))
+PASSWORD_ARGON2_MEMORY_COST = int(
+    os.environ.get('PASSWORD_ARGON2_MEMORY_COST', 512)
+)
+PASSWORD_ARGON2_PARALLELISM = int(
+    os.environ.get('PASSWORD_ARGON2_PARALLELISM', 2)
+)
+PASSWORD_BCRYPT_ROUNDS = int(os.environ.get('PASSWORD_BCRYPT_ROUNDS', 12))
+
+TUNED_PASSWORD_HASHERS = {
+    'pbkdf2': 'user.hashers.PBKDF2PasswordHasher',
+    'argon2': 'user.hashers.Argon2PasswordHasher',
+    'bcrypt': 'user.hashers.BCryptSHA256PasswordHasher',
+}
+PASSWORD_HASHERS = [TUNED_PASSWORD_HASHERS[PASSWORD_HASHER]] + [
+    hasher for name, hasher in TUNED_PASSWORD_HASHERS.items()
+    if name != PASSWORD_HASHER
+] + ['django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher']
+
+# Logins hash passwords on a 'thread' or 'process' pool of
+# PASSWORD_VERIFY_WORKERS workers ('inline' hashes in the request thread).
+# PASSWORD_VERIFY_MAX_QUEUE more logins may wait for a worker; the rest
+# wait up to PASSWORD_VERIFY_TIMEOUT seconds for a place. Token logins
+# then get a 503, other logins (admin, Client.login) hash in their own
+# thread (see user.backends).
+AUTHENTICATION_BACKENDS = ['user.backends.PooledModelBackend']
+PASSWORD_VERIFY_POOL = os.environ.get('PASSWORD_VERIFY_POOL', 'thread')
+PASSWORD_VERIFY_WORKERS = int(
+    os.environ.get('PASSWORD_VERIFY_WORKERS', os.cpu_count() or 1)
+)
+PASSWORD_VERIFY_MAX_QUEUE = int(
+    os.environ.get('PASSWORD_VERIFY_MAX_QUEUE', 32)
+)
+PASSWORD_VERIFY_TIMEOUT = float(os.environ.get('PASSWORD_VERIFY_TIMEOUT', 1))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.1/ref/settings/#auth-password-validators
@@ -128,4 +254,59 @@ MEDIA_URL = '/media/'
 MEDIA_ROOT = '/vol/web/media'
 STATIC_ROOT = '/vol/web/static'
 
+# How core.media.serve_media delivers files under MEDIA_URL: 'django'
+# streams them with FileResponse (sendfile through wsgi.file_wrapper),
+# 'accel' hands them to nginx with X-Accel-Redirect to
+# MEDIA_ACCEL_PREFIX, and 'sendfile' sets X-Sendfile for Apache/lighttpd.
+MEDIA_SERVE_MODE = os.environ.get('MEDIA_SERVE_MODE', 'django')
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+MEDIA_MAX_AGE = 60 * 60
+MEDIA_IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+# Resized recipe image variants are built by a pool of worker threads
+# after the upload commits; 'sync' builds them inside the request.
+RECIPE_IMAGE_PROCESSING = 'thread'
+RECIPE_IMAGE_WORKERS = 2
+
+# Limits checked by recipe.uploads.ImageUploadHandler while an image
+# upload streams in, before the image is decoded.
+RECIPE_IMAGE_MAX_BYTES = 20 * 1024 * 1024
+RECIPE_IMAGE_MAX_PIXELS = 50 * 1000 * 1000
+
+# Users whose tag or ingredient names each process keeps in memory for
+# ?prefix= autocomplete (see recipe.autocomplete)
+RECIPE_AUTOCOMPLETE_MAX_INDEXES = 1000
+# Seconds after which an index is rebuilt from the database even if no
+# change was recorded in the (possibly per process) cache
+RECIPE_AUTOCOMPLETE_MAX_AGE = 60
+
+# List endpoints render rows from values() instead of model instances
+# when their serializers allow it (see recipe.rows); False runs every
+# list through the serializers.
+RECIPE_FAST_LIST_READS = True
+
+# Recipes read and encoded per chunk of a streamed export
+RECIPE_EXPORT_CHUNK_SIZE = 500
+
+# Largest list accepted by the bulk endpoints of recipe.bulk
+RECIPE_BULK_MAX_ITEMS = 1000
+
 AUTH_USER_MODEL = 'core.User'
+
+
+# Django REST framework
+# https://www.django-rest-framework.org/api-guide/settings/
+
+# Encoder of core.renderers.FastJSONRenderer: 'orjson' uses orjson when
+# it is installed and falls back to the standard library json otherwise,
+# 'json' always uses the standard library.
+API_JSON_ENCODER = os.environ.get('API_JSON_ENCODER', 'orjson')
+
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': (
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PAGINATION_CLASS': 'recipe.pagination.KeysetCursorPagination',
+    'PAGE_SIZE': 50,
+}
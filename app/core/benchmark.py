@@ -0,0 +1,100 @@
+import contextlib
+import itertools
+import random
+import time
+
+from core.models import Tag, Ingredient, Recipe
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+# Rows built in memory per bulk insert when seeding large tables
+SEED_CHUNK_SIZE = 10000
+
+
+class Rollback(Exception):
+    """Raised to discard everything written inside rolled_back()"""
+
+
+@contextlib.contextmanager
+def rolled_back():
+    """Run a block in a transaction that is always rolled back"""
+    try:
+        with transaction.atomic():
+            yield
+            raise Rollback()
+    except Rollback:
+        pass
+
+
+@contextlib.contextmanager
+def timed(results, label):
+    """Append the wall clock seconds spent in the block to results"""
+    start = time.perf_counter()
+    yield
+    results.append((label, time.perf_counter() - start))
+
+
+def seed_user_data(email='bench@test.com', recipes=1000, tags=100,
+                   ingredients=200, per_recipe=3):
+    """Create a user owning a large set of related recipe objects"""
+    user = get_user_model().objects.create_user(email, 'benchPassword')
+
+    Tag.objects.bulk_create(
+        (Tag(user=user, name=f'tag{i}') for i in range(tags))
+    )
+    Ingredient.objects.bulk_create(
+        (Ingredient(user=user, name=f'ingredient{i}')
+         for i in range(ingredients))
+    )
+    new_recipes = (
+        Recipe(user=user, title=f'recipe{i}', time_minutes=i % 240 + 1,
+               price=i % 100 + 0.99)
+        for i in range(recipes)
+    )
+    while True:
+        chunk = list(itertools.islice(new_recipes, SEED_CHUNK_SIZE))
+        if not chunk:
+            break
+        Recipe.objects.bulk_create(chunk)
+    if not per_recipe:
+        return user
+
+    tag_ids = list(Tag.objects.filter(user=user).values_list('id', flat=True))
+    ingredient_ids = list(
+        Ingredient.objects.filter(user=user).values_list('id', flat=True)
+    )
+    recipe_ids = list(
+        Recipe.objects.filter(user=user).values_list('id', flat=True)
+    )
+
+    rand = random.Random(0)
+    tag_rows = []
+    ingredient_rows = []
+    for recipe_id in recipe_ids:
+        for tag_id in rand.sample(tag_ids, min(per_recipe, len(tag_ids))):
+            tag_rows.append(
+                Recipe.tags.through(recipe_id=recipe_id, tag_id=tag_id)
+            )
+        for ingredient_id in rand.sample(
+                ingredient_ids, min(per_recipe, len(ingredient_ids))):
+            ingredient_rows.append(
+                Recipe.ingredients.through(
+                    recipe_id=recipe_id, ingredient_id=ingredient_id
+                )
+            )
+    Recipe.tags.through.objects.bulk_create(tag_rows)
+    Recipe.ingredients.through.objects.bulk_create(ingredient_rows)
+
+    return user
+
+
+def view_queryset(viewset_class, user, params=None, action='list'):
+    """Return the queryset a viewset builds for a GET with params"""
+    request = Request(APIRequestFactory().get('/', params or {}))
+    request.user = user
+    view = viewset_class(
+        request=request, action=action, args=(), kwargs={}, format_kwarg=None
+    )
+    return view.get_queryset()
@@ -0,0 +1,68 @@
+import collections
+import threading
+
+
+class PoolTimeout(Exception):
+    """Raised when no pooled connection frees up in time"""
+
+
+class ConnectionPool:
+    """Thread safe pool of at most max_size open database connections
+
+    get() hands out the most recently returned idle connection, or opens
+    a new one with connect(); when max_size connections are already out
+    it waits up to timeout seconds for one to come back. Idle connections
+    failing check() are closed instead of being handed out.
+    """
+
+    def __init__(self, connect, max_size, timeout, check=None):
+        self.connect = connect
+        self.timeout = timeout
+        self.check = check
+        self.slots = threading.BoundedSemaphore(max_size)
+        self.idle = collections.deque()
+        self.lock = threading.Lock()
+
+    def get(self):
+        """Return an open connection, which must be given back with put()"""
+        if not self.slots.acquire(timeout=self.timeout):
+            raise PoolTimeout(
+                f'No pooled database connection freed up within '
+                f'{self.timeout} seconds'
+            )
+        try:
+            while True:
+                with self.lock:
+                    connection = self.idle.pop() if self.idle else None
+                if connection is None:
+                    return self.connect()
+                if self.check is None or self.check(connection):
+                    return connection
+                self.discard(connection)
+        except BaseException:
+            self.slots.release()
+            raise
+
+    def put(self, connection, reusable=True):
+        """Take back a connection from get(), closing it if not reusable"""
+        try:
+            if reusable and not connection.closed:
+                with self.lock:
+                    self.idle.append(connection)
+            else:
+                self.discard(connection)
+        finally:
+            self.slots.release()
+
+    def discard(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def close(self):
+        """Close every idle connection"""
+        with self.lock:
+            idle, self.idle = self.idle, collections.deque()
+        for connection in idle:
+            self.discard(connection)
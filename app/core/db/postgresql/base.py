@@ -0,0 +1,116 @@
+import threading
+
+from core.db.pool import ConnectionPool, PoolTimeout
+from django.db.backends.postgresql import base
+
+Database = base.Database
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, settings_dict, connect, check):
+    """Return the connection pool of a database alias, creating it once"""
+    with _pools_lock:
+        pool = _pools.get(alias)
+        if pool is None:
+            options = settings_dict['POOL']
+            pool = _pools[alias] = ConnectionPool(
+                connect, options['MAX_SIZE'], options.get('TIMEOUT'), check
+            )
+        return pool
+
+
+def close_pool(alias):
+    """Close the idle connections of an alias and forget its pool"""
+    with _pools_lock:
+        pool = _pools.pop(alias, None)
+    if pool is not None:
+        pool.close()
+
+
+def is_usable(connection):
+    """Check a psycopg2 connection still answers a query"""
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+    except Database.Error:
+        return False
+    return True
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL backend with connection health checks and pooling
+
+    With CONN_HEALTH_CHECKS a connection kept from a previous request is
+    tested with SELECT 1 before its first use in the next one, so a
+    connection dropped by the server or a proxy is replaced instead of
+    failing the request. With POOL['MAX_SIZE'] connections are closed
+    into an in-process pool shared by every thread, which waits up to
+    POOL['TIMEOUT'] seconds for a free connection once MAX_SIZE are out.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.health_check_done = False
+
+    @property
+    def pooled(self):
+        return bool(self.settings_dict.get('POOL', {}).get('MAX_SIZE'))
+
+    def get_new_connection(self, conn_params):
+        if not self.pooled:
+            return super().get_new_connection(conn_params)
+
+        pool = get_pool(
+            self.alias, self.settings_dict,
+            lambda: Database.connect(**conn_params),
+            is_usable if self.settings_dict.get('CONN_HEALTH_CHECKS')
+            else None,
+        )
+        try:
+            connection = pool.get()
+        except PoolTimeout as exc:
+            raise Database.OperationalError(str(exc))
+
+        options = self.settings_dict['OPTIONS']
+        self.isolation_level = options.get(
+            'isolation_level', connection.isolation_level
+        )
+        if self.isolation_level != connection.isolation_level:
+            connection.set_session(isolation_level=self.isolation_level)
+
+        return connection
+
+    def connect(self):
+        super().connect()
+        self.health_check_done = True
+
+    def _close(self):
+        if not self.pooled or self.connection is None:
+            return super()._close()
+
+        connection = self.connection
+        reusable = not self.errors_occurred or is_usable(connection)
+        if reusable:
+            try:
+                connection.rollback()
+                connection.autocommit = False
+            except Database.Error:
+                reusable = False
+        get_pool(self.alias, self.settings_dict, None, None).put(
+            connection, reusable
+        )
+
+    def close_if_unusable_or_obsolete(self):
+        super().close_if_unusable_or_obsolete()
+        self.health_check_done = False
+
+    def ensure_connection(self):
+        if self.connection is not None and not self.health_check_done \
+                and self.settings_dict.get('CONN_HEALTH_CHECKS') \
+                and not self.in_atomic_block:
+            if not is_usable(self.connection):
+                self.close()
+            self.health_check_done = True
+        super().ensure_connection()
@@ -0,0 +1,115 @@
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from rest_framework import status
+from rest_framework.permissions import SAFE_METHODS
+
+PIN_KEY = 'replica-pin:{user_id}'
+
+_state = threading.local()
+# Aliases of replicas that failed to connect, until when to skip them
+_down = {}
+
+
+def choose_replica():
+    """Return a replica alias picked by weight, or None for the primary
+
+    The chosen replica is connected right away, so one that is down is
+    noticed here, skipped for DATABASE_REPLICA_RETRY_SECONDS and another
+    one tried instead.
+    """
+    now = time.monotonic()
+    candidates = {
+        alias: weight
+        for alias, weight in settings.DATABASE_REPLICAS.items()
+        if weight > 0 and _down.get(alias, 0) <= now
+    }
+    while candidates:
+        alias = random.choices(
+            list(candidates), weights=list(candidates.values())
+        )[0]
+        try:
+            connections[alias].ensure_connection()
+        except DatabaseError:
+            _down[alias] = now + settings.DATABASE_REPLICA_RETRY_SECONDS
+            del candidates[alias]
+        else:
+            return alias
+
+    return None
+
+
+def get_pin_cache():
+    """Return the cache backend holding read-your-writes pins"""
+    return caches[settings.DATABASE_REPLICA_CACHE_ALIAS]
+
+
+def pin_to_primary(user_id):
+    """Send the reads of a user to the primary for the pin window"""
+    get_pin_cache().set(
+        PIN_KEY.format(user_id=user_id), True,
+        settings.DATABASE_REPLICA_PIN_SECONDS
+    )
+
+
+def is_pinned(user_id):
+    """Check if a user wrote recently enough to read from the primary"""
+    return bool(get_pin_cache().get(PIN_KEY.format(user_id=user_id)))
+
+
+class ReplicaRouter:
+    """Route reads to the replica chosen for the current request
+
+    Objects read from a replica are written to the primary. Everything
+    else is left to Django's defaults, so reads outside ReplicaReadMixin
+    requests and explicit using() calls are not redirected.
+    """
+
+    def db_for_read(self, model, **hints):
+        return getattr(_state, 'alias', None)
+
+    def db_for_write(self, model, **hints):
+        instance = hints.get('instance')
+        if instance is not None \
+                and instance._state.db in settings.DATABASE_REPLICAS:
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+
+class ReplicaReadMixin:
+    """Serve safe-method requests from a read replica
+
+    The replica is only chosen once the request is authenticated, so
+    token lookups see freshly created tokens on the primary. Successful
+    writes pin the user to the primary (see pin_to_primary), so their
+    next reads see what they just wrote despite the replication lag.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and settings.DATABASE_REPLICAS \
+                and not is_pinned(request.user.pk):
+            _state.alias = choose_replica()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if request.method not in SAFE_METHODS \
+                and status.is_success(response.status_code) \
+                and request.user.is_authenticated:
+            pin_to_primary(request.user.pk)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            _state.alias = None
@@ -0,0 +1,101 @@
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core.db.postgresql import base
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.signals import connection_created
+
+
+class Command(BaseCommand):
+    """Django command to measure per request database connection overhead"""
+    help = 'Time requests opening, keeping, checking and pooling connections'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=4)
+        parser.add_argument('--pool-size', type=int, default=4)
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def request(self, alias):
+        """Return the seconds a request running one query takes"""
+        start = time.perf_counter()
+        request_started.send(sender=self.__class__)
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute('SELECT 1')
+                cursor.fetchone()
+        finally:
+            request_finished.send(sender=self.__class__)
+        return time.perf_counter() - start
+
+    def client(self, alias, count):
+        """Return the latencies of count requests made by one thread"""
+        try:
+            return [self.request(alias) for _ in range(count)]
+        finally:
+            connections[alias].close()
+
+    def handle(self, *args, **options):
+        alias = options['database']
+        concurrency = options['concurrency']
+        per_client = max(options['requests'] // concurrency, 1)
+        modes = [
+            ('per request', {'CONN_MAX_AGE': 0}),
+            ('persistent', {'CONN_MAX_AGE': None}),
+        ]
+        if hasattr(connections[alias], 'pooled'):
+            modes += [
+                ('health checked', {
+                    'CONN_MAX_AGE': None, 'CONN_HEALTH_CHECKS': True,
+                }),
+                ('pooled', {
+                    'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': True,
+                    'POOL': {'MAX_SIZE': options['pool_size'],
+                             'TIMEOUT': None},
+                }),
+            ]
+
+        opened = []
+        lock = threading.Lock()
+
+        def count(sender, connection, **kwargs):
+            if connection.alias == alias:
+                with lock:
+                    opened.append(connection)
+
+        settings_dict = connections.databases[alias]
+        saved = dict(settings_dict)
+        connections[alias].close()
+        connection_created.connect(count)
+        try:
+            for label, overrides in modes:
+                settings_dict.update(overrides)
+                del opened[:]
+                # Worker threads get their own connection to this alias
+                with ThreadPoolExecutor(concurrency) as clients:
+                    runs = clients.map(
+                        self.client, [alias] * concurrency,
+                        [per_client] * concurrency,
+                    )
+                    latencies = sorted(t for run in runs for t in run)
+                base.close_pool(alias)
+                settings_dict.clear()
+                settings_dict.update(saved)
+
+                p99 = latencies[min(int(len(latencies) * 0.99),
+                                    len(latencies) - 1)]
+                self.stdout.write(
+                    f'{label}: p50 '
+                    f'{statistics.median(latencies) * 1000:.2f} ms, '
+                    f'p99 {p99 * 1000:.2f} ms, '
+                    f'{len(opened)} connections for '
+                    f'{len(latencies)} requests'
+                )
+        finally:
+            connection_created.disconnect(count)
+            settings_dict.clear()
+            settings_dict.update(saved)
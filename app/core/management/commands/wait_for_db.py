@@ -1,23 +1,87 @@
+import random
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 from django.db import connections
 from django.db.utils import OperationalError
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 
 
 class Command(BaseCommand):
     """Django commnad to pause execution unitl database is available"""
+    help = 'Wait until every configured database answers a query'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--timeout', type=float, default=60,
+            help='Seconds to wait before giving up with a non-zero exit'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=0.1,
+            help='Longest first delay between attempts, doubled after '
+                 'every failed attempt'
+        )
+        parser.add_argument(
+            '--max-interval', type=float, default=5,
+            help='Longest delay between attempts'
+        )
+
+    def probe(self, alias):
+        """Open a new connection to a database and run SELECT 1"""
+        connection = connections[alias]
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+                cursor.fetchone()
+        finally:
+            connection.close()
+
+    def wait(self, alias, deadline, interval, max_interval):
+        """Probe a database until it answers or the deadline passes
+
+        Attempts back off exponentially with full jitter, so containers
+        started together do not retry in lockstep. Returns the seconds
+        waited, or raises the last error once the deadline has passed.
+        """
+        start = time.monotonic()
+        attempt = 0
+        while True:
+            try:
+                self.probe(alias)
+                return time.monotonic() - start
+            except OperationalError:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise
+            delay = random.uniform(0, min(max_interval,
+                                          interval * 2 ** attempt))
+            time.sleep(min(delay, remaining))
+            attempt += 1
 
     def handle(self, *args, **options):
         self.stdout.write('Waiting for database....')
-        db_conn = None
-        while not db_conn:
+        aliases = list(connections)
+        deadline = time.monotonic() + options['timeout']
+        # Connections are per thread, so every alias gets its own probe
+        with ThreadPoolExecutor(len(aliases)) as pool:
+            waits = {
+                alias: pool.submit(
+                    self.wait, alias, deadline, options['interval'],
+                    options['max_interval']
+                )
+                for alias in aliases
+            }
+
+        for alias, waited in waits.items():
             try:
-                db_conn = connections['default']
-            except OperationalError:
-                self.stdout.write(
-                    'Database unavailable, waiting for 1second....'
+                seconds = waited.result()
+            except OperationalError as exc:
+                raise CommandError(
+                    f'Database {alias} unavailable after '
+                    f'{options["timeout"]:g} seconds: {exc}'
                 )
-                time.sleep(1)
+            self.stdout.write(
+                f'Database {alias} answered after {seconds:.2f} seconds'
+            )
 
         self.stdout.write(self.style.SUCCESS('Database Available'))
@@ -0,0 +1,175 @@
+import mimetypes
+import os
+import re
+import stat
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+# Uploads named after a SHA-256 of their content never change.
+CONTENT_HASH = re.compile(r'(^|/)[0-9a-f]{64}(_\w+)?\.\w+$')
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class FileRange:
+    """File object that reads only the bytes of a requested range
+
+    It has no fileno() on purpose: servers sending files by descriptor
+    (wsgi.file_wrapper with sendfile) would send from the range's start
+    to the end of the file, so partial responses are served with read()
+    and only whole files can go out through sendfile.
+    """
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def cache_control(path):
+    """Return the Cache-Control header value for a media path"""
+    if CONTENT_HASH.search(path):
+        return (
+            f'public, max-age={settings.MEDIA_IMMUTABLE_MAX_AGE}, immutable'
+        )
+
+    return f'public, max-age={settings.MEDIA_MAX_AGE}'
+
+
+def parse_range(header, size):
+    """Return the (start, end) of a single byte range header
+
+    Returns None when the header should be ignored and the whole file sent,
+    and raises ValueError when the range can not be satisfied.
+    """
+    match = RANGE.match(header.replace(' ', ''))
+    if not match:
+        return None
+
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        length = min(int(last), size)
+        if not length:
+            raise ValueError(header)
+        return size - length, size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        raise ValueError(header)
+
+    return start, end
+
+
+def if_range_matches(request, etag, last_modified):
+    """Return whether a Range request still applies to this version"""
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith('W/'):
+        return if_range == etag
+
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def guess_type(path):
+    """Return the content type and encoding of a file from its name"""
+    content_type, encoding = mimetypes.guess_type(path)
+
+    return content_type or 'application/octet-stream', encoding
+
+
+def file_response(request, full_path, size, etag, last_modified):
+    """Return the whole file or the byte range the request asked for"""
+    content_type, encoding = guess_type(full_path)
+
+    byte_range = None
+    header = request.META.get('HTTP_RANGE')
+    if header and if_range_matches(request, etag, last_modified):
+        try:
+            byte_range = parse_range(header, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    file = open(full_path, 'rb')
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type)
+    else:
+        start, end = byte_range
+        response = FileResponse(
+            FileRange(file, start, end - start + 1),
+            status=206,
+            content_type=content_type,
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = (
+        size if byte_range is None else byte_range[1] - byte_range[0] + 1
+    )
+    response['Accept-Ranges'] = 'bytes'
+    if encoding:
+        response['Content-Encoding'] = encoding
+
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    """Serve an uploaded file with validators, byte ranges and caching
+
+    Depending on MEDIA_SERVE_MODE the file is handed off to the front web
+    server or streamed from disk, so image traffic does not keep
+    application workers busy.
+    """
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        stat_result = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404('Media file not found')
+    if not stat.S_ISREG(stat_result.st_mode):
+        raise Http404('Media file not found')
+
+    mode = settings.MEDIA_SERVE_MODE
+    if mode in ('accel', 'sendfile'):
+        response = HttpResponse(content_type=guess_type(full_path)[0])
+        if mode == 'accel':
+            response['X-Accel-Redirect'] = quote(
+                settings.MEDIA_ACCEL_PREFIX + path
+            )
+        else:
+            response['X-Sendfile'] = full_path
+        response['Cache-Control'] = cache_control(path)
+        return response
+
+    size = stat_result.st_size
+    last_modified = int(stat_result.st_mtime)
+    etag = f'"{last_modified:x}-{size:x}"'
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        response = file_response(request, full_path, size, etag, last_modified)
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = cache_control(path)
+    return response
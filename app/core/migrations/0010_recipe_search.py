@@ -0,0 +1,63 @@
+from django.db import migrations
+
+POSTGRESQL_FORWARD = [
+    'CREATE TABLE core_recipe_search ('
+    ' recipe_id integer PRIMARY KEY'
+    ' REFERENCES core_recipe (id) ON DELETE CASCADE,'
+    ' document tsvector NOT NULL)',
+    'CREATE INDEX core_recipe_search_document_idx '
+    'ON core_recipe_search USING GIN (document)',
+    "INSERT INTO core_recipe_search (recipe_id, document) "
+    "SELECT r.id,"
+    " setweight(to_tsvector('english', r.title), 'A') ||"
+    " setweight(to_tsvector('english', coalesce((SELECT string_agg(t.name, ' ')"
+    "  FROM core_recipe_tags rt JOIN core_tag t ON t.id = rt.tag_id"
+    "  WHERE rt.recipe_id = r.id), '')), 'B') ||"
+    " setweight(to_tsvector('english', coalesce((SELECT string_agg(i.name, ' ')"
+    "  FROM core_recipe_ingredients ri"
+    "  JOIN core_ingredient i ON i.id = ri.ingredient_id"
+    "  WHERE ri.recipe_id = r.id), '')), 'B') "
+    "FROM core_recipe r",
+]
+
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE core_recipe_search USING fts5("
+    "title, tags, ingredients, tokenize='porter unicode61')",
+    "INSERT INTO core_recipe_search (rowid, title, tags, ingredients) "
+    "SELECT r.id, r.title,"
+    " coalesce((SELECT group_concat(t.name, ' ')"
+    "  FROM core_recipe_tags rt JOIN core_tag t ON t.id = rt.tag_id"
+    "  WHERE rt.recipe_id = r.id), ''),"
+    " coalesce((SELECT group_concat(i.name, ' ')"
+    "  FROM core_recipe_ingredients ri"
+    "  JOIN core_ingredient i ON i.id = ri.ingredient_id"
+    "  WHERE ri.recipe_id = r.id), '') "
+    "FROM core_recipe r",
+]
+
+FORWARD = {
+    'postgresql': POSTGRESQL_FORWARD,
+    'sqlite': SQLITE_FORWARD,
+}
+
+
+def create_search_index(apps, schema_editor):
+    """Create and fill the recipe search table of the database vendor"""
+    for sql in FORWARD.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in FORWARD:
+        schema_editor.execute('DROP TABLE core_recipe_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_recipe_image_storage'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations
+
+# Matches the UPPER("name"::text) LIKE UPPER(%s) || '%' that Django emits
+# for name__istartswith on PostgreSQL.
+POSTGRESQL_INDEXES = {
+    'core_tag_user_name_prefix_idx': 'core_tag',
+    'core_ingredient_user_name_prefix_idx': 'core_ingredient',
+}
+
+
+def create_prefix_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, table in POSTGRESQL_INDEXES.items():
+        schema_editor.execute(
+            f'CREATE INDEX {name} ON {table} '
+            f'(user_id, UPPER(name::text) text_pattern_ops)'
+        )
+
+
+def drop_prefix_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in POSTGRESQL_INDEXES:
+        schema_editor.execute(f'DROP INDEX {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_recipe_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_prefix_indexes, drop_prefix_indexes),
+    ]
@@ -1,42 +1,81 @@
+import hashlib
 import os
 import uuid
 
 from django.conf import settings
+from core.storage import ContentAddressedStorage
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, \
     PermissionsMixin
 from django.db import models
 
+RECIPE_IMAGE_DIR = 'uploads/recipe/'
+
 
 # Create your models here.
+def file_sha256(content):
+    """Return the SHA-256 hex digest of a file's content
+
+    Uploads streamed through the recipe image upload handler carry the
+    digest computed while they were received, so they are not read again.
+    """
+    digest = getattr(content, 'content_hash', None)
+    if digest:
+        return digest
+
+    sha256 = hashlib.sha256()
+    for chunk in content.chunks():
+        sha256.update(chunk)
+    content.seek(0)
+
+    return sha256.hexdigest()
+
+
+def content_image_path(digest, ext):
+    """Return the storage name of the recipe image with the given digest"""
+    return os.path.join(RECIPE_IMAGE_DIR, digest[:2], f'{digest}.{ext}')
+
+
 def recipe_image_file_path(instance, filename):
-    """Generate file path for new recipe image"""
-    ext = filename.split('.')[-1]
+    """Generate file path for new recipe image
+
+    The name is the SHA-256 of the image being saved, so identical images
+    share one file and a URL always refers to the same bytes. A random
+    name is used when the content is not available.
+    """
+    ext = filename.split('.')[-1].lower()
+    image = instance.image if instance is not None else None
+    if image and not image._committed and image._file is not None:
+        return content_image_path(file_sha256(image._file), ext)
+
     filename = f'{uuid.uuid4()}.{ext}'
 
-    return os.path.join('uploads/recipe/', filename)
+    return os.path.join(RECIPE_IMAGE_DIR, filename)
 
 
 class UserManager(BaseUserManager):
 
-    def create_user(self, email, password=None, **extra_fields):
-        """Create and saves a new user"""
+    def make_user(self, email, password=None, **extra_fields):
+        """Return a new unsaved user with a hashed password"""
         if not email:
             raise ValueError('User must have an email Address')
         user = self.model(email=self.normalize_email(email), **extra_fields)
         user.set_password(password)
-        user.save(using=self._db)
 
         return user
 
-    def create_superuser(self, email, password):
-        """Create a new Super User"""
-        user = self.create_user(email, password)
-        user.is_staff = True
-        user.is_superuser = True
+    def create_user(self, email, password=None, **extra_fields):
+        """Create and saves a new user"""
+        user = self.make_user(email, password, **extra_fields)
         user.save(using=self._db)
 
         return user
 
+    def create_superuser(self, email, password):
+        """Create a new Super User"""
+        return self.create_user(
+            email, password, is_staff=True, is_superuser=True
+        )
+
 
 class User(AbstractBaseUser, PermissionsMixin):
     """Custom User model that supports using email instead of name"""
@@ -57,6 +96,15 @@ class Tag(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
     )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['user', '-name', 'id'],
+                name='core_tag_user_name_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -69,6 +117,15 @@ class Ingredient(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
     )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['user', '-name', 'id'],
+                name='core_ingredient_user_name_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -86,7 +143,29 @@ class Recipe(models.Model):
     link = models.CharField(max_length=255, blank=True)
     ingredients = models.ManyToManyField('Ingredient')
     tags = models.ManyToManyField('Tag')
-    image = models.ImageField(null=True, upload_to=recipe_image_file_path)
+    image = models.ImageField(
+        null=True,
+        upload_to=recipe_image_file_path,
+        storage=ContentAddressedStorage(),
+    )
+    image_variants_ready = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['user', '-id'],
+                name='core_recipe_user_id_idx',
+            ),
+            models.Index(
+                fields=['user', 'time_minutes', 'id'],
+                name='core_recipe_user_time_idx',
+            ),
+            models.Index(
+                fields=['user', 'price', 'id'],
+                name='core_recipe_user_price_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.title
@@ -0,0 +1,39 @@
+from django.conf import settings
+from rest_framework import renderers
+from rest_framework.settings import api_settings
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def use_orjson():
+    """Check if responses are encoded with orjson"""
+    return (
+        orjson is not None and settings.API_JSON_ENCODER == 'orjson'
+        and api_settings.UNICODE_JSON and api_settings.COMPACT_JSON
+    )
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """JSON renderer encoding with orjson when it is installed
+
+    Compact, non-indented output matches DRF's JSONRenderer; everything
+    else, and any setup without orjson, is left to DRF and the standard
+    library json module.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent or not use_orjson():
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=encoders.JSONEncoder().default)
+        # Escaped by DRF as well, as they end lines in JavaScript
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(
+            b'\xe2\x80\xa9', b'\\u2029'
+        )
@@ -0,0 +1,53 @@
+from core.models import Tag, Ingredient, Recipe
+from django.db.models.signals import post_save, pre_delete, m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+
+
+def touch(queryset):
+    """Mark every object in the queryset as updated now"""
+    queryset.update(updated_at=timezone.now())
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def touch_recipe_relations(sender, instance, action, model, pk_set,
+                           **kwargs):
+    """Mark both sides of a changed recipe relation as updated"""
+    source = instance._meta.model_name
+    target = model._meta.model_name
+    if action == 'pre_clear':
+        instance._pks_before_clear = list(sender.objects.filter(
+            **{source: instance.pk}
+        ).values_list(target, flat=True))
+        return
+    if action == 'post_clear':
+        pk_set = instance.__dict__.pop('_pks_before_clear', [])
+    elif action not in ('post_add', 'post_remove'):
+        return
+
+    touch(type(instance).objects.filter(pk=instance.pk))
+    touch(model.objects.filter(pk__in=pk_set))
+
+
+@receiver(post_save, sender=Tag)
+@receiver(pre_delete, sender=Tag)
+def touch_tag_recipes(sender, instance, **kwargs):
+    """Mark recipes as updated when one of their tags changes"""
+    if not kwargs.get('created'):
+        touch(Recipe.objects.filter(tags=instance))
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(pre_delete, sender=Ingredient)
+def touch_ingredient_recipes(sender, instance, **kwargs):
+    """Mark recipes as updated when one of their ingredients changes"""
+    if not kwargs.get('created'):
+        touch(Recipe.objects.filter(ingredients=instance))
+
+
+@receiver(pre_delete, sender=Recipe)
+def touch_recipe_attributes(sender, instance, **kwargs):
+    """Mark the tags and ingredients of a deleted recipe as updated"""
+    touch(Tag.objects.filter(recipe=instance))
+    touch(Ingredient.objects.filter(recipe=instance))
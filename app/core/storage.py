@@ -0,0 +1,38 @@
+import os
+import uuid
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """File storage for files named after a hash of their content
+
+    A file that already exists under the requested name holds the same
+    bytes, so it is reused instead of being written again under a
+    suffixed name. New files are written under a temporary name and
+    renamed into place, so concurrent writers of the same content never
+    collide or expose a partly written file.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def _save(self, name, content):
+        if self.exists(name):
+            return name
+
+        directory, filename = os.path.split(name)
+        temp_name = super()._save(
+            os.path.join(directory, f'.{uuid.uuid4().hex}.{filename}'),
+            content
+        )
+        try:
+            # Replacing a file written meanwhile swaps in identical bytes
+            os.replace(self.path(temp_name), self.path(name))
+        except OSError:
+            self.delete(temp_name)
+            raise
+
+        return name
@@ -1,23 +1,73 @@
+from io import StringIO
 from unittest.mock import patch
 
+from core.management.commands import wait_for_db
 from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.db.utils import OperationalError
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase
 
 
 class CommnadTests(TestCase):
 
     def test_wait_for_db_ready(self):
         """Test waiting for db when db is available"""
-        with patch('django.db.utils.ConnectionHandler.__getitem__') as gi:
-            gi.return_value = True
-            call_command('wait_for_db')
-            self.assertEqual(gi.call_count, 1)
+        out = StringIO()
+        call_command('wait_for_db', stdout=out)
+
+        self.assertIn('Database default answered', out.getvalue())
 
     @patch('time.sleep', return_value=True)
-    def test_wait_for_db(self, ts):
+    @patch.object(wait_for_db.Command, 'probe')
+    def test_wait_for_db(self, probe, ts):
         """Test waiting for db"""
-        with patch('django.db.utils.ConnectionHandler.__getitem__') as gi:
-            gi.side_effect = [OperationalError] * 5 + [True]
-            call_command('wait_for_db')
-            self.assertEqual(gi.call_count, 6)
+        probe.side_effect = [OperationalError] * 5 + [None]
+        call_command('wait_for_db', stdout=StringIO())
+
+        self.assertEqual(probe.call_count, 6)
+
+    @patch('random.uniform', side_effect=lambda low, high: high)
+    @patch('time.sleep', return_value=True)
+    @patch.object(wait_for_db.Command, 'probe')
+    def test_wait_for_db_backoff(self, probe, ts, uniform):
+        """Test the delay between attempts doubles up to max_interval"""
+        probe.side_effect = [OperationalError] * 5 + [None]
+        call_command(
+            'wait_for_db', interval=1, max_interval=5, stdout=StringIO()
+        )
+
+        self.assertEqual(
+            [call[0][0] for call in ts.call_args_list], [1, 2, 4, 5, 5]
+        )
+
+    @patch.object(wait_for_db.Command, 'probe', side_effect=OperationalError)
+    def test_wait_for_db_timeout(self, probe):
+        """Test the command fails once the timeout has passed"""
+        with self.assertRaises(CommandError):
+            call_command('wait_for_db', timeout=0, stdout=StringIO())
+
+    @patch.object(wait_for_db, 'connections', ['default', 'replica1'])
+    @patch.object(wait_for_db.Command, 'probe')
+    def test_wait_for_db_all_aliases(self, probe):
+        """Test every configured database is waited for"""
+        call_command('wait_for_db', stdout=StringIO())
+
+        self.assertEqual(
+            sorted(call[0][0] for call in probe.call_args_list),
+            ['default', 'replica1']
+        )
+
+
+class BenchmarkCommandTests(TransactionTestCase):
+
+    def test_benchmark_db_latency(self):
+        """Test the connection benchmark reports each connection mode"""
+        out = StringIO()
+        call_command(
+            'benchmark_db_latency', requests=4, concurrency=2, stdout=out
+        )
+
+        output = out.getvalue()
+        for label in ('per request:', 'persistent:'):
+            self.assertIn(label, output)
+        self.assertIn('for 4 requests', output)
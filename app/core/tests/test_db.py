@@ -0,0 +1,131 @@
+from unittest.mock import MagicMock, patch
+
+from core.db import pool
+from core.db.postgresql import base
+from django.db import OperationalError
+from django.db.utils import ConnectionHandler
+from django.test import SimpleTestCase
+
+
+def fake_connection():
+    """Return a stand in for an open psycopg2 connection"""
+    connection = MagicMock(closed=0, isolation_level=None)
+    connection.get_parameter_status.return_value = 'UTC'
+    return connection
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    """Test the thread safe pool of database connections"""
+
+    def setUp(self):
+        self.connect = MagicMock(side_effect=lambda: fake_connection())
+        self.pool = pool.ConnectionPool(self.connect, max_size=2, timeout=0)
+
+    def test_connections_reused(self):
+        """Test a returned connection is handed out again"""
+        first = self.pool.get()
+        self.pool.put(first)
+
+        self.assertIs(self.pool.get(), first)
+        self.assertEqual(self.connect.call_count, 1)
+
+    def test_max_size(self):
+        """Test no more than max_size connections are handed out"""
+        first = self.pool.get()
+        self.pool.get()
+
+        with self.assertRaises(pool.PoolTimeout):
+            self.pool.get()
+        self.pool.put(first)
+        self.assertIs(self.pool.get(), first)
+
+    def test_broken_connections_discarded(self):
+        """Test connections returned broken or failing checks are closed"""
+        broken = self.pool.get()
+        self.pool.put(broken, reusable=False)
+        stale = self.pool.get()
+        self.pool.put(stale)
+        self.pool.check = lambda connection: connection is not stale
+
+        fresh = self.pool.get()
+
+        broken.close.assert_called_once_with()
+        stale.close.assert_called_once_with()
+        self.assertIsNot(fresh, stale)
+        self.assertEqual(self.connect.call_count, 3)
+
+
+class PostgresBackendTests(SimpleTestCase):
+    """Test health checks and pooling of core.db.postgresql"""
+
+    def setUp(self):
+        connect = patch.object(
+            base.Database, 'connect',
+            side_effect=lambda **params: fake_connection()
+        )
+        self.connect = connect.start()
+        self.addCleanup(connect.stop)
+        self.addCleanup(base.close_pool, 'pooled')
+
+    def wrapper(self, **settings):
+        handler = ConnectionHandler({
+            'default': {'ENGINE': 'django.db.backends.dummy'},
+            'pooled': dict({
+                'ENGINE': 'core.db.postgresql',
+                'NAME': 'app',
+                'CONN_HEALTH_CHECKS': True,
+            }, **settings),
+        })
+        return handler['pooled']
+
+    def test_pooled_connection_reused(self):
+        """Test closing hands the connection to the next checkout"""
+        db = self.wrapper(POOL={'MAX_SIZE': 1, 'TIMEOUT': 0})
+        db.ensure_connection()
+        connection = db.connection
+        db.close()
+
+        other = self.wrapper(POOL={'MAX_SIZE': 1, 'TIMEOUT': 0})
+        other.ensure_connection()
+
+        self.assertIs(other.connection, connection)
+        connection.close.assert_not_called()
+        connection.rollback.assert_called_once_with()
+        self.assertEqual(self.connect.call_count, 1)
+
+    def test_pool_exhausted(self):
+        """Test a full pool fails as a database error after the timeout"""
+        self.wrapper(POOL={'MAX_SIZE': 1, 'TIMEOUT': 0}).ensure_connection()
+
+        with self.assertRaises(OperationalError):
+            self.wrapper(
+                POOL={'MAX_SIZE': 1, 'TIMEOUT': 0}
+            ).ensure_connection()
+
+    def test_health_check_on_reuse(self):
+        """Test a dead persistent connection is replaced before use"""
+        db = self.wrapper(CONN_MAX_AGE=None)
+        db.ensure_connection()
+        dead = db.connection
+        dead.cursor.return_value.__enter__.return_value.execute.side_effect \
+            = base.Database.OperationalError
+
+        db.close_if_unusable_or_obsolete()
+        db.ensure_connection()
+
+        self.assertIsNot(db.connection, dead)
+        dead.close.assert_called_once_with()
+
+    def test_health_check_once_per_request(self):
+        """Test a live connection is checked only on its first use"""
+        db = self.wrapper(CONN_MAX_AGE=None)
+        db.ensure_connection()
+        live = db.connection
+        live.cursor.reset_mock()
+
+        db.close_if_unusable_or_obsolete()
+        for _ in range(3):
+            db.ensure_connection()
+
+        self.assertIs(db.connection, live)
+        self.assertEqual(live.cursor.call_count, 1)
@@ -0,0 +1,138 @@
+import os
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+from django.utils.http import http_date
+
+CONTENT = bytes(range(256)) * 4
+DIGEST = 'ab' * 32
+
+
+class MediaServingTests(TestCase):
+    """Test serving uploaded media files"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        media = override_settings(
+            MEDIA_ROOT=self.media_root, MEDIA_SERVE_MODE='django'
+        )
+        media.enable()
+        self.addCleanup(media.disable)
+        self.addCleanup(shutil.rmtree, self.media_root)
+
+        self.path = f'uploads/recipe/ab/{DIGEST}.jpg'
+        self.write(self.path)
+
+    def write(self, path):
+        """Store CONTENT under a path relative to MEDIA_ROOT"""
+        full_path = os.path.join(self.media_root, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, 'wb') as media_file:
+            media_file.write(CONTENT)
+
+    def get(self, path=None, **headers):
+        return self.client.get(f'/media/{path or self.path}', **headers)
+
+    def test_serve_whole_file(self):
+        """Test a file is streamed with validators and its type"""
+        res = self.get()
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(b''.join(res.streaming_content), CONTENT)
+        self.assertEqual(res['Content-Type'], 'image/jpeg')
+        self.assertEqual(res['Content-Length'], str(len(CONTENT)))
+        self.assertEqual(res['Accept-Ranges'], 'bytes')
+        self.assertIn('ETag', res)
+        self.assertIn('Last-Modified', res)
+
+    def test_hashed_upload_cached_forever(self):
+        """Test content addressed uploads are marked immutable"""
+        res = self.get()
+
+        self.assertIn('immutable', res['Cache-Control'])
+
+    def test_other_file_cached_briefly(self):
+        """Test files without a content hash get a short lifetime"""
+        self.write('uploads/recipe/legacy.jpg')
+
+        res = self.get('uploads/recipe/legacy.jpg')
+
+        self.assertNotIn('immutable', res['Cache-Control'])
+
+    def test_byte_range(self):
+        """Test a byte range is answered with partial content"""
+        res = self.get(HTTP_RANGE='bytes=10-19')
+
+        self.assertEqual(res.status_code, 206)
+        self.assertEqual(b''.join(res.streaming_content), CONTENT[10:20])
+        self.assertEqual(res['Content-Length'], '10')
+        self.assertEqual(
+            res['Content-Range'], f'bytes 10-19/{len(CONTENT)}'
+        )
+        # No descriptor, or sendfile would send past the range
+        self.assertFalse(hasattr(res.file_to_stream, 'fileno'))
+
+    def test_suffix_byte_range(self):
+        """Test a range of the last bytes of the file"""
+        res = self.get(HTTP_RANGE='bytes=-5')
+
+        self.assertEqual(res.status_code, 206)
+        self.assertEqual(b''.join(res.streaming_content), CONTENT[-5:])
+
+    def test_unsatisfiable_range(self):
+        """Test a range past the end of the file is refused"""
+        res = self.get(HTTP_RANGE=f'bytes={len(CONTENT)}-')
+
+        self.assertEqual(res.status_code, 416)
+        self.assertEqual(res['Content-Range'], f'bytes */{len(CONTENT)}')
+
+    def test_stale_if_range_sends_whole_file(self):
+        """Test a range for another version returns the whole file"""
+        res = self.get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"other"')
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(b''.join(res.streaming_content), CONTENT)
+
+    def test_if_none_match(self):
+        """Test a matching ETag is answered with not modified"""
+        etag = self.get()['ETag']
+
+        res = self.get(HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, 304)
+
+    def test_if_modified_since(self):
+        """Test an unchanged file is answered with not modified"""
+        mtime = os.stat(os.path.join(self.media_root, self.path)).st_mtime
+
+        res = self.get(HTTP_IF_MODIFIED_SINCE=http_date(mtime))
+
+        self.assertEqual(res.status_code, 304)
+
+    def test_missing_file(self):
+        """Test unknown and escaping paths are not found"""
+        self.assertEqual(self.get('uploads/missing.jpg').status_code, 404)
+        self.assertEqual(self.get('uploads/recipe').status_code, 404)
+        self.assertEqual(self.get('../settings.py').status_code, 404)
+
+    @override_settings(MEDIA_SERVE_MODE='accel')
+    def test_accel_redirect(self):
+        """Test files are handed to nginx with X-Accel-Redirect"""
+        res = self.get()
+
+        self.assertEqual(
+            res['X-Accel-Redirect'], f'/protected-media/{self.path}'
+        )
+        self.assertEqual(res.content, b'')
+        self.assertIn('immutable', res['Cache-Control'])
+
+    @override_settings(MEDIA_SERVE_MODE='sendfile')
+    def test_x_sendfile(self):
+        """Test files are handed to the web server with X-Sendfile"""
+        res = self.get()
+
+        self.assertEqual(
+            res['X-Sendfile'], os.path.join(self.media_root, self.path)
+        )
+        self.assertEqual(res.content, b'')
@@ -1,7 +1,9 @@
+import hashlib
 from unittest.mock import patch
 
 from core import models
 from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
 
 
@@ -49,10 +51,11 @@ class ModelTests(TestCase):
         """Test creating new super user"""
         email = "test@test.com"
         password = 'test123'
-        user = get_user_model().objects.create_superuser(
-            email=email,
-            password=password
-        )
+        with self.assertNumQueries(1):
+            user = get_user_model().objects.create_superuser(
+                email=email,
+                password=password
+            )
 
         self.assertTrue(user.is_superuser)
         self.assertTrue(user.is_staff)
@@ -95,3 +98,14 @@ class ModelTests(TestCase):
 
         exp_path = f'uploads/recipe/{uuid}.jpg'
         self.assertEqual(file_path, exp_path)
+
+    def test_recipe_file_name_content_hash(self):
+        """Test that a new image is named after its content hash"""
+        recipe = models.Recipe(title='Soup', time_minutes=5, price=5.00)
+        recipe.image = SimpleUploadedFile('MyImage.JPG', b'image-bytes')
+        digest = hashlib.sha256(b'image-bytes').hexdigest()
+
+        file_path = models.recipe_image_file_path(recipe, 'MyImage.JPG')
+
+        exp_path = f'uploads/recipe/{digest[:2]}/{digest}.jpg'
+        self.assertEqual(file_path, exp_path)
@@ -0,0 +1,63 @@
+import datetime
+import json
+from decimal import Decimal
+from unittest import skipUnless
+from unittest.mock import patch
+
+from core import renderers
+from django.test import SimpleTestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+
+DATA = {
+    'id': 1,
+    'title': 'Cr\u00e8me br\u00fbl\u00e9e\u2028',
+    'price': Decimal('5.50'),
+    'updated_at': datetime.datetime(2020, 1, 2, 3, 4, 5),
+    'tags': [1, 2],
+    'link': None,
+}
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    """Test the JSON renderer with a pluggable encoder"""
+
+    def test_matches_drf_without_orjson(self):
+        """Test the standard library fallback renders like DRF"""
+        with patch.object(renderers, 'orjson', None):
+            body = renderers.FastJSONRenderer().render(DATA)
+
+        self.assertEqual(body, JSONRenderer().render(DATA))
+
+    @skipUnless(renderers.orjson, 'orjson is not installed')
+    def test_matches_drf_with_orjson(self):
+        """Test orjson renders the same bytes as DRF"""
+        self.assertTrue(renderers.use_orjson())
+        self.assertEqual(
+            renderers.FastJSONRenderer().render(DATA),
+            JSONRenderer().render(DATA)
+        )
+
+    def test_orjson_output_escapes_line_separators(self):
+        """Test orjson output escapes what DRF escapes"""
+        encoder = patch.object(renderers, 'orjson')
+        orjson = encoder.start()
+        self.addCleanup(encoder.stop)
+        orjson.dumps.side_effect = lambda data, default: json.dumps(
+            data, default=default, ensure_ascii=False, separators=(',', ':')
+        ).encode()
+
+        body = renderers.FastJSONRenderer().render(DATA)
+
+        self.assertTrue(orjson.dumps.called)
+        self.assertEqual(body, JSONRenderer().render(DATA))
+
+    def test_encoder_setting(self):
+        """Test API_JSON_ENCODER=json and indented output skip orjson"""
+        with patch.object(renderers, 'orjson') as orjson:
+            with override_settings(API_JSON_ENCODER='json'):
+                renderers.FastJSONRenderer().render(DATA)
+            renderers.FastJSONRenderer().render(
+                DATA, 'application/json; indent=2'
+            )
+
+        self.assertFalse(orjson.dumps.called)
@@ -0,0 +1,136 @@
+import random
+
+from core.db import replicas
+from core.models import Recipe
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+RECIPES_URL = reverse('recipe:recipe-list')
+ME_URL = reverse('user:me')
+
+
+def add_database(alias, name=':memory:'):
+    """Register a SQLite database under a new alias"""
+    connections.databases[alias] = dict(
+        connections.databases[DEFAULT_DB_ALIAS], NAME=name, TEST={}
+    )
+
+
+def remove_database(alias):
+    """Close and forget a database added by add_database"""
+    connections[alias].close()
+    delattr(connections._connections, alias)
+    del connections.databases[alias]
+
+
+def sample_recipe(user, **params):
+    defaults = {'title': 'Sample recipe', 'time_minutes': 10, 'price': 5.00}
+    defaults.update(params)
+    return Recipe.objects.create(user=user, **defaults)
+
+
+@override_settings(DATABASE_REPLICAS={'replica': 1})
+class ReplicaRoutingTests(TestCase):
+    """Test API reads are served by replicas, writes by the primary
+
+    The replica is a separate, empty in-memory database, so whatever it
+    returns shows where a request read from.
+    """
+    multi_db = True
+
+    @classmethod
+    def setUpClass(cls):
+        add_database('replica')
+        call_command('migrate', database='replica', verbosity=0)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        remove_database('replica')
+
+    def setUp(self):
+        replicas._down.clear()
+        self.user = get_user_model().objects.create_user(
+            'test@test.com', 'testPassword', name='Test'
+        )
+        sample_recipe(self.user)
+        # Past the pin window of the writes above
+        caches['default'].clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_reads_from_replica(self):
+        """Test safe requests read from the replica"""
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.json()['results'], [])
+
+    def test_read_your_writes(self):
+        """Test a user reads from the primary right after writing"""
+        self.client.post(RECIPES_URL, {
+            'title': 'New recipe', 'time_minutes': 5, 'price': 1.00
+        })
+
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(len(res.json()['results']), 2)
+        self.assertTrue(replicas.is_pinned(self.user.pk))
+
+    def test_failed_write_not_pinned(self):
+        """Test rejected writes keep the user on the replica"""
+        self.client.post(RECIPES_URL, {'title': ''})
+
+        self.assertFalse(replicas.is_pinned(self.user.pk))
+
+    def test_writes_go_to_primary(self):
+        """Test objects read from a replica are saved to the primary"""
+        recipe = Recipe.objects.using('replica').create(
+            user=get_user_model().objects.db_manager('replica').create_user(
+                'other@test.com', 'testPassword'
+            ),
+            title='Replica recipe', time_minutes=1, price=1.00
+        )
+
+        router = replicas.ReplicaRouter()
+        self.assertEqual(
+            router.db_for_write(Recipe, instance=recipe), DEFAULT_DB_ALIAS
+        )
+        self.assertTrue(router.allow_relation(recipe, self.user))
+        self.assertIsNone(router.db_for_read(Recipe, instance=recipe))
+
+    def test_profile_update_pinned(self):
+        """Test profile updates pin the user to the primary"""
+        self.client.patch(ME_URL, {'name': 'New name'})
+
+        self.assertTrue(replicas.is_pinned(self.user.pk))
+
+    def test_fallback_to_primary(self):
+        """Test a replica that is down is skipped until the retry time"""
+        add_database('broken', '/nonexistent/replica.sqlite3')
+        self.addCleanup(remove_database, 'broken')
+
+        with override_settings(DATABASE_REPLICAS={'broken': 1}):
+            res = self.client.get(RECIPES_URL)
+            self.assertIsNone(replicas.choose_replica())
+
+        self.assertEqual(len(res.json()['results']), 1)
+        self.assertIn('broken', replicas._down)
+
+    def test_weighted_choice(self):
+        """Test replicas are picked in proportion to their weights"""
+        add_database('other')
+        self.addCleanup(remove_database, 'other')
+        random.seed(0)
+
+        with override_settings(DATABASE_REPLICAS={'replica': 3, 'other': 1,
+                                                  'unused': 0}):
+            picks = [replicas.choose_replica() for _ in range(400)]
+
+        self.assertEqual(set(picks), {'replica', 'other'})
+        self.assertGreater(picks.count('replica'), 2 * picks.count('other'))
@@ -0,0 +1,64 @@
+import os
+import shutil
+import tempfile
+import threading
+from unittest.mock import patch
+
+from core.storage import ContentAddressedStorage
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.test import SimpleTestCase
+
+NAME = 'uploads/recipe/ab/' + 'ab' * 32 + '.jpg'
+
+
+class ContentAddressedStorageTests(SimpleTestCase):
+    """Test files stored once under the hash of their content"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.storage = ContentAddressedStorage(location=self.root)
+
+    def save_racing(self, content):
+        """Save while another writer creates the file after exists()"""
+        self.storage.save(NAME, ContentFile(b'content'))
+        saved = []
+        with patch.object(self.storage, 'exists', return_value=False):
+            writer = threading.Thread(
+                target=lambda: saved.append(self.storage.save(NAME, content)),
+                daemon=True
+            )
+            writer.start()
+            writer.join(5)
+
+        self.assertFalse(writer.is_alive())
+        self.assertEqual(saved, [NAME])
+        with self.storage.open(NAME) as stored:
+            self.assertEqual(stored.read(), b'content')
+        self.assertEqual(
+            os.listdir(os.path.dirname(self.storage.path(NAME))),
+            [os.path.basename(NAME)]
+        )
+
+    def test_existing_file_reused(self):
+        """Test saving existing content keeps the name and the file"""
+        self.storage.save(NAME, ContentFile(b'content'))
+
+        self.assertEqual(self.storage.save(NAME, ContentFile(b'x')), NAME)
+        with self.storage.open(NAME) as stored:
+            self.assertEqual(stored.read(), b'content')
+
+    def test_concurrent_write(self):
+        """Test a file created after the exists check is not fatal"""
+        self.save_racing(ContentFile(b'content'))
+
+    def test_concurrent_temporary_upload(self):
+        """Test uploads spooled to disk survive the same race"""
+        upload = TemporaryUploadedFile('photo.jpg', 'image/jpeg', 7, None)
+        # Closing tolerates the temporary file having been moved away
+        self.addCleanup(upload.close)
+        upload.write(b'content')
+        upload.seek(0)
+
+        self.save_racing(upload)
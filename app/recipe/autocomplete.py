@@ -0,0 +1,164 @@
+import bisect
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models.functions import Lower
+from recipe.cache import get_cache
+
+NAMES_VERSION_KEY = 'recipe-api:names:{label}:{user_id}'
+
+_indexes = OrderedDict()
+_lock = threading.Lock()
+
+
+class NameIndex:
+    """Names of one user's tags or ingredients, sorted for prefix lookups"""
+
+    def __init__(self, version, rows):
+        self.version = version
+        self.built_at = time.monotonic()
+        self.names = dict(rows)
+        self.keys = sorted(
+            (name.lower(), pk) for pk, name in self.names.items()
+        )
+
+    def add(self, pk, name):
+        """Insert or rename an object"""
+        self.remove(pk)
+        self.names[pk] = name
+        bisect.insort(self.keys, (name.lower(), pk))
+
+    def remove(self, pk):
+        """Drop an object if it is indexed"""
+        name = self.names.pop(pk, None)
+        if name is not None:
+            index = bisect.bisect_left(self.keys, (name.lower(), pk))
+            del self.keys[index]
+
+    def search(self, prefix, limit):
+        """Return up to limit (id, name) pairs starting with prefix"""
+        prefix = prefix.lower()
+        start = bisect.bisect_left(self.keys, (prefix,))
+        matches = []
+        for key, pk in self.keys[start:start + limit]:
+            if not key.startswith(prefix):
+                break
+            matches.append((pk, self.names[pk]))
+
+        return matches
+
+
+def version_key(model, user_id):
+    return NAMES_VERSION_KEY.format(
+        label=model._meta.label_lower, user_id=user_id
+    )
+
+
+def get_names_version(model, user_id):
+    """Return the shared token identifying the current names of a user"""
+    cache = get_cache()
+    key = version_key(model, user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+
+    return version
+
+
+def get_index(model, user_id, version):
+    """Return the in-memory index of a user if it is at version
+
+    Indexes older than RECIPE_AUTOCOMPLETE_MAX_AGE are not returned either,
+    which bounds how long changes missed through an unshared cache stay
+    invisible.
+    """
+    with _lock:
+        index = _indexes.get((model, user_id))
+        if index is None or index.version != version:
+            return None
+        age = time.monotonic() - index.built_at
+        if age > settings.RECIPE_AUTOCOMPLETE_MAX_AGE:
+            return None
+        _indexes.move_to_end((model, user_id))
+        return index
+
+
+def build_index(model, user_id, version):
+    """Load every name of a user into a new in-memory index"""
+    rows = model.objects.filter(user_id=user_id).values_list('id', 'name')
+    index = NameIndex(version, rows)
+    with _lock:
+        _indexes[(model, user_id)] = index
+        _indexes.move_to_end((model, user_id))
+        while len(_indexes) > settings.RECIPE_AUTOCOMPLETE_MAX_INDEXES:
+            _indexes.popitem(last=False)
+
+    return index
+
+
+def query_prefix(queryset, prefix, limit):
+    """Return up to limit (id, name) pairs starting with prefix from the
+    database, in the same order as the in-memory index"""
+    return list(queryset.filter(name__istartswith=prefix).order_by(
+        Lower('name'), 'id'
+    ).values_list('id', 'name')[:limit])
+
+
+def autocomplete(model, user_id, prefix, limit):
+    """Return up to limit (id, name) pairs of a user starting with prefix
+
+    Answers come from a per-process index of the user's names, checked
+    against a version token in the shared cache that every change bumps.
+    When the index is missing or stale the database answers instead and
+    the index is rebuilt for the next request.
+    """
+    version = get_names_version(model, user_id)
+    index = get_index(model, user_id, version)
+    if index is not None:
+        with _lock:
+            return index.search(prefix, limit)
+
+    matches = query_prefix(
+        model.objects.filter(user_id=user_id), prefix, limit
+    )
+    build_index(model, user_id, version)
+
+    return matches
+
+
+def record_change(model, user_id, change):
+    """Bump the names version of a user and apply change to a current index
+
+    An index that had already missed another change is dropped instead.
+    """
+    cache = get_cache()
+    key = version_key(model, user_id)
+    previous = cache.get(key)
+    version = uuid.uuid4().hex
+    cache.set(key, version, None)
+    with _lock:
+        index = _indexes.get((model, user_id))
+        if index is None:
+            return
+        if previous is None or index.version != previous:
+            del _indexes[(model, user_id)]
+            return
+        change(index)
+        index.version = version
+
+
+def name_saved(instance):
+    """Record a created or renamed tag or ingredient"""
+    record_change(
+        type(instance), instance.user_id,
+        lambda index: index.add(instance.pk, instance.name)
+    )
+
+
+def name_deleted(model, user_id, pk):
+    """Record a deleted tag or ingredient"""
+    record_change(model, user_id, lambda index: index.remove(pk))
@@ -0,0 +1,229 @@
+from core.signals import touch
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import prefetch_related_objects
+from django.dispatch import Signal
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+# Sent after a list serializer saved objects and their relations in bulk,
+# which does not send the model's save and m2m_changed signals.
+bulk_saved = Signal(providing_args=['objects'])
+
+
+def is_id(value):
+    """Check if a submitted JSON value is an integer ID, which no bool is"""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def insert_objects(model, objects):
+    """Insert new objects and return them with their primary keys set
+
+    bulk_create only fills in primary keys on backends that return them
+    from a bulk insert (PostgreSQL); elsewhere the objects are saved one
+    by one so the relations can still be written in bulk.
+    """
+    db = router.db_for_write(model)
+    if connections[db].features.can_return_ids_from_bulk_insert:
+        return model.objects.using(db).bulk_create(objects)
+
+    for obj in objects:
+        obj.save(force_insert=True, using=db)
+    return objects
+
+
+def set_relations(model, objects, relations, replace=False):
+    """Write the many to many rows of objects with one insert per field
+
+    relations holds a dict of field name to related objects for each
+    object; fields missing from it are left alone. With replace, rows
+    already linking the objects through a given field are removed first.
+    """
+    for field in model._meta.many_to_many:
+        through = field.remote_field.through
+        source = f'{field.m2m_field_name()}_id'
+        target = f'{field.m2m_reverse_field_name()}_id'
+        assigned = [
+            (obj, related[field.name])
+            for obj, related in zip(objects, relations)
+            if field.name in related
+        ]
+        if not assigned:
+            continue
+
+        changed = set()
+        if replace:
+            old_rows = through.objects.filter(**{
+                f'{source}__in': [obj.pk for obj, _ in assigned]
+            })
+            changed.update(old_rows.values_list(target, flat=True))
+            old_rows.delete()
+
+        rows = []
+        for obj, related in assigned:
+            for pk in dict.fromkeys(item.pk for item in related):
+                rows.append(through(**{source: obj.pk, target: pk}))
+                changed.add(pk)
+        through.objects.bulk_create(rows)
+        touch(field.related_model.objects.filter(pk__in=changed))
+
+
+class BulkListSerializer(serializers.ListSerializer):
+    """List serializer saving all its items with a few bulk queries
+
+    Bulk inserts and relation rows do not send model signals, so
+    `bulk_saved` is sent once everything is written.
+    """
+
+    def split_relations(self, validated_data):
+        """Separate the many to many values from the other fields"""
+        names = {
+            field.name for field in self.child.Meta.model._meta.many_to_many
+        }
+        items = []
+        relations = []
+        for attrs in validated_data:
+            attrs = dict(attrs)
+            relations.append(
+                {name: attrs.pop(name) for name in names if name in attrs}
+            )
+            items.append(attrs)
+
+        return items, relations
+
+    def prefetch(self, objects):
+        """Load the relations the response shows for every object"""
+        names = [
+            field.name for field in self.child.Meta.model._meta.many_to_many
+            if field.name in self.child.fields
+        ]
+        prefetch_related_objects(objects, *names)
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        items, relations = self.split_relations(validated_data)
+        with transaction.atomic(using=router.db_for_write(model)):
+            objects = insert_objects(
+                model, [model(**attrs) for attrs in items]
+            )
+            set_relations(model, objects, relations)
+            bulk_saved.send(sender=model, objects=objects)
+        self.prefetch(objects)
+
+        return objects
+
+    def update(self, instances, validated_data):
+        model = self.child.Meta.model
+        items, relations = self.split_relations(validated_data)
+        with transaction.atomic(using=router.db_for_write(model)):
+            for instance, attrs in zip(instances, items):
+                for attr, value in attrs.items():
+                    setattr(instance, attr, value)
+                instance.save()
+            set_relations(model, instances, relations, replace=True)
+            bulk_saved.send(sender=model, objects=instances)
+        for instance in instances:
+            getattr(instance, '_prefetched_objects_cache', {}).clear()
+        self.prefetch(instances)
+
+        return instances
+
+
+class BulkCreateMixin:
+    """Create many objects from a JSON list in a single request"""
+
+    def get_bulk_data(self, request):
+        """Return the list of items sent with a bulk request"""
+        data = request.data
+        if not isinstance(data, list):
+            raise ValidationError(
+                {'non_field_errors': ['Expected a list of items.']}
+            )
+        if len(data) > settings.RECIPE_BULK_MAX_ITEMS:
+            raise ValidationError({'non_field_errors': [
+                f'At most {settings.RECIPE_BULK_MAX_ITEMS} items per request.'
+            ]})
+
+        return data
+
+    @action(methods=['POST'], detail=False, url_path='bulk')
+    def bulk(self, request):
+        """Create every object in the list"""
+        return self.bulk_create(request)
+
+    def bulk_create(self, request):
+        """Validate and create all items, or none if any is invalid"""
+        serializer = self.get_serializer(
+            data=self.get_bulk_data(request), many=True
+        )
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class BulkModelMixin(BulkCreateMixin):
+    """Create, partially update and delete many objects per request"""
+
+    @action(methods=['POST', 'PATCH', 'DELETE'], detail=False,
+            url_path='bulk')
+    def bulk(self, request):
+        """Create, update or delete every object in the list"""
+        if request.method == 'PATCH':
+            return self.bulk_update(request)
+        if request.method == 'DELETE':
+            return self.bulk_destroy(request)
+        return self.bulk_create(request)
+
+    def get_bulk_objects(self, ids):
+        """Return the user's objects with the given IDs, in that order"""
+        objects = self.get_queryset().in_bulk(ids)
+        missing = [pk for pk in ids if pk not in objects]
+        if missing:
+            raise ValidationError({'ids': [
+                f'Invalid pk "{pk}" - object does not exist.'
+                for pk in missing
+            ]})
+
+        return [objects[pk] for pk in ids]
+
+    def bulk_update(self, request):
+        """Validate and apply all partial updates, or none"""
+        data = self.get_bulk_data(request)
+        errors = []
+        seen = set()
+        for item in data:
+            pk = item.get('id') if isinstance(item, dict) else None
+            if not is_id(pk):
+                errors.append({'id': ['A valid integer is required.']})
+            elif pk in seen:
+                errors.append({'id': [f'ID {pk} is listed more than once.']})
+            else:
+                errors.append({})
+                seen.add(pk)
+        if any(errors):
+            raise ValidationError(errors)
+
+        serializer = self.get_serializer(
+            self.get_bulk_objects([item['id'] for item in data]),
+            data=data, many=True, partial=True
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        return Response(serializer.data)
+
+    def bulk_destroy(self, request):
+        """Delete every object whose ID is listed under ids"""
+        ids = request.data.get('ids') if isinstance(request.data, dict) \
+            else None
+        if not isinstance(ids, list) or not all(is_id(pk) for pk in ids):
+            raise ValidationError({'ids': ['Expected a list of IDs.']})
+        ids = list(dict.fromkeys(ids))
+
+        self.get_bulk_objects(ids)
+        self.get_queryset().filter(pk__in=ids).prefetch_related(None).delete()
+
+        return Response({'deleted': ids})
@@ -0,0 +1,87 @@
+import uuid
+
+from core.db.replicas import pin_to_primary
+from django.conf import settings
+from django.core.cache import caches
+from recipe.conditional import etag_matches, request_fingerprint, \
+    vary_on_accept
+from rest_framework import status
+from rest_framework.response import Response
+
+VERSION_KEY = 'recipe-api:version:{user_id}'
+RESPONSE_KEY = 'recipe-api:response:{user_id}:{version}:{digest}'
+
+
+def get_cache():
+    """Return the cache backend configured for API responses"""
+    return caches[settings.RECIPE_CACHE_ALIAS]
+
+
+def get_user_version(user_id):
+    """Return the current data version token of a user"""
+    cache = get_cache()
+    key = VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+
+    return version
+
+
+def bump_user_version(user_id):
+    """Invalidate every cached response of a user
+
+    The user is also pinned to the primary database, so the next list
+    is not read from a lagging replica and cached under the new version.
+    This covers writes made outside requests, like image processing.
+    """
+    get_cache().set(
+        VERSION_KEY.format(user_id=user_id), uuid.uuid4().hex, None
+    )
+    pin_to_primary(user_id)
+
+
+def response_cache_key(request, version):
+    """Build the cache key of a response from the normalized request"""
+    return RESPONSE_KEY.format(
+        user_id=request.user.pk,
+        version=version,
+        digest=request_fingerprint(request),
+    )
+
+
+class CachedListMixin:
+    """Serve list responses from the per-user versioned cache
+
+    Any write to the user's recipes, tags or ingredients bumps their
+    version (see recipe.signals), so stale entries are never read again
+    and simply age out of the cache. The ETag is stored with the data so
+    conditional requests are answered from the cache as well.
+    """
+
+    def list(self, request, *args, **kwargs):
+        cache = get_cache()
+        key = response_cache_key(request, get_user_version(request.user.pk))
+        cached = cache.get(key)
+        if cached is not None:
+            data, etag = cached
+            if etag and etag_matches(request, etag):
+                return vary_on_accept(Response(
+                    status=status.HTTP_304_NOT_MODIFIED,
+                    headers={'ETag': etag}
+                ))
+            response = Response(data)
+            if etag:
+                response['ETag'] = etag
+            return vary_on_accept(response)
+
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(
+                key,
+                (response.data, response.get('ETag')),
+                settings.RECIPE_CACHE_TIMEOUT
+            )
+
+        return response
@@ -0,0 +1,108 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def request_fingerprint(request):
+    """Return a digest of the host, path, sorted query params and the
+    negotiated renderer, which tells apart representations of one URL"""
+    params = sorted(
+        (key, value)
+        for key, values in request.query_params.lists()
+        for value in values
+    )
+    renderer = getattr(request, 'accepted_renderer', None)
+    return hashlib.sha256(repr((
+        request.get_host(),
+        request.path,
+        params,
+        renderer.format if renderer else None,
+    )).encode()).hexdigest()
+
+
+def vary_on_accept(response):
+    """Mark a response as depending on the negotiated renderer"""
+    patch_vary_headers(response, ('Accept',))
+    return response
+
+
+def change_marker(queryset):
+    """Return the newest update time and the row count of a queryset"""
+    marker = queryset.order_by().aggregate(
+        updated=Max('updated_at'),
+        count=Count('id'),
+    )
+    return marker['updated'], marker['count']
+
+
+def make_etag(request, marker):
+    """Build a strong ETag for a request from its change marker"""
+    digest = hashlib.sha256(repr((
+        request.user.pk,
+        request_fingerprint(request),
+        marker,
+    )).encode()).hexdigest()
+
+    return f'"{digest}"'
+
+
+def etag_matches(request, etag):
+    """Check if the request's If-None-Match accepts the ETag"""
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    etags = [tag[2:] if tag.startswith('W/') else tag
+             for tag in parse_etags(header)]
+
+    return '*' in etags or etag in etags
+
+
+def conditional_response(request, queryset, handler, *args, **kwargs):
+    """Answer 304 when the client has the current version of queryset
+
+    Only the change marker is queried before deciding, so a matching
+    If-None-Match never loads or serializes any objects.
+    """
+    marker = change_marker(queryset)
+    etag = make_etag(request, marker)
+    if etag_matches(request, etag):
+        return vary_on_accept(Response(
+            status=status.HTTP_304_NOT_MODIFIED,
+            headers={'ETag': etag}
+        ))
+
+    response = handler(request, *args, **kwargs)
+    if response.status_code == status.HTTP_200_OK:
+        response['ETag'] = etag
+
+    return vary_on_accept(response)
+
+
+class ConditionalListMixin:
+    """Emit ETags for list responses and honour If-None-Match"""
+
+    def list(self, request, *args, **kwargs):
+        return conditional_response(
+            request,
+            self.filter_queryset(self.get_queryset()),
+            super().list,
+            *args,
+            **kwargs
+        )
+
+
+class ConditionalRetrieveMixin:
+    """Emit ETags for detail responses and honour If-None-Match"""
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        return conditional_response(
+            request, queryset, super().retrieve, *args, **kwargs
+        )
@@ -0,0 +1,30 @@
+def keyset_chunks(queryset, size):
+    """Yield the objects or rows of a queryset in chunks, newest first
+
+    Each chunk is its own query seeking past the last ID of the previous
+    one, so only one chunk is ever held in memory.
+    """
+    queryset = queryset.order_by('-id')
+    last = None
+    while True:
+        chunk = queryset if last is None else queryset.filter(id__lt=last)
+        chunk = list(chunk[:size])
+        if not chunk:
+            return
+        yield chunk
+        last = chunk[-1]['id'] if isinstance(chunk[-1], dict) \
+            else chunk[-1].id
+
+
+def stream_json_list(chunks, renderer):
+    """Yield the encoded items of chunks as one JSON array, piece by piece"""
+    yield b'['
+    first = True
+    for items in chunks:
+        if not items:
+            continue
+        if not first:
+            yield b','
+        yield renderer.render(items)[1:-1]
+        first = False
+    yield b']'
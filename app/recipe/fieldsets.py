@@ -0,0 +1,98 @@
+from django.db.models import Prefetch
+from rest_framework.exceptions import ValidationError
+
+FIELDS_PARAM = 'fields'
+EXCLUDE_PARAM = 'exclude'
+
+
+def parse_names(value):
+    """Split a comma separated list of field names"""
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def selected_fields(query_params, names):
+    """Return the names kept by ?fields= and ?exclude=, None for all
+
+    ?fields= keeps only the listed fields and ?exclude= drops the listed
+    ones; both may be combined. Unknown names are rejected.
+    """
+    requested = {
+        param: parse_names(query_params[param])
+        for param in (FIELDS_PARAM, EXCLUDE_PARAM)
+        if query_params.get(param)
+    }
+    if not requested:
+        return None
+
+    errors = {
+        param: f'Unknown fields: {", ".join(unknown)}'
+        for param, unknown in (
+            (param, [name for name in values if name not in names])
+            for param, values in requested.items()
+        ) if unknown
+    }
+    if errors:
+        raise ValidationError(errors)
+
+    kept = requested.get(FIELDS_PARAM, names)
+    dropped = requested.get(EXCLUDE_PARAM, ())
+
+    return [name for name in names if name in kept and name not in dropped]
+
+
+def model_sources(model, fields):
+    """Return the columns and many to many relations the fields read
+
+    A field reads its source unless it lists the model fields it needs
+    in a model_fields attribute, as fields with source='*' have to.
+    """
+    columns, relations = set(), set()
+    for field in fields:
+        for name in getattr(field, 'model_fields', (field.source,)):
+            if model._meta.get_field(name).many_to_many:
+                relations.add(name)
+            else:
+                columns.add(name)
+
+    return columns, relations
+
+
+def prefetch_relations(queryset, relations):
+    """Prefetch many to many relations, listing related objects by ID
+
+    recipe.rows reads the same order straight from the through tables.
+    """
+    model = queryset.model
+    return queryset.prefetch_related(*(
+        Prefetch(name, queryset=model._meta.get_field(
+            name
+        ).related_model.objects.order_by('id'))
+        for name in sorted(relations)
+    ))
+
+
+def restrict_queryset(queryset, fields, selected, query_params, keep=()):
+    """Load only what the selected serializer fields read
+
+    Only the relations of selected fields are prefetched. With ?fields=
+    the columns they read are loaded with only(), otherwise the columns
+    read by excluded fields alone are deferred. Columns in keep, such as
+    those the pagination cursor reads back, are always loaded.
+    """
+    model = queryset.model
+    columns, relations = model_sources(
+        model, [fields[name] for name in selected]
+    )
+    columns.update(
+        name for name in keep if name not in queryset.query.annotations
+    )
+    queryset = prefetch_relations(queryset, relations)
+    if query_params.get(FIELDS_PARAM):
+        return queryset.only(*columns)
+
+    dropped, _ = model_sources(
+        model,
+        [field for name, field in fields.items() if name not in selected]
+    )
+
+    return queryset.defer(*(dropped - columns))
@@ -0,0 +1,59 @@
+from decimal import Decimal
+
+from core.models import Recipe
+from django.db.backends.base.operations import BaseDatabaseOperations
+from django.db.models import Count
+
+MATCH_ANY = 'any'
+MATCH_ALL = 'all'
+MATCH_MODES = (MATCH_ANY, MATCH_ALL)
+
+# Query parameters bounding recipe fields, as (lookup, value type)
+RANGE_FILTERS = {
+    'min_time': ('time_minutes__gte', int),
+    'max_time': ('time_minutes__lte', int),
+    'min_price': ('price__gte', Decimal),
+    'max_price': ('price__lte', Decimal),
+}
+# Values an IntegerField holds on every backend, as (min, max)
+INTEGER_RANGE = BaseDatabaseOperations.integer_field_ranges['IntegerField']
+# Fields recipes can be ordered by; ties are broken by id
+ORDERING_FIELDS = ('id', 'time_minutes', 'price')
+
+
+def related_recipe_ids(relation, ids, match=MATCH_ANY):
+    """Return a subquery of recipe IDs linked to the related object IDs
+
+    The subquery only reads the through table of the relation, so it
+    yields each recipe once however many of the IDs it matches. With
+    MATCH_ALL a recipe has to be linked to every one of the IDs.
+    """
+    field = Recipe._meta.get_field(relation)
+    source = field.m2m_field_name()
+    target = field.m2m_reverse_field_name()
+    ids = set(ids)
+
+    links = field.remote_field.through.objects.filter(
+        **{f'{target}__in': ids}
+    )
+    if match == MATCH_ALL:
+        links = links.values(source).annotate(
+            matched=Count(target)
+        ).filter(matched=len(ids))
+
+    return links.values(source)
+
+
+def filter_recipes(queryset, match=MATCH_ANY, **relations):
+    """Filter recipes by the IDs given for each relation
+
+    Each relation is applied as its own IN subquery instead of a join, so
+    filtering on tags and ingredients together never duplicates rows.
+    """
+    for relation, ids in relations.items():
+        if ids:
+            queryset = queryset.filter(
+                id__in=related_recipe_ids(relation, ids, match)
+            )
+
+    return queryset
@@ -0,0 +1,148 @@
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+from core.models import Recipe
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from recipe.cache import bump_user_version
+
+logger = logging.getLogger(__name__)
+
+# Variants built for every recipe image, as (longest side, format, ext).
+VARIANTS = {
+    'thumbnail': (200, 'JPEG', 'jpg'),
+    'medium': (800, 'JPEG', 'jpg'),
+    'webp': (1600, 'WEBP', 'webp'),
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_storage():
+    """Return the storage recipe images are saved in"""
+    return Recipe._meta.get_field('image').storage
+
+
+def variant_name(name, variant):
+    """Return the storage name of a variant of the image called name"""
+    directory, filename = os.path.split(name)
+    stem = os.path.splitext(filename)[0]
+    ext = VARIANTS[variant][2]
+
+    return os.path.join(directory, 'variants', f'{stem}_{variant}.{ext}')
+
+
+def release_image(name):
+    """Delete an image and its variants once no recipe refers to it
+
+    Images are stored by content hash and shared between recipes with the
+    same photo, so a file is only removed when its last reference goes.
+    """
+    if not name or Recipe.objects.filter(image=name).exists():
+        return
+
+    storage = get_storage()
+    for variant in VARIANTS:
+        storage.delete(variant_name(name, variant))
+    storage.delete(name)
+
+
+def render_variant(image, variant):
+    """Return the encoded bytes of a variant of a loaded image"""
+    size, image_format, _ = VARIANTS[variant]
+    resized = image.copy()
+    resized.thumbnail((size, size), Image.LANCZOS)
+    if resized.mode not in ('RGB', 'L'):
+        resized = resized.convert('RGB')
+
+    buffer = io.BytesIO()
+    resized.save(buffer, format=image_format, quality=85, optimize=True)
+    return buffer.getvalue()
+
+
+def build_variants(name):
+    """Create any missing variant files of the image called name"""
+    storage = get_storage()
+    missing = [
+        variant for variant in VARIANTS
+        if not storage.exists(variant_name(name, variant))
+    ]
+    if not missing:
+        return
+
+    largest = max(VARIANTS[variant][0] for variant in missing)
+    with storage.open(name) as image_file:
+        image = Image.open(image_file)
+        image.draft('RGB', (largest, largest))
+        image.load()
+
+    for variant in missing:
+        storage.save(
+            variant_name(name, variant),
+            ContentFile(render_variant(image, variant))
+        )
+
+
+def process_recipe_image(recipe_id):
+    """Build the variants of a recipe image and mark them ready"""
+    row = Recipe.objects.filter(pk=recipe_id).values_list(
+        'image', 'user_id'
+    ).first()
+    if not row or not row[0]:
+        return
+    name, user_id = row
+
+    build_variants(name)
+    updated = Recipe.objects.filter(pk=recipe_id, image=name).update(
+        image_variants_ready=True,
+        updated_at=timezone.now(),
+    )
+    if updated:
+        bump_user_version(user_id)
+
+
+def _run_in_worker(recipe_id):
+    """Process a recipe image on a worker thread"""
+    close_old_connections()
+    try:
+        process_recipe_image(recipe_id)
+    except Exception:
+        logger.exception('Processing image of recipe %s failed', recipe_id)
+    finally:
+        close_old_connections()
+
+
+def get_executor():
+    """Return the worker pool, starting it on first use"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.RECIPE_IMAGE_WORKERS,
+                thread_name_prefix='recipe-images',
+            )
+    return _executor
+
+
+def schedule_recipe_image(recipe):
+    """Queue the variants of a recipe image to be built
+
+    Work is handed to the pool once the upload is committed so the worker
+    sees the new image. With RECIPE_IMAGE_PROCESSING set to 'sync' the
+    variants are built before returning instead.
+    """
+    if settings.RECIPE_IMAGE_PROCESSING == 'sync':
+        process_recipe_image(recipe.pk)
+        recipe.refresh_from_db(fields=['image_variants_ready'])
+        return
+
+    transaction.on_commit(
+        lambda: get_executor().submit(_run_in_worker, recipe.pk)
+    )
@@ -0,0 +1,59 @@
+import tracemalloc
+
+from core.benchmark import rolled_back, seed_user_data, view_queryset
+from core.renderers import FastJSONRenderer
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from recipe import views
+from recipe.export import keyset_chunks, stream_json_list
+from recipe.rows import RowReader
+
+
+class Command(BaseCommand):
+    """Django command to measure the memory of full and streamed exports"""
+    help = 'Compare peak memory of rendering all recipes and streaming them'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--recipes', type=int, nargs='+', default=[2000, 20000]
+        )
+
+    def peak(self, run):
+        """Return the size in bytes of run()'s output and its peak memory"""
+        tracemalloc.start()
+        try:
+            size = run()
+            return size, tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def handle(self, *args, **options):
+        renderer = FastJSONRenderer()
+        size = settings.RECIPE_EXPORT_CHUNK_SIZE
+        for count in options['recipes']:
+            with rolled_back():
+                self.stdout.write(f'Seeding {count} recipes....')
+                user = seed_user_data(recipes=count)
+                reader = RowReader(views.RecipeViewSet.serializer_class())
+                queryset = view_queryset(views.RecipeViewSet, user)
+
+                def full():
+                    rows = list(reader.rows(queryset))
+                    return len(renderer.render(reader.render(rows)))
+
+                def streamed():
+                    chunks = (
+                        reader.render(rows) for rows in
+                        keyset_chunks(reader.rows(queryset), size)
+                    )
+                    return sum(
+                        len(piece)
+                        for piece in stream_json_list(chunks, renderer)
+                    )
+
+                for label, run in (('full', full), ('streamed', streamed)):
+                    length, peak = self.peak(run)
+                    self.stdout.write(
+                        f'{label}: {length / 2 ** 20:.1f} MiB of JSON, '
+                        f'peak {peak / 2 ** 20:.1f} MiB'
+                    )
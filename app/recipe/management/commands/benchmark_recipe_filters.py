@@ -0,0 +1,65 @@
+from core.benchmark import rolled_back, seed_user_data, timed, view_queryset
+from core.models import Recipe
+from django.core.management.base import BaseCommand
+from recipe import views
+
+
+class Command(BaseCommand):
+    """Django command to time recipe tag/ingredient filtering"""
+    help = 'Compare the join based and subquery based recipe filters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipes', type=int, default=20000)
+        parser.add_argument('--ids', type=int, default=50)
+        parser.add_argument('--per-recipe', type=int, default=5)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def get_cases(self, user, tag_ids, ingredient_ids):
+        """Return (label, queryset) for each way of filtering"""
+        legacy = Recipe.objects.filter(
+            tags__id__in=tag_ids
+        ).filter(
+            ingredients__id__in=ingredient_ids
+        ).filter(user=user).order_by('-id')
+        params = {
+            'tags': ','.join(str(pk) for pk in tag_ids),
+            'ingredients': ','.join(str(pk) for pk in ingredient_ids),
+        }
+        return [
+            ('chained joins', legacy),
+            ('subquery match=any', view_queryset(
+                views.RecipeViewSet, user, params
+            )),
+            ('subquery match=all', view_queryset(
+                views.RecipeViewSet, user, dict(params, match='all')
+            )),
+        ]
+
+    def handle(self, *args, **options):
+        ids = options['ids']
+        with rolled_back():
+            self.stdout.write('Seeding data....')
+            user = seed_user_data(
+                recipes=options['recipes'],
+                tags=ids * 2,
+                ingredients=ids * 2,
+                per_recipe=options['per_recipe'],
+            )
+            tag_ids = list(
+                user.tag_set.values_list('id', flat=True)[:ids]
+            )
+            ingredient_ids = list(
+                user.ingredient_set.values_list('id', flat=True)[:ids]
+            )
+
+            for label, queryset in self.get_cases(
+                    user, tag_ids, ingredient_ids):
+                results = []
+                for _ in range(options['repeat']):
+                    with timed(results, label):
+                        rows = list(queryset.values_list('id', flat=True))
+                best = min(seconds for _, seconds in results)
+                self.stdout.write(
+                    f'{label}: {len(rows)} rows '
+                    f'({len(set(rows))} unique), best {best * 1000:.1f} ms'
+                )
@@ -0,0 +1,78 @@
+import random
+
+from core.benchmark import rolled_back, seed_user_data, timed
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from recipe import views
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+
+class Command(BaseCommand):
+    """Django command to time importing recipes one by one and in bulk"""
+    help = 'Compare creating recipes per item and through the bulk endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipes', type=int, default=10000)
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.RECIPE_BULK_MAX_ITEMS
+        )
+        parser.add_argument('--per-recipe', type=int, default=3)
+
+    def build_payload(self, user, count, per_recipe):
+        """Return recipe dicts referring to the user's tags/ingredients"""
+        tag_ids = list(user.tag_set.values_list('id', flat=True))
+        ingredient_ids = list(user.ingredient_set.values_list('id', flat=True))
+        rand = random.Random(0)
+
+        return [
+            {
+                'title': f'imported{i}',
+                'time_minutes': i % 240 + 1,
+                'price': f'{i % 100}.99',
+                'tags': rand.sample(tag_ids, per_recipe),
+                'ingredients': rand.sample(ingredient_ids, per_recipe),
+            }
+            for i in range(count)
+        ]
+
+    def post(self, view, user, data):
+        """POST data as JSON to a view and check it was created"""
+        request = APIRequestFactory().post('/', data, format='json')
+        force_authenticate(request, user=user)
+        response = view(request)
+        if response.status_code != status.HTTP_201_CREATED:
+            raise AssertionError(response.data)
+
+    def import_per_item(self, user, payload, options):
+        view = views.RecipeViewSet.as_view({'post': 'create'})
+        for item in payload:
+            self.post(view, user, item)
+
+    def import_bulk(self, user, payload, options):
+        view = views.RecipeViewSet.as_view({'post': 'bulk'})
+        size = options['batch_size']
+        for start in range(0, len(payload), size):
+            self.post(view, user, payload[start:start + size])
+
+    def handle(self, *args, **options):
+        count = options['recipes']
+        results = []
+        for label, run in (('per item', self.import_per_item),
+                           ('bulk', self.import_bulk)):
+            with rolled_back():
+                user = seed_user_data(
+                    recipes=0, tags=50, ingredients=50,
+                    per_recipe=options['per_recipe'],
+                )
+                payload = self.build_payload(
+                    user, count, options['per_recipe']
+                )
+                with timed(results, label):
+                    run(user, payload, options)
+
+        for label, seconds in results:
+            self.stdout.write(
+                f'{label}: {count} recipes in {seconds:.2f} s '
+                f'({count / seconds:.0f} recipes/s)'
+            )
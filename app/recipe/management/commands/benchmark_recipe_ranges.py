@@ -0,0 +1,70 @@
+from core.benchmark import rolled_back, seed_user_data, timed, view_queryset
+from core.models import Recipe
+from django.core.management.base import BaseCommand
+from recipe import views
+
+CASES = (
+    ('max_time=30 max_price=10', {'max_time': 30, 'max_price': '10'}),
+    ('ordering=price', {'ordering': 'price'}),
+    ('min_price=50 ordering=-time_minutes',
+     {'min_price': '50', 'ordering': '-time_minutes'}),
+    ('min_time=100 max_time=120 ordering=time_minutes',
+     {'min_time': 100, 'max_time': 120, 'ordering': 'time_minutes'}),
+)
+
+
+class Command(BaseCommand):
+    """Django command to time recipe time/price range filters"""
+    help = 'Time first pages of range filtered recipes against a full fetch'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipes', type=int, default=1000000)
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--page-size', type=int, default=50)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def best(self, run, label, repeat):
+        """Return the fastest of repeat runs in milliseconds"""
+        results = []
+        for _ in range(repeat):
+            with timed(results, label):
+                run()
+        return min(seconds for _, seconds in results) * 1000
+
+    def handle(self, *args, **options):
+        users = options['users']
+        size = options['page_size']
+        with rolled_back():
+            self.stdout.write('Seeding data....')
+            user = None
+            for i in range(users):
+                seeded = seed_user_data(
+                    email=f'bench{i}@test.com',
+                    recipes=options['recipes'] // users,
+                    tags=1, ingredients=1, per_recipe=0,
+                )
+                user = user or seeded
+
+            full = Recipe.objects.filter(user=user).values_list(
+                'id', 'time_minutes', 'price'
+            )
+            best = self.best(
+                lambda: list(full.all()), 'full fetch', options['repeat']
+            )
+            self.stdout.write(
+                f'full fetch: {full.count()} rows, best {best:.1f} ms'
+            )
+
+            for label, params in CASES:
+                queryset = view_queryset(
+                    views.RecipeViewSet, user, params
+                ).prefetch_related(None)
+                page = queryset.values_list('id', flat=True)[:size + 1]
+                best = self.best(
+                    lambda: list(page.all()), label, options['repeat']
+                )
+                plan = queryset.explain().splitlines()
+                self.stdout.write(
+                    f'{label}: first page best {best:.2f} ms\n'
+                    + ''.join(f'    {line}\n' for line in plan)
+                )
@@ -0,0 +1,56 @@
+from core.benchmark import rolled_back, seed_user_data, timed, view_queryset
+from django.core.management.base import BaseCommand
+from recipe import rows, views
+from rest_framework.renderers import JSONRenderer
+
+
+class Command(BaseCommand):
+    """Django command to time list rendering with and without serializers"""
+    help = 'Time recipe, tag and ingredient lists from instances and rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipes', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def best(self, run, label, repeat):
+        """Return the fastest of repeat runs in milliseconds"""
+        results = []
+        for _ in range(repeat):
+            with timed(results, label):
+                run()
+        return min(seconds for _, seconds in results) * 1000
+
+    def handle(self, *args, **options):
+        renderer = JSONRenderer()
+        with rolled_back():
+            self.stdout.write('Seeding data....')
+            user = seed_user_data(
+                recipes=options['recipes'], tags=100, ingredients=200
+            )
+
+            for label, viewset in (
+                    ('recipes', views.RecipeViewSet),
+                    ('tags', views.TagViewSet),
+                    ('ingredients', views.IngredientViewSet)):
+                queryset = view_queryset(viewset, user)
+                serializer_class = viewset.serializer_class
+                reader = rows.RowReader(serializer_class())
+
+                def from_instances():
+                    data = serializer_class(queryset.all(), many=True).data
+                    return renderer.render(data)
+
+                def from_rows():
+                    data = reader.render(list(reader.rows(queryset)))
+                    return renderer.render(data)
+
+                if from_instances() != from_rows():
+                    self.stderr.write(f'{label}: outputs differ')
+                serialized = self.best(
+                    from_instances, label, options['repeat']
+                )
+                read = self.best(from_rows, label, options['repeat'])
+                self.stdout.write(
+                    f'{label}: serializer {serialized:.1f} ms, '
+                    f'rows {read:.1f} ms ({serialized / read:.1f}x)'
+                )
@@ -0,0 +1,108 @@
+import os
+import re
+
+from core.models import RECIPE_IMAGE_DIR, Recipe, content_image_path, \
+    file_sha256
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from recipe import images
+from recipe.cache import bump_user_version
+
+CONTENT_NAME = re.compile(r'^[0-9a-f]{2}/[0-9a-f]{64}\.\w+$')
+
+
+def is_content_addressed(name):
+    """Return whether an image name is already derived from its content"""
+    return bool(CONTENT_NAME.match(os.path.relpath(name, RECIPE_IMAGE_DIR)))
+
+
+class Command(BaseCommand):
+    """Django command to move recipe images to content addressed names"""
+    help = 'Rename recipe images after their content and merge duplicates'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--prune', action='store_true',
+            help='Also delete stored images that no recipe refers to'
+        )
+
+    def handle(self, *args, **options):
+        storage = images.get_storage()
+        names = Recipe.objects.exclude(image='').exclude(
+            image__isnull=True
+        ).values_list('image', flat=True).distinct()
+
+        moved = 0
+        for name in list(names):
+            if is_content_addressed(name):
+                continue
+            if not storage.exists(name):
+                self.stderr.write(f'Missing image {name}')
+                continue
+
+            self.move(storage, name)
+            moved += 1
+
+        pruned = self.prune(storage) if options['prune'] else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Moved {moved} images, pruned {pruned}'
+        ))
+
+    def move(self, storage, name):
+        """Store an image under its content hash and repoint its recipes
+
+        Existing variants are copied along before the old name is
+        released; missing ones are scheduled to be built.
+        """
+        with storage.open(name) as image_file:
+            digest = file_sha256(image_file)
+            target = content_image_path(digest, name.split('.')[-1].lower())
+            storage.save(target, image_file)
+
+        ready = True
+        for variant in images.VARIANTS:
+            old = images.variant_name(name, variant)
+            new = images.variant_name(target, variant)
+            if not storage.exists(new) and storage.exists(old):
+                with storage.open(old) as variant_file:
+                    storage.save(new, variant_file)
+            ready = ready and storage.exists(new)
+
+        with transaction.atomic():
+            recipes = Recipe.objects.filter(image=name)
+            user_ids = set(recipes.values_list('user_id', flat=True))
+            recipe_ids = list(recipes.values_list('id', flat=True))
+            recipes.update(
+                image=target,
+                image_variants_ready=ready,
+                updated_at=timezone.now(),
+            )
+            if not ready:
+                for recipe in Recipe.objects.filter(id__in=recipe_ids):
+                    images.schedule_recipe_image(recipe)
+        for user_id in user_ids:
+            bump_user_version(user_id)
+
+        images.release_image(name)
+
+    def prune(self, storage, directory=RECIPE_IMAGE_DIR):
+        """Release every stored image below directory, returning the count"""
+        if not storage.exists(directory):
+            return 0
+
+        pruned = 0
+        subdirectories, files = storage.listdir(directory)
+        for filename in files:
+            name = os.path.join(directory, filename)
+            if not storage.exists(name):
+                continue
+            images.release_image(name)
+            pruned += not storage.exists(name)
+        for subdirectory in subdirectories:
+            if subdirectory != 'variants':
+                pruned += self.prune(
+                    storage, os.path.join(directory, subdirectory)
+                )
+
+        return pruned
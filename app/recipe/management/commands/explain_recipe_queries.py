@@ -0,0 +1,72 @@
+from core.benchmark import rolled_back, seed_user_data, view_queryset
+from django.core.management.base import BaseCommand
+from django.db import connection
+from recipe import views
+
+
+class Command(BaseCommand):
+    """Django command to EXPLAIN the recipe API queries on seeded data"""
+    help = 'Seed a large dataset and print the query plan of each endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipes', type=int, default=20000)
+        parser.add_argument('--tags', type=int, default=200)
+        parser.add_argument('--ingredients', type=int, default=500)
+        parser.add_argument('--per-recipe', type=int, default=3)
+        parser.add_argument('--page-size', type=int, default=50)
+        parser.add_argument(
+            '--analyze', action='store_true',
+            help='Run EXPLAIN ANALYZE (PostgreSQL only)'
+        )
+
+    def get_cases(self, user):
+        """Return (label, viewset, query params) for each endpoint query"""
+        tag_ids = ','.join(
+            str(pk) for pk in user.tag_set.values_list('id', flat=True)[:5]
+        )
+        ingredient_ids = ','.join(
+            str(pk)
+            for pk in user.ingredient_set.values_list('id', flat=True)[:5]
+        )
+        return [
+            ('recipes', views.RecipeViewSet, {}),
+            ('recipes?tags', views.RecipeViewSet, {'tags': tag_ids}),
+            (
+                'recipes?ingredients',
+                views.RecipeViewSet,
+                {'ingredients': ingredient_ids}
+            ),
+            ('tags', views.TagViewSet, {}),
+            ('tags?assigned_only', views.TagViewSet, {'assigned_only': 1}),
+            ('ingredients', views.IngredientViewSet, {}),
+            (
+                'ingredients?assigned_only',
+                views.IngredientViewSet,
+                {'assigned_only': 1}
+            ),
+        ]
+
+    def handle(self, *args, **options):
+        explain_options = {}
+        if options['analyze'] and connection.vendor == 'postgresql':
+            explain_options['analyze'] = True
+
+        with rolled_back():
+            self.stdout.write('Seeding data....')
+            user = seed_user_data(
+                recipes=options['recipes'],
+                tags=options['tags'],
+                ingredients=options['ingredients'],
+                per_recipe=options['per_recipe'],
+            )
+            if connection.vendor in ('postgresql', 'sqlite'):
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE')
+
+            for label, viewset, params in self.get_cases(user):
+                queryset = view_queryset(viewset, user, params)
+                page = queryset[:options['page_size'] + 1]
+                self.stdout.write(self.style.MIGRATE_HEADING(label))
+                self.stdout.write(str(page.query))
+                self.stdout.write(page.explain(**explain_options))
+                self.stdout.write('')
@@ -0,0 +1,26 @@
+from core.models import Recipe
+from django.core.management.base import BaseCommand
+from recipe import images
+
+
+class Command(BaseCommand):
+    """Django command to build missing recipe image variants"""
+    help = 'Build the resized variants of recipe images that lack them'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Check every recipe image, not only pending ones'
+        )
+
+    def handle(self, *args, **options):
+        recipes = Recipe.objects.exclude(image='').exclude(image__isnull=True)
+        if not options['all']:
+            recipes = recipes.filter(image_variants_ready=False)
+
+        count = 0
+        for recipe_id in recipes.values_list('id', flat=True).iterator():
+            images.process_recipe_image(recipe_id)
+            count += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Processed {count} images'))
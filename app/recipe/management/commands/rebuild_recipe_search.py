@@ -0,0 +1,24 @@
+from core.models import Recipe
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from recipe import search
+
+
+class Command(BaseCommand):
+    """Django command to rebuild the recipe search index"""
+    help = 'Reindex every recipe for full text search'
+
+    def handle(self, *args, **options):
+        if search.get_connection().vendor not in ('postgresql', 'sqlite'):
+            self.stdout.write('No search index on this database')
+            return
+
+        recipe_ids = list(Recipe.objects.values_list('id', flat=True))
+        with transaction.atomic():
+            with search.get_connection().cursor() as cursor:
+                cursor.execute(f'DELETE FROM {search.SEARCH_TABLE}')
+            search.index_recipes(recipe_ids)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Indexed {len(recipe_ids)} recipes')
+        )
@@ -0,0 +1,119 @@
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetCursorPagination(CursorPagination):
+    """Cursor pagination that seeks on every field of the view ordering
+
+    DRF's CursorPagination only filters on the first ordering field and
+    falls back to OFFSET to step over ties. Encoding the values of all
+    ordering fields in the cursor lets a unique ordering such as
+    ('-name', 'id') seek straight to the next page on every page.
+    """
+    ordering = ('-id',)
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_ordering(self, request, queryset, view):
+        """Prefer the ordering of the view, from get_ordering() if any"""
+        if hasattr(view, 'get_ordering'):
+            ordering = view.get_ordering()
+        else:
+            ordering = getattr(view, 'ordering', None)
+        if ordering:
+            return tuple(ordering)
+        return super().get_ordering(request, queryset, view)
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for order in ordering:
+            field_name = order.lstrip('-')
+            if isinstance(instance, dict):
+                attr = instance[field_name]
+            else:
+                attr = getattr(instance, field_name)
+            values.append(str(attr))
+        return json.dumps(values)
+
+    def _seek_filter(self, position, reverse):
+        """Return a Q selecting the rows after the given position"""
+        try:
+            values = json.loads(position)
+        except ValueError:
+            values = None
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            return None
+
+        seek = Q()
+        for index, order in enumerate(self.ordering):
+            field_name = order.lstrip('-')
+            lookup = 'lt' if order.startswith('-') != reverse else 'gt'
+            step = Q(**{f'{field_name}__{lookup}': values[index]})
+            for prev_order, prev_value in zip(self.ordering, values[:index]):
+                step &= Q(**{prev_order.lstrip('-'): prev_value})
+            seek |= step
+        return seek
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (offset, reverse, current_position) = (0, False, None)
+        else:
+            (offset, reverse, current_position) = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(*[
+                order[1:] if order.startswith('-') else '-' + order
+                for order in self.ordering
+            ])
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if current_position is not None:
+            seek = self._seek_filter(current_position, reverse)
+            if seek is None:
+                raise NotFound(self.invalid_cursor_message)
+            queryset = queryset.filter(seek)
+
+        results = list(queryset[offset:offset + self.page_size + 1])
+        self.page = list(results[:self.page_size])
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(
+                results[-1], self.ordering
+            )
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = (current_position is not None) or (offset > 0)
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = (current_position is not None) or (offset > 0)
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
@@ -0,0 +1,128 @@
+from django.conf import settings
+from recipe import fieldsets
+from recipe.serializers import ImageVariantsField
+from rest_framework import serializers
+from rest_framework.response import Response
+
+# Fields whose to_representation returns database values unchanged
+PASS_THROUGH_FIELDS = (
+    serializers.BooleanField, serializers.CharField, serializers.IntegerField,
+)
+
+
+def column_renderer(field):
+    """Return a function rendering a row the way a serializer field does
+
+    Returns None for fields that need the model instance, which the
+    serializers have to render instead.
+    """
+    source = field.source
+    if isinstance(field, ImageVariantsField):
+        return lambda row, relations: (
+            field.variant_urls(row['image'])
+            if row['image'] and row['image_variants_ready'] else None
+        )
+    if isinstance(field, serializers.ManyRelatedField):
+        if not isinstance(field.child_relation,
+                          serializers.PrimaryKeyRelatedField) or \
+                field.child_relation.pk_field is not None:
+            return None
+        return lambda row, relations: relations[source][row['id']]
+    if isinstance(field, (serializers.Serializer,
+                          serializers.ListSerializer)) or \
+            field.source == '*' or '.' in field.source:
+        return None
+
+    if type(field) in PASS_THROUGH_FIELDS:
+        return lambda row, relations: row[source]
+    return lambda row, relations: (
+        None if row[source] is None else field.to_representation(row[source])
+    )
+
+
+def relation_ids(model, relation, ids):
+    """Return the related IDs of each object, in ID order"""
+    field = model._meta.get_field(relation)
+    source = field.m2m_field_name()
+    target = field.m2m_reverse_field_name()
+    related = {pk: [] for pk in ids}
+    links = field.remote_field.through.objects.filter(
+        **{f'{source}__in': ids}
+    ).order_by(target).values_list(source, target)
+    for pk, related_pk in links:
+        related[pk].append(related_pk)
+
+    return related
+
+
+class RowReader:
+    """Render list items from values() rows instead of model instances
+
+    The items are the same as the serializer would return for the
+    instances, down to the key order, so the JSON is byte for byte the
+    same. Many to many fields are read from their through tables in a
+    single query each.
+    """
+
+    def __init__(self, serializer):
+        self.fields = [
+            field for field in serializer.fields.values()
+            if not field.write_only
+        ]
+        self.renderers = [column_renderer(field) for field in self.fields]
+        self.model = serializer.Meta.model
+        self.columns, self.relations = fieldsets.model_sources(
+            self.model, self.fields
+        )
+
+    @property
+    def supported(self):
+        """Check every field can be rendered from rows"""
+        return None not in self.renderers
+
+    def rows(self, queryset):
+        """Return the values() rows of a queryset, with its ordering"""
+        ordering = [
+            order.lstrip('-') for order in queryset.query.order_by
+            if isinstance(order, str)
+        ]
+        return queryset.prefetch_related(None).values(
+            *sorted(self.columns | set(ordering) | {'id'})
+        )
+
+    def render(self, rows):
+        """Return the list items of rows"""
+        ids = [row['id'] for row in rows]
+        relations = {
+            name: relation_ids(self.model, name, ids)
+            for name in self.relations
+        }
+        names = [field.field_name for field in self.fields]
+
+        return [
+            dict(zip(names, (render(row, relations)
+                             for render in self.renderers)))
+            for row in rows
+        ]
+
+
+class RowListMixin:
+    """Serve list reads from values() rows when every field allows it
+
+    Switched off with RECIPE_FAST_LIST_READS, which sends lists through
+    the serializers again.
+    """
+
+    def list(self, request, *args, **kwargs):
+        if not settings.RECIPE_FAST_LIST_READS:
+            return super().list(request, *args, **kwargs)
+        reader = RowReader(self.get_serializer())
+        if not reader.supported:
+            return super().list(request, *args, **kwargs)
+
+        rows = reader.rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(reader.render(page))
+
+        return Response(reader.render(list(rows)))
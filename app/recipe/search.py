@@ -0,0 +1,165 @@
+import re
+
+from core.models import Recipe
+from django.db import connections, router
+from django.db.models import DecimalField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+SEARCH_TABLE = 'core_recipe_search'
+SEARCH_CONFIG = 'english'
+# Recipes reindexed per statement when many change at once.
+INDEX_BATCH_SIZE = 500
+
+POSTGRESQL_UPSERT = (
+    f'INSERT INTO {SEARCH_TABLE} (recipe_id, document) VALUES (%s, '
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', %s), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', %s), 'B') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', %s), 'B')) "
+    'ON CONFLICT (recipe_id) DO UPDATE SET document = EXCLUDED.document'
+)
+POSTGRESQL_MATCHES = (
+    f'SELECT recipe_id FROM {SEARCH_TABLE} '
+    f"WHERE document @@ plainto_tsquery('{SEARCH_CONFIG}', %s)"
+)
+# ts_rank is a float4 that float8 output would print with 15 digits and
+# not read back exactly, so the cursor of a search could never seek on it.
+# Rounded to a numeric it round-trips through the cursor unchanged.
+RANK_DECIMAL_PLACES = 6
+POSTGRESQL_RANK = (
+    f"SELECT round(ts_rank(document, plainto_tsquery('{SEARCH_CONFIG}', "
+    f"%s))::numeric, {RANK_DECIMAL_PLACES}) "
+    f'FROM {SEARCH_TABLE} s WHERE s.recipe_id = core_recipe.id'
+)
+
+SQLITE_INSERT = (
+    f'INSERT INTO {SEARCH_TABLE} (rowid, title, tags, ingredients) '
+    'VALUES (%s, %s, %s, %s)'
+)
+SQLITE_MATCHES = (
+    f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s'
+)
+# bm25 is lower for better matches; title hits weigh more than the rest.
+SQLITE_RANK = (
+    f'SELECT -bm25({SEARCH_TABLE}, 10.0, 2.0, 2.0) FROM {SEARCH_TABLE} '
+    f'WHERE {SEARCH_TABLE} MATCH %s AND rowid = core_recipe.id'
+)
+
+
+def get_connection():
+    """Return the connection recipes and their search index are written to"""
+    return connections[router.db_for_write(Recipe)]
+
+
+def search_terms(query):
+    """Split a search string into lower case words"""
+    return re.findall(r'\w+', query.lower())
+
+
+def build_documents(recipe_ids):
+    """Return (id, title, tag names, ingredient names) of each recipe"""
+    titles = dict(
+        Recipe.objects.filter(id__in=recipe_ids).values_list('id', 'title')
+    )
+    names = {recipe_id: ([], []) for recipe_id in titles}
+    for index, relation in enumerate(('tags', 'ingredients')):
+        through = Recipe._meta.get_field(relation).remote_field.through
+        rows = through.objects.filter(recipe_id__in=titles).values_list(
+            'recipe_id', f'{relation[:-1]}__name'
+        )
+        for recipe_id, name in rows:
+            names[recipe_id][index].append(name)
+
+    return [
+        (recipe_id, title, ' '.join(names[recipe_id][0]),
+         ' '.join(names[recipe_id][1]))
+        for recipe_id, title in titles.items()
+    ]
+
+
+def index_recipes(recipe_ids):
+    """Bring the search index entries of the given recipes up to date
+
+    Recipes that no longer exist are dropped from the index.
+    """
+    connection = get_connection()
+    if connection.vendor not in ('postgresql', 'sqlite'):
+        return
+
+    recipe_ids = list(set(recipe_ids))
+    for start in range(0, len(recipe_ids), INDEX_BATCH_SIZE):
+        batch = recipe_ids[start:start + INDEX_BATCH_SIZE]
+        documents = build_documents(batch)
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                deleted = set(batch) - {document[0] for document in documents}
+                remove_recipes(deleted)
+                cursor.executemany(POSTGRESQL_UPSERT, documents)
+            else:
+                remove_recipes(batch)
+                cursor.executemany(SQLITE_INSERT, documents)
+
+
+def remove_recipes(recipe_ids):
+    """Drop recipes from the search index"""
+    connection = get_connection()
+    if not recipe_ids or connection.vendor not in ('postgresql', 'sqlite'):
+        return
+
+    key = 'recipe_id' if connection.vendor == 'postgresql' else 'rowid'
+    recipe_ids = list(recipe_ids)
+    with connection.cursor() as cursor:
+        for start in range(0, len(recipe_ids), INDEX_BATCH_SIZE):
+            batch = recipe_ids[start:start + INDEX_BATCH_SIZE]
+            placeholders = ', '.join(['%s'] * len(batch))
+            cursor.execute(
+                f'DELETE FROM {SEARCH_TABLE} WHERE {key} IN ({placeholders})',
+                batch,
+            )
+
+
+def search_recipes(queryset, query):
+    """Filter recipes matching every word of query, annotating search_rank
+
+    The rank is higher for better matches. PostgreSQL ranks its tsvector
+    index and SQLite its FTS5 table; other databases fall back to
+    substring matching with a constant rank.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return queryset.annotate(
+            search_rank=Value(0.0, output_field=FloatField())
+        )
+
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        text = ' '.join(terms)
+        matches, rank, params = POSTGRESQL_MATCHES, POSTGRESQL_RANK, [text]
+        rank_field = DecimalField(
+            max_digits=RANK_DECIMAL_PLACES + 10,
+            decimal_places=RANK_DECIMAL_PLACES
+        )
+    elif vendor == 'sqlite':
+        # Doubles round-trip exactly through str() and back
+        text = ' '.join(f'"{term}"' for term in terms)
+        matches, rank, params = SQLITE_MATCHES, SQLITE_RANK, [text]
+        rank_field = FloatField()
+    else:
+        for term in terms:
+            queryset = queryset.filter(
+                Q(title__icontains=term) |
+                Q(id__in=Recipe.objects.filter(
+                    Q(tags__name__icontains=term) |
+                    Q(ingredients__name__icontains=term)
+                ).values('id'))
+            )
+        return queryset.annotate(
+            search_rank=Value(0.0, output_field=FloatField())
+        )
+
+    # A RawSQL under id__in is wrapped in a second pair of parentheses,
+    # which both databases read as a single scalar subquery.
+    return queryset.extra(
+        where=[f'core_recipe.id IN ({matches})'], params=params
+    ).annotate(
+        search_rank=RawSQL(rank, params, output_field=rank_field)
+    )
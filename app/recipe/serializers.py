@@ -1,5 +1,136 @@
 from core.models import Tag, Ingredient, Recipe
+from recipe import fieldsets, images
+from recipe.bulk import BulkListSerializer
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.relations import MANY_RELATION_KWARGS
+
+
+class ImageVariantsField(serializers.Field):
+    """Read only URLs of the resized variants of a recipe image"""
+    model_fields = ('image', 'image_variants_ready')
+
+    def __init__(self, **kwargs):
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, recipe):
+        if not recipe.image or not recipe.image_variants_ready:
+            return None
+
+        return self.variant_urls(recipe.image.name)
+
+    def variant_urls(self, name):
+        """Return the URLs of the variants of the image stored as name"""
+        storage = images.get_storage()
+        request = self.context.get('request')
+        urls = {}
+        for variant in images.VARIANTS:
+            url = storage.url(images.variant_name(name, variant))
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            urls[variant] = url
+
+        return urls
+
+
+class UserOwnedManyRelatedField(serializers.ManyRelatedField):
+    """List of primary keys resolved with a single query
+
+    Every ID submitted for the field is looked up in one `id__in` query,
+    and all missing IDs are reported together. When the field belongs to
+    the items of a list serializer, the IDs of every item are resolved at
+    once and shared between the items.
+    """
+
+    def get_instances(self, pks):
+        """Return the related objects with the given pks, by pk"""
+        root = self.root
+        if not isinstance(root, serializers.ListSerializer):
+            return self.child_relation.get_queryset().in_bulk(set(pks))
+
+        cache = root.__dict__.setdefault('_related_instances', {})
+        if self.field_name not in cache:
+            submitted = set()
+            for item in root.initial_data:
+                values = item.get(self.field_name) \
+                    if isinstance(item, dict) else None
+                for value in values if isinstance(values, list) else ():
+                    try:
+                        submitted.add(self.child_relation.to_pk(value))
+                    except serializers.ValidationError:
+                        pass
+            cache[self.field_name] = \
+                self.child_relation.get_queryset().in_bulk(submitted)
+
+        return cache[self.field_name]
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+
+        pks = [self.child_relation.to_pk(item) for item in data]
+        instances = self.get_instances(pks)
+        missing = [pk for pk in dict.fromkeys(pks) if pk not in instances]
+        if missing:
+            message = self.child_relation.error_messages['does_not_exist']
+            raise serializers.ValidationError(
+                [message.format(pk_value=pk) for pk in missing]
+            )
+
+        return [instances[pk] for pk in pks]
+
+
+class UserOwnedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Primary key of an object owned by the requesting user"""
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return UserOwnedManyRelatedField(**list_kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        request = self.context.get('request')
+        if request is None:
+            return queryset.none()
+
+        return queryset.filter(user=request.user)
+
+    def to_pk(self, data):
+        """Return a submitted value as an integer primary key"""
+        if self.pk_field is not None:
+            data = self.pk_field.to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            return int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+
+class SparseFieldsetMixin:
+    """Leave out of read responses the fields dropped by ?fields= and
+    ?exclude=, see recipe.fieldsets"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS:
+            return
+
+        selected = fieldsets.selected_fields(
+            request.query_params, list(self.fields)
+        )
+        if selected is not None:
+            for name in set(self.fields) - set(selected):
+                self.fields.pop(name)
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -9,6 +140,7 @@ class TagSerializer(serializers.ModelSerializer):
         model = Tag
         fields = ('id', 'name')
         read_only_fields = ('id',)
+        list_serializer_class = BulkListSerializer
 
 
 class IngredientSerializer(serializers.ModelSerializer):
@@ -18,26 +150,41 @@ class IngredientSerializer(serializers.ModelSerializer):
         model = Ingredient
         fields = ('id', 'name')
         read_only_fields = ('id',)
+        list_serializer_class = BulkListSerializer
 
 
-class RecipeSerializer(serializers.ModelSerializer):
+class RecipeSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for the recipe object"""
-    ingredients = serializers.PrimaryKeyRelatedField(
+    ingredients = UserOwnedPrimaryKeyRelatedField(
         many=True,
         queryset=Ingredient.objects.all()
     )
-    tags = serializers.PrimaryKeyRelatedField(
+    tags = UserOwnedPrimaryKeyRelatedField(
         many=True,
         queryset=Tag.objects.all()
     )
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = Recipe
         fields = (
             'id', 'title', 'ingredients', 'tags', 'time_minutes', 'price',
-            'link',
+            'link', 'image_variants',
         )
         read_only_fields = ('id',)
+        list_serializer_class = BulkListSerializer
+
+    def create(self, validated_data):
+        """Create a recipe and link the already resolved tags/ingredients"""
+        relations = {
+            name: validated_data.pop(name)
+            for name in ('tags', 'ingredients') if name in validated_data
+        }
+        recipe = super().create(validated_data)
+        for name, related in relations.items():
+            getattr(recipe, name).add(*related)
+
+        return recipe
 
 
 class RecipeDetailSerializer(RecipeSerializer):
@@ -48,8 +195,9 @@ class RecipeDetailSerializer(RecipeSerializer):
 
 class RecipeImageSerializer(serializers.ModelSerializer):
     """Serializer for uploading image to recipes"""
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = Recipe
-        fields = ('id', 'image')
+        fields = ('id', 'image', 'image_variants')
         read_only_fields = ('id',)
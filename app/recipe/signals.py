@@ -0,0 +1,165 @@
+from core.models import Tag, Ingredient, Recipe
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_save, \
+    pre_delete, m2m_changed
+from django.dispatch import receiver
+from recipe import autocomplete, images, search
+from recipe.bulk import bulk_saved
+from recipe.cache import bump_user_version
+
+
+def invalidate_user(user_id):
+    """Bump the user's data version now and again once committed
+
+    The second bump stops a read that ran between the write and the
+    commit from caching pre-write data under the new version.
+    """
+    bump_user_version(user_id)
+    transaction.on_commit(lambda: bump_user_version(user_id))
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredient)
+def invalidate_owner(sender, instance, **kwargs):
+    """Invalidate cached responses of the owner of a changed object"""
+    invalidate_user(instance.user_id)
+
+
+@receiver(bulk_saved)
+def invalidate_bulk_owners(sender, objects, **kwargs):
+    """Invalidate cached responses of everyone owning saved objects"""
+    for user_id in {obj.user_id for obj in objects}:
+        invalidate_user(user_id)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+def autocomplete_saved_name(sender, instance, **kwargs):
+    """Add a new or renamed tag or ingredient to the name index"""
+    autocomplete.name_saved(instance)
+
+
+@receiver(bulk_saved, sender=Tag)
+@receiver(bulk_saved, sender=Ingredient)
+def autocomplete_bulk_names(sender, objects, **kwargs):
+    """Add tags or ingredients created in bulk to the name index"""
+    for obj in objects:
+        autocomplete.name_saved(obj)
+
+
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredient)
+def autocomplete_deleted_name(sender, instance, **kwargs):
+    """Remove a deleted tag or ingredient from the name index"""
+    autocomplete.name_deleted(sender, instance.user_id, instance.pk)
+
+
+@receiver(post_save, sender=Recipe)
+def index_saved_recipe(sender, instance, **kwargs):
+    """Update the search index entry of a saved recipe"""
+    search.index_recipes([instance.pk])
+
+
+@receiver(bulk_saved, sender=Recipe)
+def index_bulk_recipes(sender, objects, **kwargs):
+    """Update the search index entries of recipes saved in bulk"""
+    search.index_recipes([obj.pk for obj in objects])
+
+
+@receiver(post_delete, sender=Recipe)
+def unindex_deleted_recipe(sender, instance, **kwargs):
+    """Drop a deleted recipe from the search index"""
+    search.remove_recipes([instance.pk])
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+def index_renamed_attribute(sender, instance, created, **kwargs):
+    """Reindex the recipes of a renamed tag or ingredient"""
+    if not created:
+        search.index_recipes(
+            instance.recipe_set.values_list('id', flat=True)
+        )
+
+
+@receiver(pre_delete, sender=Tag)
+@receiver(pre_delete, sender=Ingredient)
+def remember_attribute_recipes(sender, instance, **kwargs):
+    """Note the recipes of a tag or ingredient about to be deleted"""
+    instance._search_recipe_ids = list(
+        instance.recipe_set.values_list('id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredient)
+def index_deleted_attribute(sender, instance, **kwargs):
+    """Reindex the recipes a deleted tag or ingredient was removed from"""
+    search.index_recipes(instance.__dict__.pop('_search_recipe_ids', []))
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def index_recipe_relations(sender, instance, action, reverse, pk_set,
+                           **kwargs):
+    """Reindex recipes whose tags or ingredients changed"""
+    if not reverse:
+        recipe_ids = [instance.pk]
+    elif action == 'pre_clear':
+        instance._search_recipe_ids = list(
+            instance.recipe_set.values_list('id', flat=True)
+        )
+        return
+    elif action == 'post_clear':
+        recipe_ids = instance.__dict__.pop('_search_recipe_ids', [])
+    else:
+        recipe_ids = pk_set or []
+
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        search.index_recipes(recipe_ids)
+
+
+@receiver(pre_save, sender=Recipe)
+def remember_replaced_image(sender, instance, **kwargs):
+    """Note the image a recipe had before a new one is saved over it"""
+    image = instance.image
+    if instance.pk and image and not image._committed:
+        instance._replaced_image = Recipe.objects.filter(
+            pk=instance.pk
+        ).values_list('image', flat=True).first()
+
+
+@receiver(post_save, sender=Recipe)
+def release_replaced_image(sender, instance, **kwargs):
+    """Remove the previous image of a recipe if nothing else uses it"""
+    name = instance.__dict__.pop('_replaced_image', None)
+    if name and name != instance.image.name:
+        transaction.on_commit(lambda: images.release_image(name))
+
+
+@receiver(post_delete, sender=Recipe)
+def release_deleted_image(sender, instance, **kwargs):
+    """Remove the image of a deleted recipe if nothing else uses it"""
+    name = instance.image.name
+    if name:
+        transaction.on_commit(lambda: images.release_image(name))
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def invalidate_recipe_relations(sender, instance, action, **kwargs):
+    """Invalidate cached responses when recipe relations change"""
+    if action.startswith('post_'):
+        invalidate_user(instance.user_id)
+
+
+@receiver(post_save, sender=get_user_model())
+def invalidate_new_user(sender, instance, created, **kwargs):
+    """Start new users on a fresh version in case their ID is reused"""
+    if created:
+        bump_user_version(instance.pk)
@@ -0,0 +1,116 @@
+from core.models import Recipe, Tag, Ingredient
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from recipe import autocomplete
+from recipe.cache import get_cache
+from rest_framework import status
+from rest_framework.test import APIClient
+
+TAGS_URL = reverse('recipe:tag-list')
+INGREDIENTS_URL = reverse('recipe:ingredient-list')
+
+
+class AutocompleteApiTests(TestCase):
+    """Test completing tag and ingredient names with ?prefix="""
+
+    def setUp(self):
+        autocomplete._indexes.clear()
+        self.addCleanup(autocomplete._indexes.clear)
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'test@test.com', 'testPassword'
+        )
+        self.client.force_authenticate(self.user)
+        for name in ('Pepper', 'paprika', 'Parsley', 'Salt', 'pasta'):
+            Ingredient.objects.create(user=self.user, name=name)
+
+    def complete(self, prefix, url=INGREDIENTS_URL, **params):
+        """Return the names completing prefix"""
+        res = self.client.get(url, dict(params, prefix=prefix))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        return [item['name'] for item in res.data]
+
+    def test_prefix_matches_sorted_case_insensitively(self):
+        """Test names starting with the prefix are returned in order"""
+        self.assertEqual(
+            self.complete('pa'), ['paprika', 'Parsley', 'pasta']
+        )
+        self.assertEqual(self.complete('PEP'), ['Pepper'])
+        self.assertEqual(self.complete('x'), [])
+
+    def test_prefix_limit(self):
+        """Test only the first limit matches are returned"""
+        self.assertEqual(self.complete('p', limit=2), ['paprika', 'Parsley'])
+
+    def test_warm_index_needs_no_queries(self):
+        """Test a warm index answers without the database"""
+        cold = self.complete('pa')
+
+        with self.assertNumQueries(0):
+            warm = self.complete('pa')
+
+        self.assertEqual(warm, cold)
+
+    def test_index_kept_warm_by_changes(self):
+        """Test new, renamed and deleted names are reflected at once"""
+        self.complete('pa')
+        pasta = Ingredient.objects.get(name='pasta')
+
+        Ingredient.objects.create(user=self.user, name='Parmesan')
+        pasta.name = 'Noodles'
+        pasta.save()
+        Ingredient.objects.get(name='paprika').delete()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.complete('pa'), ['Parmesan', 'Parsley'])
+
+    def test_stale_index_falls_back_to_database(self):
+        """Test a change made by another process is seen"""
+        self.complete('pa')
+        Ingredient.objects.filter(name='pasta').update(name='Pastry')
+        get_cache().set(
+            autocomplete.version_key(Ingredient, self.user.pk), 'other', None
+        )
+
+        self.assertEqual(
+            self.complete('pas'), ['Pastry']
+        )
+        with self.assertNumQueries(0):
+            self.assertEqual(self.complete('pas'), ['Pastry'])
+
+    def test_old_index_rebuilt(self):
+        """Test an index past its max age is reloaded from the database"""
+        self.complete('pa')
+        Ingredient.objects.filter(name='pasta').update(name='Pastry')
+
+        with override_settings(RECIPE_AUTOCOMPLETE_MAX_AGE=-1):
+            self.assertEqual(self.complete('pas'), ['Pastry'])
+
+    def test_prefix_limited_to_user(self):
+        """Test names of other users are not completed"""
+        other = get_user_model().objects.create_user(
+            'other@test.com', 'testPassword'
+        )
+        Tag.objects.create(user=other, name='Vegan')
+        Tag.objects.create(user=self.user, name='Vegetarian')
+
+        self.assertEqual(self.complete('veg', url=TAGS_URL), ['Vegetarian'])
+
+    def test_prefix_assigned_only(self):
+        """Test assigned_only completes names used by recipes"""
+        recipe = Recipe.objects.create(
+            user=self.user, title='Soup', time_minutes=5, price=1
+        )
+        recipe.ingredients.add(Ingredient.objects.get(name='Parsley'))
+
+        self.assertEqual(
+            self.complete('pa', assigned_only=1), ['Parsley']
+        )
+
+    def test_invalid_limit(self):
+        """Test a non numeric limit is rejected"""
+        res = self.client.get(INGREDIENTS_URL, {'prefix': 'p', 'limit': 'x'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
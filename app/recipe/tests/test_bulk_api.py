@@ -0,0 +1,252 @@
+from core.models import Recipe, Tag, Ingredient
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+RECIPE_BULK_URL = reverse('recipe:recipe-bulk')
+RECIPE_URL = reverse('recipe:recipe-list')
+TAG_BULK_URL = reverse('recipe:tag-bulk')
+INGREDIENT_BULK_URL = reverse('recipe:ingredient-bulk')
+
+
+def sample_recipe(user, **params):
+    """Create and return a sample recipe"""
+    defaults = {
+        'title': 'Sample Recipe',
+        'time_minutes': 10,
+        'price': 5.00
+    }
+    defaults.update(params)
+
+    return Recipe.objects.create(user=user, **defaults)
+
+
+class BulkRecipeApiTests(TestCase):
+    """Test the bulk recipe endpoint"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'test@test.com', 'testPassword'
+        )
+        self.client.force_authenticate(self.user)
+        self.tag = Tag.objects.create(user=self.user, name='Vegan')
+        self.ingredient = Ingredient.objects.create(
+            user=self.user, name='Salt'
+        )
+
+    def payload(self, count):
+        return [
+            {
+                'title': f'Recipe {i}',
+                'time_minutes': i + 1,
+                'price': '2.50',
+                'tags': [self.tag.id],
+                'ingredients': [self.ingredient.id],
+            }
+            for i in range(count)
+        ]
+
+    def test_bulk_create_recipes(self):
+        """Test every recipe and its relations are created"""
+        res = self.client.post(RECIPE_BULK_URL, self.payload(3), format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data), 3)
+        for item in res.data:
+            recipe = Recipe.objects.get(id=item['id'])
+            self.assertEqual(recipe.user, self.user)
+            self.assertEqual(item['title'], recipe.title)
+            self.assertEqual(list(recipe.tags.all()), [self.tag])
+            self.assertEqual(item['ingredients'], [self.ingredient.id])
+
+    def test_bulk_create_invalid_item_creates_nothing(self):
+        """Test one invalid item rejects the whole batch per item"""
+        payload = self.payload(3)
+        payload[1]['time_minutes'] = 'soon'
+
+        res = self.client.post(RECIPE_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0], {})
+        self.assertIn('time_minutes', res.data[1])
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_bulk_create_requires_list(self):
+        """Test the bulk endpoint only accepts a list"""
+        res = self.client.post(
+            RECIPE_BULK_URL, self.payload(1)[0], format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(RECIPE_BULK_MAX_ITEMS=2)
+    def test_bulk_create_limited(self):
+        """Test lists longer than the limit are rejected"""
+        res = self.client.post(RECIPE_BULK_URL, self.payload(3), format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_bulk_create_refreshes_cached_list(self):
+        """Test recipes created in bulk appear in a cached list"""
+        self.client.get(RECIPE_URL)
+
+        self.client.post(RECIPE_BULK_URL, self.payload(2), format='json')
+        res = self.client.get(RECIPE_URL)
+
+        self.assertEqual(len(res.data['results']), 2)
+
+    def test_bulk_update_recipes(self):
+        """Test partial updates are applied to every listed recipe"""
+        recipe1 = sample_recipe(self.user, title='One')
+        recipe2 = sample_recipe(self.user, title='Two')
+        recipe2.tags.add(self.tag)
+        new_tag = Tag.objects.create(user=self.user, name='Quick')
+
+        res = self.client.patch(RECIPE_BULK_URL, [
+            {'id': recipe1.id, 'title': 'First'},
+            {'id': recipe2.id, 'tags': [new_tag.id]},
+        ], format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        recipe1.refresh_from_db()
+        self.assertEqual(recipe1.title, 'First')
+        self.assertEqual(list(recipe2.tags.all()), [new_tag])
+        self.assertEqual(res.data[1]['tags'], [new_tag.id])
+
+    def test_bulk_update_other_users_recipe_rejected(self):
+        """Test recipes of other users can not be updated in bulk"""
+        other = get_user_model().objects.create_user(
+            'other@test.com', 'testPassword'
+        )
+        recipe = sample_recipe(other, title='Theirs')
+
+        res = self.client.patch(
+            RECIPE_BULK_URL, [{'id': recipe.id, 'title': 'Mine'}],
+            format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.title, 'Theirs')
+
+    def test_bulk_update_requires_ids(self):
+        """Test every item of a bulk update must carry its ID"""
+        res = self.client.patch(
+            RECIPE_BULK_URL, [{'title': 'No id'}], format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('id', res.data[0])
+
+    def test_bulk_update_repeated_id_rejected(self):
+        """Test an ID listed twice in a bulk update is a client error"""
+        recipe = sample_recipe(self.user)
+
+        res = self.client.patch(RECIPE_BULK_URL, [
+            {'id': recipe.id, 'tags': [self.tag.id]},
+            {'id': recipe.id, 'tags': [self.tag.id]},
+        ], format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0], {})
+        self.assertIn('id', res.data[1])
+        self.assertFalse(recipe.tags.exists())
+
+    def test_bulk_boolean_ids_rejected(self):
+        """Test true is not taken as the ID 1 by bulk updates and deletes"""
+        recipe = sample_recipe(self.user)
+
+        res = self.client.patch(RECIPE_BULK_URL, [
+            {'id': True, 'tags': [self.tag.id]},
+        ], format='json')
+        res_delete = self.client.delete(
+            RECIPE_BULK_URL, {'ids': [True]}, format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('id', res.data[0])
+        self.assertEqual(
+            res_delete.status_code, status.HTTP_400_BAD_REQUEST
+        )
+        self.assertTrue(Recipe.objects.filter(id=recipe.id).exists())
+        self.assertFalse(recipe.tags.exists())
+
+    def test_bulk_delete_recipes(self):
+        """Test listed recipes are deleted, each reported once"""
+        recipe1 = sample_recipe(self.user)
+        recipe2 = sample_recipe(self.user)
+        kept = sample_recipe(self.user)
+
+        res = self.client.delete(
+            RECIPE_BULK_URL, {'ids': [recipe1.id, recipe2.id, recipe1.id]},
+            format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['deleted'], [recipe1.id, recipe2.id])
+        self.assertEqual(list(Recipe.objects.all()), [kept])
+
+    def test_bulk_create_resolves_relations_once(self):
+        """Test relations of every item are looked up in one query"""
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(
+                RECIPE_BULK_URL, self.payload(10), format='json'
+            )
+
+        tag_lookups = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('SELECT')
+            and '"core_tag"."id" IN' in query['sql']
+        ]
+        self.assertEqual(len(tag_lookups), 1)
+        self.assertEqual(Recipe.objects.count(), 10)
+
+
+class BulkRecipeAttrApiTests(TestCase):
+    """Test the bulk tag and ingredient endpoints"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'test@test.com', 'testPassword'
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_bulk_create_tags(self):
+        """Test tags are created for the authenticated user"""
+        res = self.client.post(
+            TAG_BULK_URL, [{'name': 'Vegan'}, {'name': 'Dessert'}],
+            format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            set(Tag.objects.filter(user=self.user).values_list(
+                'name', flat=True
+            )),
+            {'Vegan', 'Dessert'}
+        )
+        self.assertTrue(all(item['id'] for item in res.data))
+
+    def test_bulk_create_ingredients(self):
+        """Test ingredients are created for the authenticated user"""
+        res = self.client.post(
+            INGREDIENT_BULK_URL, [{'name': 'Salt'}, {'name': ''}],
+            format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('name', res.data[1])
+        self.assertFalse(Ingredient.objects.exists())
+
+    def test_bulk_update_not_allowed_for_tags(self):
+        """Test the tag bulk endpoint only creates"""
+        res = self.client.patch(TAG_BULK_URL, [], format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
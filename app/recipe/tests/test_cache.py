@@ -0,0 +1,110 @@
+from unittest.mock import patch
+
+from core.db import replicas
+from core.models import Recipe, Tag
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from recipe import images
+from recipe.cache import get_user_version
+from rest_framework.test import APIClient
+
+RECIPE_URL = reverse('recipe:recipe-list')
+TAGS_URL = reverse('recipe:tag-list')
+
+
+def sample_user(email='test@test.com', password='testPassword'):
+    """Create a sample user"""
+    return get_user_model().objects.create_user(email, password)
+
+
+def sample_recipe(user, **params):
+    """Create and return a sample recipe"""
+    defaults = {
+        'title': 'Sample Recipe',
+        'time_minutes': 10,
+        'price': 5.00
+    }
+    defaults.update(params)
+
+    return Recipe.objects.create(user=user, **defaults)
+
+
+class ListCacheTests(TestCase):
+    """Test the per-user versioned cache of list responses"""
+
+    def setUp(self):
+        self.user = sample_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_background_write_pins_owner(self):
+        """Test writes outside a request keep the owner off replicas"""
+        recipe = sample_recipe(user=self.user)
+        Recipe.objects.filter(pk=recipe.pk).update(
+            image='uploads/recipe/photo.jpg'
+        )
+        replicas.get_pin_cache().clear()
+
+        with patch.object(images, 'build_variants'):
+            images.process_recipe_image(recipe.id)
+
+        self.assertTrue(replicas.is_pinned(self.user.pk))
+
+    def test_repeated_list_served_from_cache(self):
+        """Test an unchanged list is returned without touching the db"""
+        sample_recipe(user=self.user)
+        res = self.client.get(RECIPE_URL)
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(RECIPE_URL)
+
+        self.assertEqual(cached.data, res.data)
+
+    def test_query_params_cached_separately(self):
+        """Test different query parameters do not share an entry"""
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        recipe = sample_recipe(user=self.user)
+        sample_recipe(user=self.user, title='Other')
+        recipe.tags.add(tag)
+
+        self.client.get(RECIPE_URL)
+        res = self.client.get(RECIPE_URL, {'tags': tag.id})
+
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_recipe_write_invalidates(self):
+        """Test creating and deleting recipes invalidates the list"""
+        self.client.get(RECIPE_URL)
+        recipe = sample_recipe(user=self.user)
+
+        res = self.client.get(RECIPE_URL)
+        self.assertEqual(len(res.data['results']), 1)
+
+        recipe.delete()
+        res = self.client.get(RECIPE_URL)
+        self.assertEqual(len(res.data['results']), 0)
+
+    def test_relation_change_invalidates(self):
+        """Test changing recipe tags invalidates recipe and tag lists"""
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        recipe = sample_recipe(user=self.user)
+        self.client.get(RECIPE_URL)
+        self.client.get(TAGS_URL, {'assigned_only': 1})
+
+        recipe.tags.add(tag)
+
+        res = self.client.get(RECIPE_URL)
+        self.assertEqual(res.data['results'][0]['tags'], [tag.id])
+        res = self.client.get(TAGS_URL, {'assigned_only': 1})
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_versions_are_per_user(self):
+        """Test a write only invalidates the owner's cached responses"""
+        other_user = sample_user(email='test2@test.com')
+        version = get_user_version(self.user.pk)
+
+        sample_recipe(user=other_user)
+
+        self.assertEqual(get_user_version(self.user.pk), version)
+        self.assertNotEqual(get_user_version(other_user.pk), version)
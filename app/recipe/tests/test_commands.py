@@ -0,0 +1,101 @@
+from io import StringIO
+
+from core.models import Recipe
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from recipe import search
+
+
+class RecipeCommandTests(TestCase):
+
+    def test_explain_recipe_queries(self):
+        """Test the query plans of every endpoint are printed"""
+        out = StringIO()
+        call_command(
+            'explain_recipe_queries', recipes=20, tags=5, ingredients=5,
+            stdout=out
+        )
+
+        output = out.getvalue()
+        for label in ('recipes?tags', 'tags?assigned_only', 'ingredients'):
+            self.assertIn(label, output)
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_benchmark_recipe_filters(self):
+        """Test the filter benchmark reports every filtering strategy"""
+        out = StringIO()
+        call_command(
+            'benchmark_recipe_filters', recipes=20, ids=3, repeat=1,
+            stdout=out
+        )
+
+        output = out.getvalue()
+        for label in ('chained joins', 'match=any', 'match=all'):
+            self.assertIn(label, output)
+
+    def test_benchmark_recipe_import(self):
+        """Test the import benchmark reports both import paths"""
+        out = StringIO()
+        call_command(
+            'benchmark_recipe_import', recipes=5, batch_size=2, stdout=out
+        )
+
+        output = out.getvalue()
+        for label in ('per item', 'bulk'):
+            self.assertIn(label, output)
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_rebuild_recipe_search(self):
+        """Test the rebuilt index finds recipes missing from it"""
+        user = get_user_model().objects.create_user(
+            'test@test.com', 'testPassword'
+        )
+        recipe = Recipe.objects.create(
+            user=user, title='Lost soup', time_minutes=5, price=1
+        )
+        search.remove_recipes([recipe.id])
+
+        call_command('rebuild_recipe_search', stdout=StringIO())
+
+        self.assertEqual(
+            list(search.search_recipes(Recipe.objects.all(), 'soup')),
+            [recipe]
+        )
+
+    def test_benchmark_recipe_ranges(self):
+        """Test the range benchmark reports every case"""
+        out = StringIO()
+        call_command(
+            'benchmark_recipe_ranges', recipes=40, users=2, repeat=1,
+            stdout=out
+        )
+
+        output = out.getvalue()
+        for label in ('full fetch', 'max_time=30', 'ordering=price'):
+            self.assertIn(label, output)
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_benchmark_recipe_serializers(self):
+        """Test the serializer benchmark reports every list"""
+        out, err = StringIO(), StringIO()
+        call_command(
+            'benchmark_recipe_serializers', recipes=10, repeat=1,
+            stdout=out, stderr=err
+        )
+
+        output = out.getvalue()
+        for label in ('recipes:', 'tags:', 'ingredients:'):
+            self.assertIn(label, output)
+        self.assertEqual(err.getvalue(), '')
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_benchmark_recipe_export(self):
+        """Test the export benchmark reports both ways of exporting"""
+        out = StringIO()
+        call_command('benchmark_recipe_export', recipes=[5], stdout=out)
+
+        output = out.getvalue()
+        for label in ('full:', 'streamed:'):
+            self.assertIn(label, output)
+        self.assertFalse(Recipe.objects.exists())
@@ -0,0 +1,178 @@
+from core.models import Recipe, Tag
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+RECIPE_URL = reverse('recipe:recipe-list')
+TAGS_URL = reverse('recipe:tag-list')
+NO_CACHE = {
+    'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+}
+
+
+def detail_url(recipe_id):
+    """Return recipe detail URl"""
+    return reverse('recipe:recipe-detail', args=[recipe_id])
+
+
+def sample_user(email='test@test.com', password='testPassword'):
+    """Create a sample user"""
+    return get_user_model().objects.create_user(email, password)
+
+
+def sample_recipe(user, **params):
+    """Create and return a sample recipe"""
+    defaults = {
+        'title': 'Sample Recipe',
+        'time_minutes': 10,
+        'price': 5.00
+    }
+    defaults.update(params)
+
+    return Recipe.objects.create(user=user, **defaults)
+
+
+@override_settings(CACHES=NO_CACHE)
+class ConditionalGetTests(TestCase):
+    """Test ETag and If-None-Match handling of the recipe endpoints"""
+
+    def setUp(self):
+        self.user = sample_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.recipe = sample_recipe(user=self.user)
+
+    def assertNotModified(self, url, etag, if_none_match=None):
+        """Assert a conditional GET is answered with a bare 304"""
+        res = self.client.get(
+            url, HTTP_IF_NONE_MATCH=if_none_match or etag
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res['ETag'], etag)
+        self.assertIn('Accept', res['Vary'])
+        self.assertFalse(res.content)
+
+    def test_list_not_modified(self):
+        """Test a matching If-None-Match on the list returns 304"""
+        res = self.client.get(RECIPE_URL)
+        self.assertIn('ETag', res)
+
+        with self.assertNumQueries(1):
+            self.assertNotModified(RECIPE_URL, res['ETag'])
+
+    def test_weak_and_listed_etags_match(self):
+        """Test weak validators and lists of ETags are accepted"""
+        etag = self.client.get(RECIPE_URL)['ETag']
+
+        self.assertNotModified(RECIPE_URL, etag, f'"other", W/{etag}')
+
+    def test_list_etag_changes_with_data(self):
+        """Test writes and relation changes produce a new list ETag"""
+        etag = self.client.get(RECIPE_URL)['ETag']
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        self.recipe.tags.add(tag)
+
+        res = self.client.get(RECIPE_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res['ETag'], etag)
+
+        etag = res['ETag']
+        self.recipe.delete()
+        res = self.client.get(RECIPE_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_list_etag_depends_on_query(self):
+        """Test each page and filter gets its own ETag"""
+        etag = self.client.get(RECIPE_URL)['ETag']
+
+        res = self.client.get(
+            RECIPE_URL, {'page_size': 1}, HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_list_etag_depends_on_renderer(self):
+        """Test the JSON and browsable representations differ in ETag"""
+        res = self.client.get(RECIPE_URL)
+        self.assertIn('Accept', res['Vary'])
+
+        res = self.client.get(
+            RECIPE_URL, HTTP_ACCEPT='text/html',
+            HTTP_IF_NONE_MATCH=res['ETag']
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('Accept', res['Vary'])
+
+    def test_detail_not_modified(self):
+        """Test a matching If-None-Match on a recipe skips loading it"""
+        url = detail_url(self.recipe.id)
+        etag = self.client.get(url)['ETag']
+
+        with self.assertNumQueries(1):
+            self.assertNotModified(url, etag)
+
+    def test_detail_etag_changes_with_tag_rename(self):
+        """Test renaming a tag changes the ETag of recipes using it"""
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        self.recipe.tags.add(tag)
+        url = detail_url(self.recipe.id)
+        etag = self.client.get(url)['ETag']
+
+        tag.name = 'Vegetarian'
+        tag.save()
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['tags'][0]['name'], 'Vegetarian')
+
+    def test_assigned_tags_etag_changes_on_assignment(self):
+        """Test assigning a tag changes the assigned_only tag list ETag"""
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        params = {'assigned_only': 1}
+        etag = self.client.get(TAGS_URL, params)['ETag']
+
+        self.recipe.tags.add(tag)
+        res = self.client.get(TAGS_URL, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        etag = res['ETag']
+        self.recipe.tags.clear()
+        res = self.client.get(TAGS_URL, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'], [])
+
+
+class CachedConditionalGetTests(TestCase):
+    """Test conditional requests answered from the response cache"""
+
+    def setUp(self):
+        self.user = sample_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        sample_recipe(user=self.user)
+
+    def test_cached_list_not_modified(self):
+        """Test a cached list answers If-None-Match without queries"""
+        etag = self.client.get(RECIPE_URL)['ETag']
+
+        with self.assertNumQueries(0):
+            res = self.client.get(RECIPE_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertIn('Accept', res['Vary'])
+
+    def test_cached_list_per_renderer(self):
+        """Test a cached JSON list does not answer a browsable request"""
+        etag = self.client.get(RECIPE_URL)['ETag']
+
+        res = self.client.get(
+            RECIPE_URL, HTTP_ACCEPT='text/html', HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res['ETag'], etag)
+        self.assertIn('Accept', res['Vary'])
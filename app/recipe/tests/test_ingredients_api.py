@@ -1,6 +1,8 @@
 from core.models import Ingredient, Recipe
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from recipe.serializers import IngredientSerializer
 from rest_framework import status
@@ -58,7 +60,7 @@ class PrivateIngredientsApiTests(TestCase):
         serializer = IngredientSerializer(ingredients, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_ingredients_limited_to_user(self):
         """
@@ -72,8 +74,8 @@ class PrivateIngredientsApiTests(TestCase):
         res = self.client.get(INGREDIENTS_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data[0]['name'], ingredient.name)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'][0]['name'], ingredient.name)
 
     def test_create_ingredient_successful(self):
         """Test create a new ingredient"""
@@ -108,8 +110,8 @@ class PrivateIngredientsApiTests(TestCase):
 
         serializer1 = IngredientSerializer(ing1)
         serializer2 = IngredientSerializer(ing2)
-        self.assertIn(serializer1.data, res.data)
-        self.assertNotIn(serializer2.data, res.data)
+        self.assertIn(serializer1.data, res.data['results'])
+        self.assertNotIn(serializer2.data, res.data['results'])
 
     def test_retrieve_ingredient_assigned_unique(self):
         """Test filtering ingredients by assigned returns unique items"""
@@ -124,4 +126,40 @@ class PrivateIngredientsApiTests(TestCase):
             {'assigned_only': 1}
         )
 
-        self.assertEqual(len(res.data), 1)
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_assigned_only_matches_join_filter(self):
+        """Test assigned_only returns what the distinct join returned"""
+        other_user = sample_user('test2@test.com', 'testPassword')
+        ingredients = [
+            Ingredient.objects.create(user=self.user, name=f'ingredient{i}')
+            for i in range(4)
+        ]
+        other = Ingredient.objects.create(user=other_user, name='Other')
+        for i in range(3):
+            recipe = sample_recipe(user=self.user, title=f'dish{i}')
+            recipe.ingredients.add(ingredients[0], ingredients[1])
+        other_recipe = sample_recipe(user=other_user)
+        other_recipe.ingredients.add(ingredients[2], other)
+
+        res = self.client.get(INGREDIENTS_URL, {'assigned_only': 1})
+
+        expected = Ingredient.objects.filter(
+            user=self.user,
+            recipe__isnull=False
+        ).order_by('-name', 'id').distinct()
+        serializer = IngredientSerializer(expected, many=True)
+        self.assertEqual(res.data['results'], serializer.data)
+
+    def test_list_queries_without_distinct(self):
+        """Test neither list mode asks the database to deduplicate rows"""
+        recipe = sample_recipe(user=self.user)
+        recipe.ingredients.add(
+            Ingredient.objects.create(user=self.user, name='A')
+        )
+
+        for params in ({}, {'assigned_only': 1}):
+            with CaptureQueriesContext(connection) as ctx:
+                self.client.get(INGREDIENTS_URL, params)
+            for query in ctx.captured_queries:
+                self.assertNotIn('DISTINCT', query['sql'])
@@ -1,16 +1,22 @@
+import json
 import os
 import tempfile
+from unittest.mock import patch
 
 from PIL import Image
 from core.models import Recipe, Tag, Ingredient
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from recipe.pagination import KeysetCursorPagination
 from recipe.serializers import RecipeSerializer, RecipeDetailSerializer
 from rest_framework import status
 from rest_framework.test import APIClient
 
 RECIPE_URL = reverse('recipe:recipe-list')
+EXPORT_URL = reverse('recipe:recipe-export')
 
 
 def image_upload_url(recipe_id):
@@ -82,7 +88,7 @@ class PrivateRecipeApiTests(TestCase):
         serializer = RecipeSerializer(recipes, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_recipes_limited_to_user(self):
         """Test only recipes for the logged in user can be accessed"""
@@ -96,8 +102,186 @@ class PrivateRecipeApiTests(TestCase):
         serializer = RecipeSerializer(recipes, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'], serializer.data)
+
+    def test_recipe_list_paginated_by_cursor(self):
+        """Test recipes are paged newest first following the next links"""
+        recipes = [
+            sample_recipe(user=self.user, title=f'dish{i}') for i in range(5)
+        ]
+
+        ids = []
+        res = self.client.get(RECIPE_URL, {'page_size': 2})
+        while True:
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(res.data['results']), 2)
+            ids.extend(recipe['id'] for recipe in res.data['results'])
+            if not res.data['next']:
+                break
+            res = self.client.get(res.data['next'])
+
+        self.assertEqual(ids, [recipe.id for recipe in reversed(recipes)])
+
+    def test_recipe_list_page_size_capped(self):
+        """Test the requested page size cannot exceed the maximum"""
+        for i in range(3):
+            sample_recipe(user=self.user, title=f'dish{i}')
+
+        with patch.object(KeysetCursorPagination, 'max_page_size', 2):
+            res = self.client.get(RECIPE_URL, {'page_size': 10 ** 6})
+
+        self.assertEqual(len(res.data['results']), 2)
+
+    def test_recipe_list_invalid_cursor(self):
+        """Test a malformed cursor is rejected"""
+        res = self.client.get(RECIPE_URL, {'cursor': 'cD1nYXJiYWdl'})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_filter_recipes_by_tags_and_ingredients_unique(self):
+        """Test recipes matching several tags and ingredients appear once"""
+        recipe1 = sample_recipe(user=self.user, title='dish1')
+        recipe2 = sample_recipe(user=self.user, title='dish2')
+        tags = [sample_tag(user=self.user, name=f'tag{i}') for i in range(2)]
+        ings = [
+            sample_ingredient(user=self.user, name=f'ing{i}') for i in range(2)
+        ]
+        recipe1.tags.add(*tags)
+        recipe1.ingredients.add(*ings)
+        recipe2.tags.add(tags[0])
+
+        res = self.client.get(RECIPE_URL, {
+            'tags': ','.join(str(tag.id) for tag in tags),
+            'ingredients': ','.join(str(ing.id) for ing in ings),
+        })
+
+        self.assertEqual(
+            [recipe['id'] for recipe in res.data['results']],
+            [recipe1.id]
+        )
+
+    def test_filter_recipes_match_all(self):
+        """Test match=all only returns recipes with every given tag"""
+        recipe1 = sample_recipe(user=self.user, title='dish1')
+        recipe2 = sample_recipe(user=self.user, title='dish2')
+        recipe3 = sample_recipe(user=self.user, title='dish3')
+        tag1 = sample_tag(user=self.user, name='tag1')
+        tag2 = sample_tag(user=self.user, name='tag2')
+        recipe1.tags.add(tag1, tag2)
+        recipe2.tags.add(tag1)
+        recipe3.tags.add(tag2)
+
+        tag_ids = f'{tag1.id},{tag2.id}'
+        res_all = self.client.get(
+            RECIPE_URL,
+            {'tags': tag_ids, 'match': 'all'}
+        )
+        res_any = self.client.get(RECIPE_URL, {'tags': tag_ids})
+
+        self.assertEqual(
+            [recipe['id'] for recipe in res_all.data['results']],
+            [recipe1.id]
+        )
+        self.assertEqual(
+            [recipe['id'] for recipe in res_any.data['results']],
+            [recipe3.id, recipe2.id, recipe1.id]
+        )
+
+    def test_filter_recipes_invalid_match(self):
+        """Test an unknown match mode is rejected"""
+        res = self.client.get(RECIPE_URL, {'tags': '1', 'match': 'some'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_filter_recipes_by_time_and_price(self):
+        """Test recipes are filtered by time and price ranges"""
+        quick_cheap = sample_recipe(user=self.user, time_minutes=20, price=8)
+        sample_recipe(user=self.user, time_minutes=45, price=8)
+        sample_recipe(user=self.user, time_minutes=20, price=12)
+        slow = sample_recipe(user=self.user, time_minutes=90, price=30)
+
+        res = self.client.get(
+            RECIPE_URL, {'max_time': 30, 'max_price': '10.00'}
+        )
+        res_min = self.client.get(
+            RECIPE_URL, {'min_time': 60, 'min_price': '12.01'}
+        )
+
+        self.assertEqual(
+            [recipe['id'] for recipe in res.data['results']],
+            [quick_cheap.id]
+        )
+        self.assertEqual(
+            [recipe['id'] for recipe in res_min.data['results']], [slow.id]
+        )
+
+    def test_filter_recipes_invalid_range(self):
+        """Test non numeric range bounds are rejected"""
+        res = self.client.get(
+            RECIPE_URL, {'max_time': 'soon', 'min_price': 'NaN'}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('max_time', res.data)
+        self.assertIn('min_price', res.data)
+
+    def test_filter_recipes_out_of_range(self):
+        """Test time bounds past an IntegerField are rejected"""
+        sample_recipe(user=self.user, time_minutes=20, price=8)
+
+        res = self.client.get(
+            RECIPE_URL, {'min_time': '99999999999999999999'}
+        )
+        res_low = self.client.get(RECIPE_URL, {'max_time': -2 ** 31 - 1})
+        res_price = self.client.get(RECIPE_URL, {'max_price': '1e10'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('min_time', res.data)
+        self.assertEqual(res_low.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res_price.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res_price.data['results']), 1)
+
+    def test_order_recipes_by_price_paginated(self):
+        """Test ordering by price pages through ties without repeats"""
+        recipes = [
+            sample_recipe(user=self.user, title=f'dish{i}', price=i % 2)
+            for i in range(5)
+        ]
+
+        ids = []
+        res = self.client.get(
+            RECIPE_URL, {'ordering': '-price', 'page_size': 2}
+        )
+        while True:
+            ids.extend(recipe['id'] for recipe in res.data['results'])
+            if not res.data['next']:
+                break
+            res = self.client.get(res.data['next'])
+
+        expected = sorted(
+            recipes, key=lambda recipe: (recipe.price, recipe.id),
+            reverse=True
+        )
+        self.assertEqual(ids, [recipe.id for recipe in expected])
+
+    def test_order_recipes_by_time(self):
+        """Test recipes are ordered by preparation time"""
+        slow = sample_recipe(user=self.user, time_minutes=60)
+        quick = sample_recipe(user=self.user, time_minutes=5)
+
+        res = self.client.get(RECIPE_URL, {'ordering': 'time_minutes'})
+
+        self.assertEqual(
+            [recipe['id'] for recipe in res.data['results']],
+            [quick.id, slow.id]
+        )
+
+    def test_order_recipes_invalid_field(self):
+        """Test ordering by an unsupported field is rejected"""
+        res = self.client.get(RECIPE_URL, {'ordering': 'title'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
 
     def test_view_recipe_detail(self):
         """Test viewing a recipe detail"""
@@ -111,6 +295,177 @@ class PrivateRecipeApiTests(TestCase):
         serializer = RecipeDetailSerializer(recipe)
         self.assertEqual(res.data, serializer.data)
 
+    def _create_recipes_with_relations(self, count):
+        """Create recipes that each have a tag and an ingredient"""
+        for i in range(count):
+            recipe = sample_recipe(user=self.user, title=f'dish{i}')
+            recipe.tags.add(sample_tag(user=self.user, name=f'tag{i}'))
+            recipe.ingredients.add(
+                sample_ingredient(user=self.user, name=f'ing{i}')
+            )
+
+    def _count_queries(self, url):
+        """Return the number of queries made by a GET to the url"""
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(url)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        return len(ctx.captured_queries)
+
+    def test_recipe_list_query_count_constant(self):
+        """Test listing recipes does not query relations per recipe"""
+        self._create_recipes_with_relations(2)
+        small = self._count_queries(RECIPE_URL)
+
+        self._create_recipes_with_relations(10)
+        large = self._count_queries(RECIPE_URL)
+
+        self.assertEqual(small, large)
+
+    def test_view_recipe_detail_query_count(self):
+        """Test recipe detail loads each relation in a single query"""
+        recipe = sample_recipe(user=self.user)
+        for i in range(5):
+            recipe.tags.add(sample_tag(user=self.user, name=f'tag{i}'))
+            recipe.ingredients.add(
+                sample_ingredient(user=self.user, name=f'ing{i}')
+            )
+
+        with self.assertNumQueries(4):
+            res = self.client.get(detail_url(recipe.id))
+
+        self.assertEqual(res.data, RecipeDetailSerializer(recipe).data)
+
+    def test_recipe_list_sparse_fields(self):
+        """Test ?fields= limits the recipes to the listed fields"""
+        self._create_recipes_with_relations(2)
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(RECIPE_URL, {'fields': 'id,title'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        for recipe in res.data['results']:
+            self.assertEqual(set(recipe), {'id', 'title'})
+        sql = ' '.join(query['sql'] for query in ctx.captured_queries)
+        self.assertNotIn('core_recipe_tags', sql)
+        self.assertNotIn('"core_recipe"."price"', sql)
+
+    def test_recipe_list_exclude_fields(self):
+        """Test ?exclude= drops fields and the relations they read"""
+        self._create_recipes_with_relations(2)
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(
+                RECIPE_URL, {'exclude': 'tags,ingredients,image_variants'}
+            )
+
+        self.assertEqual(
+            set(res.data['results'][0]),
+            {'id', 'title', 'time_minutes', 'price', 'link'}
+        )
+        sql = ' '.join(query['sql'] for query in ctx.captured_queries)
+        self.assertNotIn('core_recipe_ingredients', sql)
+        self.assertNotIn('"core_recipe"."image"', sql)
+
+    def test_recipe_list_sparse_fields_ordered_pages(self):
+        """Test cursors keep working when the ordering field is left out"""
+        recipes = [
+            sample_recipe(user=self.user, time_minutes=i % 2)
+            for i in range(3)
+        ]
+
+        ids = []
+        res = self.client.get(RECIPE_URL, {
+            'fields': 'id', 'ordering': 'time_minutes', 'page_size': 2
+        })
+        ids.extend(recipe['id'] for recipe in res.data['results'])
+        res = self.client.get(res.data['next'])
+        ids.extend(recipe['id'] for recipe in res.data['results'])
+
+        expected = sorted(
+            recipes, key=lambda recipe: (recipe.time_minutes, recipe.id)
+        )
+        self.assertEqual(ids, [recipe.id for recipe in expected])
+
+    def test_recipe_detail_sparse_fields(self):
+        """Test ?fields= on a detail skips the relations left out"""
+        recipe = sample_recipe(user=self.user)
+        recipe.tags.add(sample_tag(user=self.user))
+
+        with self.assertNumQueries(3):
+            res = self.client.get(
+                detail_url(recipe.id), {'fields': 'title,tags'}
+            )
+
+        self.assertEqual(
+            res.data, {'title': recipe.title, 'tags': [
+                {'id': tag.id, 'name': tag.name} for tag in recipe.tags.all()
+            ]}
+        )
+
+    @override_settings(RECIPE_EXPORT_CHUNK_SIZE=2)
+    def test_export_recipes_streamed_in_chunks(self):
+        """Test the export streams every recipe of the user, newest first"""
+        self._create_recipes_with_relations(5)
+        sample_recipe(user=sample_user('other@test.com'))
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(EXPORT_URL)
+            body = b''.join(res.streaming_content)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'application/json')
+        recipes = Recipe.objects.filter(user=self.user).order_by('-id')
+        self.assertEqual(
+            json.loads(body.decode()),
+            json.loads(json.dumps(RecipeSerializer(recipes, many=True).data))
+        )
+        chunks = [
+            query for query in ctx.captured_queries
+            if query['sql'].startswith('SELECT') and
+            'FROM "core_recipe"' in query['sql']
+        ]
+        self.assertEqual(len(chunks), 4)
+
+    def test_export_recipes_filtered(self):
+        """Test the export applies the list filters and ?fields="""
+        sample_recipe(user=self.user, time_minutes=5)
+        slow = sample_recipe(user=self.user, time_minutes=60)
+
+        res = self.client.get(
+            EXPORT_URL, {'min_time': 30, 'fields': 'id,time_minutes'}
+        )
+
+        self.assertEqual(
+            json.loads(b''.join(res.streaming_content).decode()),
+            [{'id': slow.id, 'time_minutes': 60}]
+        )
+
+    def test_export_no_recipes(self):
+        """Test exporting without recipes streams an empty array"""
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(b''.join(res.streaming_content), b'[]')
+
+    def test_recipe_unknown_sparse_fields(self):
+        """Test unknown field names are rejected"""
+        res = self.client.get(
+            RECIPE_URL, {'fields': 'title,secret', 'exclude': 'user'}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(set(res.data), {'fields', 'exclude'})
+
+    def test_create_recipe_ignores_sparse_fields(self):
+        """Test ?fields= does not drop fields submitted for a write"""
+        res = self.client.post(
+            RECIPE_URL + '?fields=id',
+            {'title': 'Soup', 'time_minutes': 5, 'price': 1}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Recipe.objects.get(id=res.data['id']).title, 'Soup')
+
     def test_create_basic_recipe(self):
         """Test creating recipe"""
         payload = {
@@ -164,6 +519,62 @@ class PrivateRecipeApiTests(TestCase):
         self.assertIn(ing1, ingredients)
         self.assertIn(ing2, ingredients)
 
+    def test_create_recipe_resolves_tags_in_one_query(self):
+        """Test submitted tag IDs are looked up together"""
+        tags = [sample_tag(user=self.user, name=f'tag{i}') for i in range(5)]
+        payload = {
+            'title': 'Apple pie',
+            'tags': [tag.id for tag in tags],
+            'time_minutes': 30,
+            'price': 5.00
+        }
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.post(RECIPE_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        tag_lookups = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('SELECT')
+            and '"core_tag"."id" IN' in query['sql']
+        ]
+        self.assertEqual(len(tag_lookups), 1)
+
+    def test_create_recipe_with_other_users_tag(self):
+        """Test tags of other users can not be assigned"""
+        other = get_user_model().objects.create_user(
+            'other@test.com', 'testPassword'
+        )
+        tag = sample_tag(user=other)
+        payload = {
+            'title': 'Apple pie',
+            'tags': [tag.id],
+            'time_minutes': 30,
+            'price': 5.00
+        }
+
+        res = self.client.post(RECIPE_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_create_recipe_reports_every_missing_id(self):
+        """Test all unknown IDs are reported at once"""
+        ingredient = sample_ingredient(user=self.user)
+        payload = {
+            'title': 'Apple pie',
+            'ingredients': [ingredient.id, 9998, 9999],
+            'time_minutes': 30,
+            'price': 5.00
+        }
+
+        res = self.client.post(RECIPE_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(res.data['ingredients']), 2)
+        self.assertIn('9998', res.data['ingredients'][0])
+        self.assertIn('9999', res.data['ingredients'][1])
+
     def test_partial_update_recipe(self):
         """Test updating a recipe with patch"""
         recipe = sample_recipe(user=self.user)
@@ -256,9 +667,9 @@ class RecipeImageUploadTests(TestCase):
         serializer2 = RecipeSerializer(recipe2)
         serializer3 = RecipeSerializer(recipe3)
 
-        self.assertIn(serializer1.data, res.data)
-        self.assertIn(serializer2.data, res.data)
-        self.assertNotIn(serializer3.data, res.data)
+        self.assertIn(serializer1.data, res.data['results'])
+        self.assertIn(serializer2.data, res.data['results'])
+        self.assertNotIn(serializer3.data, res.data['results'])
 
     def test_filter_recipes_by_ingredients(self):
         """Test returning recipes with specific tags"""
@@ -279,6 +690,6 @@ class RecipeImageUploadTests(TestCase):
         serializer2 = RecipeSerializer(recipe2)
         serializer3 = RecipeSerializer(recipe3)
 
-        self.assertIn(serializer1.data, res.data)
-        self.assertIn(serializer2.data, res.data)
-        self.assertNotIn(serializer3.data, res.data)
+        self.assertIn(serializer1.data, res.data['results'])
+        self.assertIn(serializer2.data, res.data['results'])
+        self.assertNotIn(serializer3.data, res.data['results'])
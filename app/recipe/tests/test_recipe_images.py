@@ -0,0 +1,354 @@
+import hashlib
+import os
+import shutil
+import struct
+import tempfile
+import zlib
+from io import BytesIO, StringIO
+from unittest.mock import patch
+
+from PIL import Image
+from core.models import Recipe, content_image_path
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from recipe import images
+from rest_framework import status
+from rest_framework.test import APIClient
+
+
+def image_upload_url(recipe_id):
+    """Helper function to generate url to upload the images"""
+    return reverse('recipe:recipe-upload-image', args=[recipe_id])
+
+
+def sample_user(email='test@test.com', password='testPassword'):
+    """Create a sample user"""
+    return get_user_model().objects.create_user(email, password)
+
+
+def sample_recipe(user, **params):
+    """Create and return a sample recipe"""
+    defaults = {
+        'title': 'Sample Recipe',
+        'time_minutes': 10,
+        'price': 5.00
+    }
+    defaults.update(params)
+
+    return Recipe.objects.create(user=user, **defaults)
+
+
+def sample_image(size=(1200, 900), image_format='JPEG', name='photo.jpg'):
+    """Return an uploadable in-memory image"""
+    image_file = BytesIO()
+    Image.new('RGB', size, 'red').save(image_file, format=image_format)
+
+    return SimpleUploadedFile(name, image_file.getvalue())
+
+
+class RecipeImageTestCase(TestCase):
+    """Base class storing uploaded images in a temporary MEDIA_ROOT"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.addCleanup(shutil.rmtree, self.media_root)
+
+        self.client = APIClient()
+        self.user = sample_user()
+        self.client.force_authenticate(self.user)
+        self.recipe = sample_recipe(user=self.user)
+
+
+@override_settings(RECIPE_IMAGE_PROCESSING='sync')
+class ImageVariantTests(RecipeImageTestCase):
+    """Test building resized variants of uploaded recipe images"""
+
+    def test_upload_builds_variants(self):
+        """Test each variant is resized, encoded and exposed by URL"""
+        res = self.client.post(
+            image_upload_url(self.recipe.id),
+            {'image': sample_image()},
+            format='multipart'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(res.data['image_variants']), set(images.VARIANTS))
+        self.recipe.refresh_from_db()
+        self.assertTrue(self.recipe.image_variants_ready)
+
+        storage = images.get_storage()
+        for variant, (size, image_format, _) in images.VARIANTS.items():
+            name = images.variant_name(self.recipe.image.name, variant)
+            self.assertTrue(
+                res.data['image_variants'][variant].endswith(storage.url(name))
+            )
+            with storage.open(name) as variant_file:
+                image = Image.open(variant_file)
+                self.assertEqual(image.format, image_format)
+                self.assertEqual(max(image.size), min(size, 1200))
+
+    def test_recipe_serializer_exposes_variants(self):
+        """Test recipe details include the variant URLs once built"""
+        self.client.post(
+            image_upload_url(self.recipe.id),
+            {'image': sample_image(image_format='PNG', name='photo.png')},
+            format='multipart'
+        )
+
+        res = self.client.get(
+            reverse('recipe:recipe-detail', args=[self.recipe.id])
+        )
+
+        self.assertIn('thumbnail', res.data['image_variants'])
+
+    def test_process_recipe_images_command(self):
+        """Test the command builds variants of pending images"""
+        self.recipe.image.save('photo.jpg', sample_image())
+        self.assertFalse(self.recipe.image_variants_ready)
+
+        call_command('process_recipe_images', stdout=StringIO())
+
+        self.recipe.refresh_from_db()
+        self.assertTrue(self.recipe.image_variants_ready)
+
+
+class ImageSchedulingTests(RecipeImageTestCase):
+    """Test uploads hand variant building to the worker pool"""
+
+    @patch('recipe.images.get_executor')
+    @patch('recipe.images.transaction.on_commit')
+    def test_upload_queues_variants(self, on_commit, get_executor):
+        """Test the upload returns before any variant is built"""
+        res = self.client.post(
+            image_upload_url(self.recipe.id),
+            {'image': sample_image()},
+            format='multipart'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIsNone(res.data['image_variants'])
+        get_executor.assert_not_called()
+
+        on_commit.call_args[0][0]()
+        get_executor.return_value.submit.assert_called_once_with(
+            images._run_in_worker, self.recipe.id
+        )
+
+    def test_processed_image_refreshes_cached_list(self):
+        """Test finishing the variants invalidates cached recipe lists"""
+        self.recipe.image.save('photo.jpg', sample_image())
+        url = reverse('recipe:recipe-list')
+        res = self.client.get(url)
+        self.assertIsNone(res.data['results'][0]['image_variants'])
+
+        images.process_recipe_image(self.recipe.id)
+
+        res = self.client.get(url)
+        self.assertIsNotNone(res.data['results'][0]['image_variants'])
+
+
+def png_chunk(chunk_type, data):
+    """Return an encoded PNG chunk"""
+    body = chunk_type + data
+    return (
+        struct.pack('>I', len(data)) + body +
+        struct.pack('>I', zlib.crc32(body))
+    )
+
+
+def png_header(width, height):
+    """Return the start of a PNG declaring the given size"""
+    ihdr = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return (
+        b'\x89PNG\r\n\x1a\n' + png_chunk(b'IHDR', ihdr) +
+        png_chunk(b'IDAT', b'\x00' * 64)
+    )
+
+
+class ImageUploadValidationTests(RecipeImageTestCase):
+    """Test uploads are validated from their header while streaming"""
+
+    def upload(self, content, name='photo.jpg'):
+        """Upload raw bytes as the recipe image"""
+        return self.client.post(
+            image_upload_url(self.recipe.id),
+            {'image': SimpleUploadedFile(name, content)},
+            format='multipart'
+        )
+
+    def assertNothingStored(self):
+        """Assert the recipe has no image and no temporary file is left"""
+        self.recipe.refresh_from_db()
+        self.assertFalse(self.recipe.image)
+        tmp = os.path.join(self.media_root, 'tmp')
+        self.assertEqual(os.listdir(tmp) if os.path.isdir(tmp) else [], [])
+
+    def test_valid_upload_moved_into_place(self):
+        """Test a valid image is streamed to disk and moved into place"""
+        res = self.upload(sample_image().read())
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.recipe.refresh_from_db()
+        self.assertTrue(os.path.exists(self.recipe.image.path))
+        self.assertEqual(os.listdir(os.path.join(self.media_root, 'tmp')), [])
+
+    def test_unknown_magic_bytes_rejected(self):
+        """Test a file that does not start like an image is rejected"""
+        res = self.upload(b'%PDF-1.4' + b'\x00' * 4096)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('Unsupported', res.data['image'][0])
+        self.assertNothingStored()
+
+    def test_decompression_bomb_rejected_from_header(self):
+        """Test a header declaring a huge image is rejected"""
+        content = png_header(60000, 60000) + b'\x00' * (512 * 1024)
+
+        res = self.upload(content, name='bomb.png')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('pixels', res.data['image'][0])
+        self.assertNothingStored()
+
+    def test_truncated_header_rejected(self):
+        """Test a file whose header never completes is rejected"""
+        res = self.upload(b'\xff\xd8\xff\xe0' + b'\x00' * 32)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertNothingStored()
+
+    @override_settings(RECIPE_IMAGE_MAX_BYTES=2048)
+    def test_oversized_upload_rejected(self):
+        """Test uploads larger than the byte limit are rejected"""
+        res = self.upload(sample_image(size=(400, 400)).read())
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('too large', res.data['image'][0])
+        self.assertNothingStored()
+
+
+@override_settings(RECIPE_IMAGE_PROCESSING='sync')
+@patch('django.db.transaction.on_commit', lambda callback: callback())
+class ContentAddressedImageTests(RecipeImageTestCase):
+    """Test recipe images are stored once per distinct content"""
+
+    def upload(self, recipe, image):
+        """Upload an image to the given recipe"""
+        image.seek(0)
+        res = self.client.post(
+            image_upload_url(recipe.id), {'image': image}, format='multipart'
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        recipe.refresh_from_db()
+
+        return res
+
+    def test_upload_named_by_content_hash(self):
+        """Test the stored name is the SHA-256 of the uploaded bytes"""
+        image = sample_image()
+        digest = hashlib.sha256(image.read()).hexdigest()
+
+        res = self.upload(self.recipe, image)
+
+        self.assertEqual(
+            self.recipe.image.name, content_image_path(digest, 'jpg')
+        )
+        self.assertIn(digest, res.data['image'])
+
+    def test_identical_uploads_share_one_file(self):
+        """Test the same photo on two recipes is stored once"""
+        other = sample_recipe(user=self.user, title='Other')
+        image = sample_image()
+
+        self.upload(self.recipe, image)
+        self.upload(other, image)
+
+        self.assertEqual(self.recipe.image.name, other.image.name)
+        directory = os.path.dirname(self.recipe.image.path)
+        self.assertEqual(
+            [name for name in os.listdir(directory) if name != 'variants'],
+            [os.path.basename(self.recipe.image.name)]
+        )
+
+    def test_delete_keeps_shared_image(self):
+        """Test deleting a recipe keeps an image another recipe uses"""
+        other = sample_recipe(user=self.user, title='Other')
+        image = sample_image()
+        self.upload(self.recipe, image)
+        self.upload(other, image)
+        path = other.image.path
+        thumbnail = images.get_storage().path(
+            images.variant_name(other.image.name, 'thumbnail')
+        )
+
+        self.recipe.delete()
+        self.assertTrue(os.path.exists(path))
+
+        other.delete()
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(os.path.exists(thumbnail))
+
+    def test_replaced_image_removed(self):
+        """Test replacing an image removes the old file if unused"""
+        self.upload(self.recipe, sample_image())
+        old_path = self.recipe.image.path
+
+        self.upload(self.recipe, sample_image(size=(600, 600)))
+
+        self.assertFalse(os.path.exists(old_path))
+        self.assertTrue(os.path.exists(self.recipe.image.path))
+
+    def test_dedupe_command_merges_legacy_images(self):
+        """Test the command renames uuid named images and their variants"""
+        other = sample_recipe(user=self.user, title='Other')
+        self.recipe.image.save('photo.jpg', sample_image())
+        other.image.save('photo.jpg', sample_image())
+        images.process_recipe_image(self.recipe.id)
+        images.process_recipe_image(other.id)
+        legacy = [self.recipe.image.path, other.image.path]
+        self.assertNotEqual(*legacy)
+        storage = images.get_storage()
+        legacy_variants = [
+            images.variant_name(self.recipe.image.name, variant)
+            for variant in images.VARIANTS
+        ]
+
+        with patch.object(images, 'build_variants') as build_variants:
+            call_command('dedupe_recipe_images', stdout=StringIO())
+
+        build_variants.assert_not_called()
+        self.recipe.refresh_from_db()
+        other.refresh_from_db()
+        digest = hashlib.sha256(sample_image().read()).hexdigest()
+        self.assertEqual(
+            self.recipe.image.name, content_image_path(digest, 'jpg')
+        )
+        self.assertEqual(other.image.name, self.recipe.image.name)
+        self.assertTrue(os.path.exists(self.recipe.image.path))
+        for path in legacy:
+            self.assertFalse(os.path.exists(path))
+        for recipe in (self.recipe, other):
+            self.assertTrue(recipe.image_variants_ready)
+        for variant in images.VARIANTS:
+            self.assertTrue(storage.exists(
+                images.variant_name(self.recipe.image.name, variant)
+            ))
+        for name in legacy_variants:
+            self.assertFalse(storage.exists(name))
+
+    def test_dedupe_command_prunes_orphans(self):
+        """Test the prune option deletes images no recipe refers to"""
+        storage = images.get_storage()
+        orphan = storage.save(
+            content_image_path('ab' * 32, 'jpg'), sample_image()
+        )
+
+        call_command('dedupe_recipe_images', '--prune', stdout=StringIO())
+
+        self.assertFalse(storage.exists(orphan))
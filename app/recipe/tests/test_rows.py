@@ -0,0 +1,121 @@
+from core.models import Recipe, Tag, Ingredient
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+RECIPE_URL = reverse('recipe:recipe-list')
+TAGS_URL = reverse('recipe:tag-list')
+INGREDIENTS_URL = reverse('recipe:ingredient-list')
+EXPORT_URL = reverse('recipe:recipe-export')
+NO_CACHE = {
+    'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+}
+
+
+def sample_user(email='test@test.com', password='testPassword'):
+    """Create a sample user"""
+    return get_user_model().objects.create_user(email, password)
+
+
+@override_settings(CACHES=NO_CACHE)
+class RowListParityTests(TestCase):
+    """Test lists rendered from rows match the serializers byte for byte"""
+
+    def setUp(self):
+        self.user = sample_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        tags = [
+            Tag.objects.create(user=self.user, name=name)
+            for name in ('Vegan', 'Dessert', 'Ünïcode "quoted"')
+        ]
+        ingredients = [
+            Ingredient.objects.create(user=self.user, name=name)
+            for name in ('Salt', 'Kale')
+        ]
+        for i in range(6):
+            recipe = Recipe.objects.create(
+                user=self.user, title=f'Soup {i}', time_minutes=i * 7,
+                price=f'{i}.{i}5', link='' if i % 2 else f'http://x/{i}'
+            )
+            recipe.tags.add(*reversed(tags[:i % 4]))
+            recipe.ingredients.add(*ingredients[:i % 3])
+        Recipe.objects.filter(title='Soup 1').update(
+            image='uploads/recipe/ab/abcd.jpg', image_variants_ready=True
+        )
+        Recipe.objects.filter(title='Soup 2').update(
+            image='uploads/recipe/cd/cdef.jpg', image_variants_ready=False
+        )
+
+    def assertParity(self, url, params=None):
+        """Assert both list paths answer url with the same bytes"""
+        with override_settings(RECIPE_FAST_LIST_READS=True):
+            fast = self.client.get(url, params)
+        with override_settings(RECIPE_FAST_LIST_READS=False):
+            slow = self.client.get(url, params)
+
+        self.assertEqual(fast.status_code, status.HTTP_200_OK)
+        self.assertEqual(slow.status_code, status.HTTP_200_OK)
+        self.assertEqual(fast.content, slow.content)
+
+        return fast
+
+    def test_recipe_list(self):
+        """Test the full recipe list"""
+        res = self.assertParity(RECIPE_URL)
+
+        self.assertEqual(len(res.data['results']), 6)
+
+    def test_recipe_list_pages(self):
+        """Test every page and its cursors"""
+        res = self.assertParity(
+            RECIPE_URL, {'ordering': '-price', 'page_size': 2}
+        )
+        while res.data['next']:
+            res = self.assertParity(res.data['next'])
+
+    def test_recipe_list_filtered(self):
+        """Test filters, ranges and search"""
+        tag = Tag.objects.get(name='Vegan')
+        for params in (
+                {'tags': str(tag.id)},
+                {'min_time': 7, 'max_price': '4'},
+                {'search': 'soup vegan'},
+                {'ordering': 'time_minutes'}):
+            self.assertParity(RECIPE_URL, params)
+
+    def test_recipe_list_sparse_fields(self):
+        """Test ?fields= and ?exclude="""
+        self.assertParity(RECIPE_URL, {'fields': 'price,tags,id'})
+        self.assertParity(RECIPE_URL, {'exclude': 'ingredients,link'})
+
+    def test_tag_and_ingredient_lists(self):
+        """Test the tag and ingredient lists"""
+        for url in (TAGS_URL, INGREDIENTS_URL):
+            self.assertParity(url)
+            self.assertParity(url, {'assigned_only': 1})
+
+    @override_settings(RECIPE_EXPORT_CHUNK_SIZE=4)
+    def test_recipe_export(self):
+        """Test the streamed export"""
+        responses = []
+        for fast in (True, False):
+            with override_settings(RECIPE_FAST_LIST_READS=fast):
+                res = self.client.get(EXPORT_URL, {'exclude': 'link'})
+                responses.append(b''.join(res.streaming_content))
+
+        self.assertEqual(responses[0], responses[1])
+
+    def test_rows_read_without_prefetching_objects(self):
+        """Test the row path reads relations from the through tables"""
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(RECIPE_URL)
+
+        sql = ' '.join(query['sql'] for query in ctx.captured_queries)
+        self.assertIn('"core_recipe_tags"', sql)
+        self.assertNotIn('"core_tag"."name"', sql)
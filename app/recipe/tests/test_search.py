@@ -0,0 +1,148 @@
+from core.models import Recipe, Tag, Ingredient
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from recipe import search
+from rest_framework import status
+from rest_framework.test import APIClient
+
+RECIPE_URL = reverse('recipe:recipe-list')
+
+
+def sample_recipe(user, **params):
+    """Create and return a sample recipe"""
+    defaults = {
+        'title': 'Sample Recipe',
+        'time_minutes': 10,
+        'price': 5.00
+    }
+    defaults.update(params)
+
+    return Recipe.objects.create(user=user, **defaults)
+
+
+class RecipeSearchTests(TestCase):
+    """Test full text search of recipes"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'test@test.com', 'testPassword'
+        )
+        self.client.force_authenticate(self.user)
+
+    def search(self, term, **params):
+        """Return the IDs of the recipes found for a search term"""
+        res = self.client.get(RECIPE_URL, dict(params, search=term))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        return [recipe['id'] for recipe in res.data['results']]
+
+    def page_through(self, term, page_size=2):
+        """Return the IDs of every page of a search, following cursors"""
+        ids = []
+        res = self.client.get(
+            RECIPE_URL, {'search': term, 'page_size': page_size}
+        )
+        while True:
+            ids.extend(recipe['id'] for recipe in res.data['results'])
+            if not res.data['next']:
+                return ids
+            res = self.client.get(res.data['next'])
+
+    def test_search_titles(self):
+        """Test recipes are found by the words of their title"""
+        curry = sample_recipe(self.user, title='Thai green curry')
+        sample_recipe(self.user, title='Apple pie')
+
+        self.assertEqual(self.search('curry'), [curry.id])
+        self.assertEqual(self.search('green curries'), [curry.id])
+        self.assertEqual(self.search('red curry'), [])
+
+    def test_search_tag_and_ingredient_names(self):
+        """Test recipes are found by the names of their relations"""
+        recipe = sample_recipe(self.user, title='Weeknight dinner')
+        recipe.tags.add(Tag.objects.create(user=self.user, name='Vegan'))
+        recipe.ingredients.add(
+            Ingredient.objects.create(user=self.user, name='Chickpeas')
+        )
+
+        self.assertEqual(self.search('vegan'), [recipe.id])
+        self.assertEqual(self.search('chickpeas dinner'), [recipe.id])
+
+    def test_title_matches_ranked_first(self):
+        """Test a title match outranks a match on an ingredient"""
+        title_match = sample_recipe(self.user, title='Lemon tart')
+        ingredient_match = sample_recipe(self.user, title='Fish')
+        ingredient_match.ingredients.add(
+            Ingredient.objects.create(user=self.user, name='Lemon')
+        )
+
+        self.assertEqual(
+            self.search('lemon'), [title_match.id, ingredient_match.id]
+        )
+
+    def test_search_paginated(self):
+        """Test ranked results are paged without gaps or repeats"""
+        recipes = [
+            sample_recipe(self.user, title=f'Soup {"soup " * i}')
+            for i in range(5)
+        ]
+
+        ids = self.page_through('soup')
+
+        self.assertEqual(sorted(ids), sorted(recipe.id for recipe in recipes))
+        self.assertEqual(ids, self.search('soup', page_size=10))
+
+    def test_search_paginated_through_ties(self):
+        """Test tied and nearly tied ranks are paged exactly once each"""
+        titles = ['Soup'] * 3 + ['Soup pot'] * 3 + ['Soup pot pan'] * 2
+        recipes = [sample_recipe(self.user, title=title) for title in titles]
+        recipes[0].tags.add(Tag.objects.create(user=self.user, name='Pan'))
+
+        ids = self.page_through('soup')
+
+        self.assertEqual(sorted(ids), sorted(recipe.id for recipe in recipes))
+        self.assertEqual(ids, self.search('soup', page_size=10))
+
+    def test_search_limited_to_user(self):
+        """Test other users' recipes are not found"""
+        other = get_user_model().objects.create_user(
+            'other@test.com', 'testPassword'
+        )
+        sample_recipe(other, title='Curry')
+
+        self.assertEqual(self.search('curry'), [])
+
+    def test_index_follows_changes(self):
+        """Test renames, removed relations and deletions are reindexed"""
+        recipe = sample_recipe(self.user, title='Pancakes')
+        tag = Tag.objects.create(user=self.user, name='Breakfast')
+        recipe.tags.add(tag)
+
+        tag.name = 'Brunch'
+        tag.save()
+        self.assertEqual(self.search('breakfast'), [])
+        self.assertEqual(self.search('brunch'), [recipe.id])
+
+        recipe.tags.remove(tag)
+        self.assertEqual(self.search('brunch'), [])
+
+        recipe.title = 'Waffles'
+        recipe.save()
+        self.assertEqual(self.search('waffles'), [recipe.id])
+
+        recipe.delete()
+        self.assertEqual(search.search_recipes(
+            Recipe.objects.all(), 'waffles'
+        ).count(), 0)
+
+    def test_bulk_created_recipes_indexed(self):
+        """Test recipes created through the bulk endpoint are searchable"""
+        tag = Tag.objects.create(user=self.user, name='Spicy')
+        self.client.post(reverse('recipe:recipe-bulk'), [
+            {'title': 'Chili', 'time_minutes': 5, 'price': '1.00',
+             'tags': [tag.id], 'ingredients': []},
+        ], format='json')
+
+        self.assertEqual(len(self.search('spicy chili')), 1)
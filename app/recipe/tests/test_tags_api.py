@@ -1,6 +1,8 @@
 from core.models import Tag, Recipe
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from recipe.serializers import TagSerializer
 from rest_framework import status
@@ -57,7 +59,7 @@ class PrivateTagsApiTest(TestCase):
         serializer = TagSerializer(tags, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_tags_limited_to_user(self):
         """Test that tags only belonging to user are returned"""
@@ -67,8 +69,8 @@ class PrivateTagsApiTest(TestCase):
         res = self.client.get(TAGS_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data[0]['name'], tag.name)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'][0]['name'], tag.name)
 
     def test_create_tags_successful(self):
         """Test creating a new tag"""
@@ -107,8 +109,8 @@ class PrivateTagsApiTest(TestCase):
         serializer1 = TagSerializer(tag1)
         serializer2 = TagSerializer(tag2)
 
-        self.assertIn(serializer1.data, res.data)
-        self.assertNotIn(serializer2.data, res.data)
+        self.assertIn(serializer1.data, res.data['results'])
+        self.assertNotIn(serializer2.data, res.data['results'])
 
     def test_get_tags_assigned_unique(self):
         tag1 = Tag.objects.create(user=self.user, name='Tag1')
@@ -123,4 +125,60 @@ class PrivateTagsApiTest(TestCase):
             {'assigned_only': 1}
         )
 
-        self.assertEqual(len(res.data), 1)
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_tags_paginated_with_duplicate_names(self):
+        """Test paging tags that share a name neither skips nor repeats"""
+        for name in ['Vegan', 'Dessert', 'Vegan', 'Dessert', 'Vegan']:
+            Tag.objects.create(user=self.user, name=name)
+
+        ids = []
+        res = self.client.get(TAGS_URL, {'page_size': 2})
+        while True:
+            ids.extend(tag['id'] for tag in res.data['results'])
+            if not res.data['next']:
+                break
+            res = self.client.get(res.data['next'])
+
+        expected = Tag.objects.order_by('-name', 'id')
+        self.assertEqual(ids, [tag.id for tag in expected])
+
+        previous = self.client.get(res.data['previous'])
+        self.assertEqual(
+            [tag['id'] for tag in previous.data['results']],
+            ids[2:4]
+        )
+
+    def test_assigned_only_matches_join_filter(self):
+        """Test assigned_only returns what the distinct join returned"""
+        other_user = sample_user('test2@test.com', 'testPassword')
+        tags = [
+            Tag.objects.create(user=self.user, name=f'tag{i}')
+            for i in range(4)
+        ]
+        other = Tag.objects.create(user=other_user, name='Other')
+        for i in range(3):
+            recipe = sample_recipe(user=self.user, title=f'dish{i}')
+            recipe.tags.add(tags[0], tags[1])
+        other_recipe = sample_recipe(user=other_user)
+        other_recipe.tags.add(tags[2], other)
+
+        res = self.client.get(TAGS_URL, {'assigned_only': 1})
+
+        expected = Tag.objects.filter(
+            user=self.user,
+            recipe__isnull=False
+        ).order_by('-name', 'id').distinct()
+        serializer = TagSerializer(expected, many=True)
+        self.assertEqual(res.data['results'], serializer.data)
+
+    def test_list_queries_without_distinct(self):
+        """Test neither list mode asks the database to deduplicate rows"""
+        recipe = sample_recipe(user=self.user)
+        recipe.tags.add(Tag.objects.create(user=self.user, name='A'))
+
+        for params in ({}, {'assigned_only': 1}):
+            with CaptureQueriesContext(connection) as ctx:
+                self.client.get(TAGS_URL, params)
+            for query in ctx.captured_queries:
+                self.assertNotIn('DISTINCT', query['sql'])
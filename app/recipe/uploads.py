@@ -0,0 +1,158 @@
+import hashlib
+import io
+import os
+import tempfile
+
+from PIL import Image
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile, \
+    UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+from django.http import QueryDict
+from django.utils.datastructures import MultiValueDict
+
+# Formats accepted for recipe images, keyed by their leading magic bytes.
+IMAGE_SIGNATURES = (
+    (b'\xff\xd8\xff', 'JPEG'),
+    (b'\x89PNG\r\n\x1a\n', 'PNG'),
+    (b'GIF87a', 'GIF'),
+    (b'GIF89a', 'GIF'),
+    (b'RIFF', 'WEBP'),
+)
+
+# How much of the start of a file may be buffered to find its dimensions.
+HEADER_LIMIT = 256 * 1024
+
+
+def sniff_format(header):
+    """Return the image format the header starts with, if any"""
+    for signature, image_format in IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            if image_format == 'WEBP' and header[8:12] != b'WEBP':
+                return None
+            return image_format
+
+    return None
+
+
+def read_dimensions(header):
+    """Return the (width, height) declared in an image header
+
+    Only the header is parsed; pixel data is never decoded. Returns None
+    while the header is still incomplete.
+    """
+    try:
+        image = Image.open(io.BytesIO(header))
+    except Image.DecompressionBombError:
+        raise
+    except Exception:
+        # Pillow raises assorted errors on a truncated header
+        return None
+
+    return image.size
+
+
+class StreamedImageFile(TemporaryUploadedFile):
+    """Upload written to a temporary file beside the recipe images
+
+    Keeping it on the same filesystem as MEDIA_ROOT lets the storage
+    move it into place instead of copying it.
+    """
+
+    def __init__(self, name, content_type, size, charset,
+                 content_type_extra=None):
+        directory = os.path.join(settings.MEDIA_ROOT, 'tmp')
+        os.makedirs(directory, exist_ok=True)
+        _, ext = os.path.splitext(name)
+        file = tempfile.NamedTemporaryFile(
+            suffix='.upload' + ext, dir=directory
+        )
+        UploadedFile.__init__(
+            self, file, name, content_type, size, charset, content_type_extra
+        )
+
+
+class ImageUploadHandler(FileUploadHandler):
+    """Validate an uploaded image from its first bytes and stream it
+
+    The magic bytes and the dimensions in the header are checked as soon
+    as they arrive, and oversized or decompression bomb images are
+    rejected before the rest is read. Everything is written to disk in
+    chunks, so memory use per upload does not depend on the file size.
+    The SHA-256 of the content is computed on the way through and attached
+    to the file as `content_hash`. The reason for a rejection is left in
+    `error`.
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.error = None
+
+    def reject(self, message):
+        """Record why the upload was refused and stop reading it"""
+        self.error = message
+        raise StopUpload(connection_reset=True)
+
+    def handle_raw_input(self, input_data, META, content_length, boundary,
+                         encoding=None):
+        if content_length > settings.RECIPE_IMAGE_MAX_BYTES:
+            self.error = 'Image file is too large.'
+            return QueryDict(encoding=encoding), MultiValueDict()
+
+        return None
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.header = b''
+        self.checked = False
+        self.received = 0
+        self.sha256 = hashlib.sha256()
+        self.file = StreamedImageFile(
+            self.file_name, self.content_type, 0, self.charset,
+            self.content_type_extra
+        )
+
+    def check_header(self):
+        """Validate the buffered header once enough of it has arrived"""
+        if len(self.header) < 12:
+            return
+        if sniff_format(self.header) is None:
+            self.reject('Upload a valid image. Unsupported file type.')
+
+        try:
+            dimensions = read_dimensions(self.header)
+        except Image.DecompressionBombError:
+            self.reject('Image has too many pixels.')
+        if dimensions is None:
+            if len(self.header) >= HEADER_LIMIT:
+                self.reject('Upload a valid image. Unreadable header.')
+            return
+
+        width, height = dimensions
+        if width * height > settings.RECIPE_IMAGE_MAX_PIXELS:
+            self.reject('Image has too many pixels.')
+        self.checked = True
+        self.header = b''
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > settings.RECIPE_IMAGE_MAX_BYTES:
+            self.reject('Image file is too large.')
+
+        if not self.checked:
+            self.header = (self.header + raw_data)[:HEADER_LIMIT]
+            self.check_header()
+
+        self.sha256.update(raw_data)
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        if not self.checked:
+            self.file.close()
+            self.error = 'Upload a valid image. Unreadable header.'
+            return None
+
+        self.file.seek(0)
+        self.file.size = file_size
+        self.file.content_hash = self.sha256.hexdigest()
+        return self.file
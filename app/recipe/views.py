@@ -1,18 +1,49 @@
+from decimal import Decimal
+
+from core.db.replicas import ReplicaReadMixin
 from core.models import Tag, Ingredient, Recipe
-from recipe import serializers
+from core.renderers import FastJSONRenderer
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+from django.http import StreamingHttpResponse
+from recipe import autocomplete, fieldsets, filters, images, search, \
+    serializers
+from recipe.bulk import BulkCreateMixin, BulkModelMixin
+from recipe.cache import CachedListMixin
+from recipe.conditional import ConditionalListMixin, \
+    ConditionalRetrieveMixin
+from recipe.export import keyset_chunks, stream_json_list
+from recipe.rows import RowListMixin, RowReader
+from recipe.uploads import ImageUploadHandler
 from rest_framework import viewsets, mixins, status
-from rest_framework.authentication import TokenAuthentication
 from rest_framework.decorators import action
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated, SAFE_METHODS
 from rest_framework.response import Response
+from user.authentication import CachedTokenAuthentication
 
 
-class BaseRecipeAttrViewSet(viewsets.GenericViewSet,
+class BaseRecipeAttrViewSet(ReplicaReadMixin,
+                            BulkCreateMixin,
+                            CachedListMixin,
+                            ConditionalListMixin,
+                            RowListMixin,
+                            viewsets.GenericViewSet,
                             mixins.ListModelMixin,
                             mixins.CreateModelMixin):
     """Base class for recipe attributes View Sets"""
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated,)
+    ordering = ('-name', 'id')
+    prefix_limit = 10
+    max_prefix_limit = 50
+
+    def _assigned_to_recipe(self):
+        """Return an EXISTS matching recipes that use the outer object"""
+        relation = Recipe._meta.get_field(self.recipe_relation)
+        return Exists(relation.remote_field.through.objects.filter(
+            **{relation.m2m_reverse_field_name(): OuterRef('pk')}
+        ))
 
     def get_queryset(self):
         """Return objects for only the authenticated user"""
@@ -21,11 +52,36 @@ class BaseRecipeAttrViewSet(viewsets.GenericViewSet,
         )
         queryset = self.queryset
         if assigned_only:
-            queryset = queryset.filter(recipe__isnull=False)
+            queryset = queryset.annotate(
+                assigned=self._assigned_to_recipe()
+            ).filter(assigned=True)
 
         return queryset.filter(
             user=self.request.user
-        ).order_by('-name').distinct()
+        ).order_by(*self.ordering)
+
+    def list(self, request, *args, **kwargs):
+        """List objects, or complete a name with ?prefix="""
+        prefix = request.query_params.get('prefix')
+        if prefix is None:
+            return super().list(request, *args, **kwargs)
+
+        try:
+            limit = int(request.query_params.get('limit', self.prefix_limit))
+        except ValueError:
+            raise ValidationError({'limit': 'A valid integer is required.'})
+        limit = max(1, min(limit, self.max_prefix_limit))
+
+        if int(request.query_params.get('assigned_only', 0)):
+            matches = autocomplete.query_prefix(
+                self.get_queryset(), prefix, limit
+            )
+        else:
+            matches = autocomplete.autocomplete(
+                self.queryset.model, request.user.pk, prefix, limit
+            )
+
+        return Response([{'id': pk, 'name': name} for pk, name in matches])
 
     def perform_create(self, serializer):
         """Create a new object for the authorised user"""
@@ -36,38 +92,132 @@ class TagViewSet(BaseRecipeAttrViewSet):
     """Manage tags in database"""
     queryset = Tag.objects.all()
     serializer_class = serializers.TagSerializer
+    recipe_relation = 'tags'
 
 
 class IngredientViewSet(BaseRecipeAttrViewSet):
     """Manage ingredients in database"""
     queryset = Ingredient.objects.all()
     serializer_class = serializers.IngredientSerializer
+    recipe_relation = 'ingredients'
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(ReplicaReadMixin,
+                    BulkModelMixin,
+                    CachedListMixin,
+                    ConditionalListMixin,
+                    ConditionalRetrieveMixin,
+                    RowListMixin,
+                    viewsets.ModelViewSet):
     """Manage recipes in the database"""
     serializer_class = serializers.RecipeSerializer
     queryset = Recipe.objects.all()
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated,)
+    ordering = ('-id',)
+    search_ordering = ('-search_rank', '-id')
 
     def _params_to_ints(self, qs):
         """Convert a list of string IDs to a list of integers"""
         return [int(str_id) for str_id in qs.split(',')]
 
+    def _range_lookups(self):
+        """Return the lookups of the range filters in the query params"""
+        lookups = {}
+        errors = {}
+        for param, (lookup, convert) in filters.RANGE_FILTERS.items():
+            value = self.request.query_params.get(param)
+            if not value:
+                continue
+            try:
+                bound = convert(value)
+                if isinstance(bound, Decimal) and not bound.is_finite():
+                    raise ValueError(value)
+            except (ValueError, ArithmeticError):
+                errors[param] = 'A valid number is required.'
+                continue
+            low, high = filters.INTEGER_RANGE
+            if isinstance(bound, int) and not low <= bound <= high:
+                # No recipe is outside it, and SQLite cannot bind past 64 bits
+                errors[param] = f'Ensure this value is between {low} and ' \
+                    f'{high}.'
+            else:
+                lookups[lookup] = bound
+        if errors:
+            raise ValidationError(errors)
+
+        return lookups
+
     def get_queryset(self):
         """Retrieve recipes for authenticated user"""
         tags = self.request.query_params.get('tags')
         ingredients = self.request.query_params.get('ingredients')
-        queryset = self.queryset
-        if tags:
-            tag_ids = self._params_to_ints(tags)
-            queryset = queryset.filter(tags__id__in=tag_ids)
-        if ingredients:
-            ingredient_ids = self._params_to_ints(ingredients)
-            queryset = queryset.filter(ingredients__id__in=ingredient_ids)
+        match = self.request.query_params.get('match', filters.MATCH_ANY)
+        if match not in filters.MATCH_MODES:
+            raise ValidationError(
+                {'match': f'Must be one of {", ".join(filters.MATCH_MODES)}'}
+            )
+        queryset = filters.filter_recipes(
+            self.queryset,
+            match=match,
+            tags=self._params_to_ints(tags) if tags else None,
+            ingredients=(
+                self._params_to_ints(ingredients) if ingredients else None
+            ),
+        )
+
+        term = self.request.query_params.get('search')
+        if term:
+            queryset = search.search_recipes(queryset, term)
+
+        ordering = self.get_ordering()
+        queryset = queryset.filter(
+            user=self.request.user, **self._range_lookups()
+        ).order_by(*ordering)
+
+        return self._load_fields(queryset, ordering)
 
-        return queryset.filter(user=self.request.user).order_by('-id')
+    def _load_fields(self, queryset, ordering):
+        """Prefetch and load only what the requested fields of a read use"""
+        if self.request.method not in SAFE_METHODS:
+            return fieldsets.prefetch_relations(
+                queryset, ('tags', 'ingredients')
+            )
+
+        fields = self.get_serializer_class()().fields
+        selected = fieldsets.selected_fields(
+            self.request.query_params, list(fields)
+        )
+        if selected is None:
+            return fieldsets.prefetch_relations(
+                queryset, ('tags', 'ingredients')
+            )
+
+        return fieldsets.restrict_queryset(
+            queryset, fields, selected, self.request.query_params,
+            keep=[order.lstrip('-') for order in ordering],
+        )
+
+    def get_ordering(self):
+        """Return the ordering of the requested recipes
+
+        An explicit ?ordering= wins; otherwise search results come best
+        match first and everything else newest first.
+        """
+        ordering = self.request.query_params.get('ordering')
+        if ordering:
+            field = ordering[1:] if ordering.startswith('-') else ordering
+            if field not in filters.ORDERING_FIELDS:
+                raise ValidationError({'ordering': (
+                    f'Must be one of {", ".join(filters.ORDERING_FIELDS)}, '
+                    f'optionally prefixed with -'
+                )})
+            if field == 'id':
+                return (ordering,)
+            return (ordering, '-id' if ordering.startswith('-') else 'id')
+        if self.request.query_params.get('search'):
+            return self.search_ordering
+        return self.ordering
 
     def get_serializer_class(self):
         """Return approppriate serializer class"""
@@ -84,14 +234,22 @@ class RecipeViewSet(viewsets.ModelViewSet):
     @action(methods=['POST'], detail=True, url_path='upload-image')
     def upload_image(self, request, pk=None):
         """Uplaod an image to recipe"""
+        upload_handler = ImageUploadHandler(request._request)
+        request._request.upload_handlers = [upload_handler]
         recipe = self.get_object()
         serializer = self.get_serializer(
             recipe,
             data=request.data
         )
 
+        if upload_handler.error:
+            return Response(
+                {'image': [upload_handler.error]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         if serializer.is_valid():
-            serializer.save()
+            serializer.save(image_variants_ready=False)
+            images.schedule_recipe_image(recipe)
             return Response(
                 serializer.data,
                 status=status.HTTP_200_OK
@@ -100,3 +258,30 @@ class RecipeViewSet(viewsets.ModelViewSet):
             serializer.errors,
             status=status.HTTP_400_BAD_REQUEST
         )
+
+    @action(methods=['GET'], detail=False)
+    def export(self, request):
+        """Stream every matching recipe as one JSON array, newest first
+
+        Filters, search and ?fields= apply as they do to the list, which
+        is read in chunks of RECIPE_EXPORT_CHUNK_SIZE recipes instead of
+        pages.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        size = settings.RECIPE_EXPORT_CHUNK_SIZE
+        reader = RowReader(self.get_serializer())
+        if settings.RECIPE_FAST_LIST_READS and reader.supported:
+            chunks = (
+                reader.render(rows) for rows in
+                keyset_chunks(reader.rows(queryset), size)
+            )
+        else:
+            chunks = (
+                self.get_serializer(recipes, many=True).data for recipes in
+                keyset_chunks(queryset, size)
+            )
+
+        return StreamingHttpResponse(
+            stream_json_list(chunks, FastJSONRenderer()),
+            content_type='application/json'
+        )
@@ -0,0 +1,47 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.authentication import TokenAuthentication
+
+
+def get_token_cache():
+    """Return the cache backend holding token lookups, None if disabled"""
+    if not settings.AUTH_TOKEN_CACHE_ALIAS:
+        return None
+    return caches[settings.AUTH_TOKEN_CACHE_ALIAS]
+
+
+def token_cache_key(key):
+    """Return the cache key of a token without exposing the token"""
+    return 'auth-token:' + hashlib.sha256(key.encode()).hexdigest()
+
+
+def forget_tokens(*keys):
+    """Drop cached lookups of the given token keys"""
+    cache = get_token_cache()
+    if cache is not None:
+        cache.delete_many([token_cache_key(key) for key in keys])
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication that caches the token to user lookup
+
+    Entries expire after AUTH_TOKEN_CACHE_TIMEOUT seconds and are dropped
+    as soon as the token is deleted or its user changes (see
+    user.signals), so deactivated users lose access immediately.
+    """
+
+    def authenticate_credentials(self, key):
+        cache = get_token_cache()
+        if cache is None:
+            return super().authenticate_credentials(key)
+        cache_key = token_cache_key(key)
+        credentials = cache.get(cache_key)
+        if credentials is None:
+            credentials = super().authenticate_credentials(key)
+            cache.set(
+                cache_key, credentials, settings.AUTH_TOKEN_CACHE_TIMEOUT
+            )
+
+        return credentials
@@ -0,0 +1,132 @@
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import check_password, make_password
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class HasherBusy(Exception):
+    """Raised when no hasher slot frees up in time for a login"""
+
+
+def verify(password, encoded):
+    """Check a password against its hash
+
+    Returns whether it matches and, when the hash was made with another
+    hasher or other parameters than the preferred ones, a new hash of
+    the password to store instead.
+    """
+    rehashed = []
+    correct = check_password(
+        password, encoded, lambda raw: rehashed.append(make_password(raw))
+    )
+    return correct, rehashed[0] if rehashed else None
+
+
+class HasherPool:
+    """Bounded pool running password hashing off the request thread
+
+    At most workers hashes run at once and max_queue more wait for a
+    worker. Callers beyond that wait up to timeout seconds for a slot
+    and then get HasherBusy, so a login storm is turned away early
+    instead of piling up behind the hashes. Threads are enough for the
+    hashers Django ships, which release the GIL while hashing; processes
+    also isolate pure Python hashers.
+    """
+
+    def __init__(self, kind='thread', workers=1, max_queue=0, timeout=0):
+        if kind == 'process':
+            self.executor = ProcessPoolExecutor(workers)
+        else:
+            self.executor = ThreadPoolExecutor(
+                workers, thread_name_prefix='hasher'
+            )
+        self.slots = threading.BoundedSemaphore(workers + max_queue)
+        self.timeout = timeout
+
+    def run(self, func, *args):
+        """Return func(*args) run on the pool"""
+        if not self.slots.acquire(timeout=self.timeout):
+            raise HasherBusy()
+        try:
+            return self.executor.submit(func, *args).result()
+        finally:
+            self.slots.release()
+
+    def shutdown(self):
+        self.executor.shutdown()
+
+
+def get_pool():
+    """Return the pool of PASSWORD_VERIFY_POOL, or None to hash inline"""
+    global _pool
+    if settings.PASSWORD_VERIFY_POOL not in ('thread', 'process'):
+        return None
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = HasherPool(
+                settings.PASSWORD_VERIFY_POOL,
+                settings.PASSWORD_VERIFY_WORKERS,
+                settings.PASSWORD_VERIFY_MAX_QUEUE,
+                settings.PASSWORD_VERIFY_TIMEOUT,
+            )
+        return _pool
+
+
+def run_hasher(func, *args):
+    """Return func(*args), on the hasher pool if one is configured"""
+    pool = get_pool()
+    if pool is None:
+        return func(*args)
+    return pool.run(func, *args)
+
+
+class PooledModelBackend(ModelBackend):
+    """ModelBackend hashing passwords on the pool of user.backends
+
+    Outdated hashes are upgraded on a successful login just like
+    AbstractBaseUser.check_password does, with the new hash computed on
+    the pool as well. When the pool is full, callers passing
+    reject_when_busy=True get HasherBusy to turn the login away; other
+    callers, such as the admin login form, hash in their own thread.
+    """
+
+    def hash(self, reject_when_busy, func, *args):
+        """Return func(*args) run on the pool, or inline if it is full"""
+        try:
+            return run_hasher(func, *args)
+        except HasherBusy:
+            if reject_when_busy:
+                raise
+            return func(*args)
+
+    def authenticate(self, request, username=None, password=None,
+                     reject_when_busy=False, **kwargs):
+        user_model = get_user_model()
+        if username is None:
+            username = kwargs.get(user_model.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = user_model._default_manager.get_by_natural_key(username)
+        except user_model.DoesNotExist:
+            # Hash anyway so unknown users take as long as known ones
+            self.hash(reject_when_busy, make_password, password)
+            return None
+
+        correct, rehashed = self.hash(
+            reject_when_busy, verify, password, user.password
+        )
+        if not correct or not self.user_can_authenticate(user):
+            return None
+        if rehashed:
+            user.password = rehashed
+            user.save(update_fields=['password'])
+
+        return user
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, register
+from django.utils.module_loading import import_string
+
+
+@register()
+def check_token_cache(app_configs, **kwargs):
+    """Refuse to cache token lookups in a per-process cache
+
+    Deleted tokens and deactivated users are only forgotten in the cache
+    of the process that saw the change, so other app processes would
+    keep authenticating them until their entries expire.
+    """
+    alias = settings.AUTH_TOKEN_CACHE_ALIAS
+    if not alias:
+        return []
+    if alias not in settings.CACHES:
+        return [Error(
+            f'AUTH_TOKEN_CACHE_ALIAS names the unknown cache {alias!r}.',
+            id='user.E001',
+        )]
+    backend = import_string(settings.CACHES[alias]['BACKEND'])
+    if issubclass(backend, LocMemCache):
+        return [Error(
+            f'AUTH_TOKEN_CACHE_ALIAS {alias!r} is a per-process cache.',
+            hint='Use a cache shared by every app process, such as '
+                 'memcached, or unset AUTH_TOKEN_CACHE_ALIAS.',
+            id='user.E001',
+        )]
+    return []
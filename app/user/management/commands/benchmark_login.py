@@ -0,0 +1,53 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.hashers import get_hasher, make_password
+from django.core.management.base import BaseCommand
+from user.backends import HasherPool, verify
+
+
+class Command(BaseCommand):
+    """Django command to measure password checks per second per core"""
+    help = 'Time concurrent logins hashing inline and on hasher pools'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=40)
+        parser.add_argument('--concurrency', type=int, default=8)
+
+    def handle(self, *args, **options):
+        cores = os.cpu_count() or 1
+        logins = options['logins']
+        concurrency = options['concurrency']
+        encoded = make_password('benchPassword')
+        self.stdout.write(
+            f'{get_hasher().algorithm}, {cores} cores, '
+            f'{concurrency} concurrent logins'
+        )
+
+        for kind in ('inline', 'thread', 'process'):
+            pool = None if kind == 'inline' else HasherPool(
+                kind, cores, max_queue=concurrency, timeout=None
+            )
+
+            def login(_):
+                if pool is None:
+                    return verify('benchPassword', encoded)
+                return pool.run(verify, 'benchPassword', encoded)
+
+            try:
+                login(None)
+                start = time.perf_counter()
+                with ThreadPoolExecutor(concurrency) as clients:
+                    results = list(clients.map(login, range(logins)))
+                elapsed = time.perf_counter() - start
+            finally:
+                if pool is not None:
+                    pool.shutdown()
+
+            if not all(correct for correct, _ in results):
+                self.stderr.write(f'{kind}: a login failed')
+            rate = logins / elapsed
+            self.stdout.write(
+                f'{kind}: {rate:.1f} logins/s, {rate / cores:.1f} per core'
+            )
@@ -0,0 +1,42 @@
+from core.benchmark import rolled_back, timed
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIRequestFactory
+from user.provisioning import provision_users
+from user.views import CreateUserView
+
+
+class Command(BaseCommand):
+    """Django command to compare signups one by one and in bulk"""
+    help = 'Time creating users through the signup API and provisioning'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--batch-size', type=int, default=100)
+
+    def handle(self, *args, **options):
+        count = options['users']
+        results = []
+        with rolled_back():
+            view = CreateUserView.as_view()
+            factory = APIRequestFactory()
+            with timed(results, 'signup API'):
+                for i in range(count):
+                    view(factory.post('/', {
+                        'email': f'signup{i}@test.com',
+                        'name': f'User {i}',
+                        'password': 'benchPassword',
+                    }))
+
+        with rolled_back():
+            with timed(results, 'provisioning'):
+                provision_users((
+                    {'email': f'bulk{i}@test.com', 'name': f'User {i}',
+                     'password': 'benchPassword'}
+                    for i in range(count)
+                ), options['batch_size'])
+
+        for label, seconds in results:
+            self.stdout.write(
+                f'{label}: {count} users in {seconds:.2f} s, '
+                f'{count / seconds:.1f} users/s'
+            )
@@ -0,0 +1,50 @@
+import csv
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from user.provisioning import PROVISION_BATCH_SIZE, PROVISION_FIELDS, \
+    provision_users
+
+
+class Command(BaseCommand):
+    """Django command to create many users at once from a CSV file"""
+    help = (
+        'Create users from a CSV file with email, name and password '
+        'columns ("-" reads stdin); existing emails and invalid rows are '
+        'skipped'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument(
+            '--batch-size', type=int, default=PROVISION_BATCH_SIZE
+        )
+        parser.add_argument('--workers', type=int)
+
+    def handle(self, *args, **options):
+        if options['path'] == '-':
+            return self.provision(sys.stdin, options)
+        try:
+            with open(options['path'], newline='') as source:
+                return self.provision(source, options)
+        except OSError as exc:
+            raise CommandError(exc)
+
+    def provision(self, source, options):
+        reader = csv.DictReader(source)
+        unknown = sorted(set(reader.fieldnames or ()) - set(PROVISION_FIELDS))
+        if unknown:
+            raise CommandError(f'Unknown columns: {", ".join(unknown)}')
+        rows = (
+            {key: value for key, value in row.items() if value}
+            for row in reader
+        )
+        errors = []
+        created, skipped = provision_users(
+            rows, options['batch_size'], options['workers'], errors
+        )
+
+        for index, exc in errors:
+            # Line 1 is the header
+            self.stderr.write(f'Line {index + 2}: {" ".join(exc.messages)}')
+        self.stdout.write(f'Created {created} users, skipped {skipped}')
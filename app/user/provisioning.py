@@ -0,0 +1,113 @@
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models.signals import post_save
+from user.serializers import UserSerializer
+
+# Users hashed and inserted together by provision_users
+PROVISION_BATCH_SIZE = 500
+# Columns a provisioning row may have
+PROVISION_FIELDS = ('email', 'name', 'password')
+
+
+def clean_row(row):
+    """Return a row with a normalized email, or raise ValidationError
+
+    Rows are held to the rules of signing up: a valid email, a name that
+    fits and a password at least as long as UserSerializer requires.
+    """
+    unknown = sorted(set(row) - set(PROVISION_FIELDS))
+    if unknown:
+        raise ValidationError(f'Unknown columns: {", ".join(unknown)}')
+    model = get_user_model()
+    row = dict(row)
+    row['email'] = model.objects.normalize_email(row.get('email'))
+    for name in ('email', 'name'):
+        if name in row:
+            field = model._meta.get_field(name)
+            row[name] = field.clean(row[name], None)
+    min_length = UserSerializer.Meta.extra_kwargs['password']['min_length']
+    if len(row.get('password', ' ' * min_length)) < min_length:
+        raise ValidationError(
+            f'Ensure the password has at least {min_length} characters.'
+        )
+    return row
+
+
+def send_created(users):
+    """Send post_save for users inserted by bulk_create
+
+    bulk_create sends no signals and only sets primary keys on backends
+    returning them from a bulk insert, so the others are looked up.
+    """
+    manager = get_user_model().objects
+    missing = [user.email for user in users if user.pk is None]
+    if missing:
+        pks = dict(manager.filter(
+            email__in=missing
+        ).values_list('email', 'pk'))
+        for user in users:
+            if user.pk is None:
+                user.pk = pks[user.email]
+    for user in users:
+        post_save.send(
+            sender=manager.model, instance=user, created=True,
+            update_fields=None, raw=False, using=user._state.db
+        )
+
+
+def provision_users(rows, batch_size=PROVISION_BATCH_SIZE, workers=None,
+                    errors=None):
+    """Create users from dicts of create_user arguments, in batches
+
+    The passwords of a batch are hashed concurrently, as Django's hashers
+    release the GIL, and the batch is written with a single insert. Users
+    whose email is already taken are skipped, and users without a password
+    get an unusable one. Invalid rows (see clean_row) are skipped too, and
+    their (index, ValidationError) pairs appended to errors when given.
+    Returns the numbers of created and skipped users.
+    """
+    manager = get_user_model().objects
+    rows = enumerate(rows)
+    created = skipped = 0
+    workers = workers or settings.PASSWORD_VERIFY_WORKERS
+    with ThreadPoolExecutor(workers, thread_name_prefix='hasher') as pool:
+        while True:
+            batch = list(itertools.islice(rows, batch_size))
+            if not batch:
+                break
+
+            fields = {}
+            for index, row in batch:
+                try:
+                    row = clean_row(row)
+                except ValidationError as exc:
+                    if errors is not None:
+                        errors.append((index, exc))
+                    continue
+                fields.setdefault(row['email'], row)
+            taken = set(manager.filter(
+                email__in=list(fields)
+            ).values_list('email', flat=True))
+            new = [row for email, row in fields.items() if email not in taken]
+            skipped += len(batch) - len(new)
+
+            passwords = pool.map(
+                make_password, [row.pop('password', None) for row in new]
+            )
+            users = []
+            for row, password in zip(new, passwords):
+                user = manager.make_user(**row)
+                user.password = password
+                users.append(user)
+            with transaction.atomic():
+                manager.bulk_create(users)
+            send_created(users)
+            created += len(users)
+
+    return created, skipped
@@ -1,6 +1,18 @@
 from django.contrib.auth import get_user_model, authenticate
 from django.utils.translation import ugettext_lazy as _
-from rest_framework import serializers
+from rest_framework import serializers, status
+from rest_framework.exceptions import APIException
+
+from user.backends import HasherBusy
+
+
+class LoginsBusy(APIException):
+    """Raised when a token login finds the hasher pool full"""
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Too many logins in progress, try again shortly.'
+    default_code = 'hasher_busy'
+    # Sent as Retry-After by DRF's exception handler
+    wait = 1
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -20,13 +32,10 @@ class UserSerializer(serializers.ModelSerializer):
     def update(self, instance, validated_data):
         """Update a user, setting the password and return it"""
         password = validated_data.pop('password', None)
-        user = super().update(instance, validated_data)
-
         if password:
-            user.set_password(password)
-            user.save()
+            instance.set_password(password)
 
-        return user
+        return super().update(instance, validated_data)
 
 
 class AuthTokenSerializer(serializers.Serializer):
@@ -42,11 +51,15 @@ class AuthTokenSerializer(serializers.Serializer):
         email = attrs.get('email')
         password = attrs.get('password')
 
-        user = authenticate(
-            request=self.context.get('request'),
-            username=email,
-            password=password
-        )
+        try:
+            user = authenticate(
+                request=self.context.get('request'),
+                username=email,
+                password=password,
+                reject_when_busy=True
+            )
+        except HasherBusy:
+            raise LoginsBusy()
         if not user:
             msg = _('Unable to authenticate with provided credentials')
             raise serializers.ValidationError(msg, code='authentication')
@@ -0,0 +1,20 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+from user.authentication import forget_tokens
+
+
+@receiver(post_delete, sender=Token)
+def forget_deleted_token(sender, instance, **kwargs):
+    """Stop authenticating with a deleted token"""
+    forget_tokens(instance.key)
+
+
+@receiver(post_save, sender=get_user_model())
+def forget_user_tokens(sender, instance, created, **kwargs):
+    """Reload the user on the next request after any change to them"""
+    if not created:
+        forget_tokens(*Token.objects.filter(
+            user=instance
+        ).values_list('key', flat=True))
@@ -0,0 +1,111 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.checks import run_checks
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+ME_URL = reverse('user:me')
+# Stands in for a shared backend; tests run in a single process
+TOKEN_CACHES = dict(settings.CACHES, auth={
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    'LOCATION': 'auth',
+})
+
+
+def create_user(**params):
+    return get_user_model().objects.create_user(**params)
+
+
+@override_settings(CACHES=TOKEN_CACHES, AUTH_TOKEN_CACHE_ALIAS='auth')
+class CachedTokenAuthenticationTests(TestCase):
+    """Test the cached token authentication"""
+
+    def setUp(self):
+        self.user = create_user(
+            email='test@test.com',
+            password='testPassword',
+            name='Test User'
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_token_lookup_cached(self):
+        """Test repeated requests do not query the token table"""
+        self.client.get(ME_URL)
+
+        with self.assertNumQueries(1):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    @override_settings(AUTH_TOKEN_CACHE_ALIAS=None)
+    def test_token_lookup_uncached_by_default(self):
+        """Test tokens are looked up every time without a shared cache"""
+        self.client.get(ME_URL)
+
+        with self.assertNumQueries(2):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_per_process_cache_rejected(self):
+        """Test the system check refuses a LocMemCache for tokens"""
+        errors = [error.id for error in run_checks()]
+
+        self.assertIn('user.E001', errors)
+
+    def test_stale_cached_user_not_saved(self):
+        """Test a profile update does not write back a stale cached user"""
+        self.client.get(ME_URL)
+        # Changed by another process, whose signals do not reach this cache
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            is_staff=True, is_active=False
+        )
+
+        res = self.client.patch(ME_URL, {'name': 'New Name'})
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.name, 'Test User')
+        self.assertTrue(self.user.is_staff)
+        self.assertFalse(self.user.is_active)
+
+    def test_invalid_token_rejected(self):
+        """Test an unknown token is not authenticated"""
+        self.client.credentials(HTTP_AUTHORIZATION='Token invalid')
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_token_rejected(self):
+        """Test a deleted token stops working despite the cache"""
+        self.client.get(ME_URL)
+
+        self.token.delete()
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_rejected(self):
+        """Test a deactivated user stops authenticating despite the cache"""
+        self.client.get(ME_URL)
+
+        self.user.is_active = False
+        self.user.save()
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_profile_update_reloads_user(self):
+        """Test edits through the me endpoint are seen by later requests"""
+        self.client.get(ME_URL)
+
+        self.client.patch(ME_URL, {'name': 'New Name'})
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data['name'], 'New Name')
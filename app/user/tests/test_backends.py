@@ -0,0 +1,127 @@
+import contextlib
+import threading
+from unittest.mock import patch
+
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.hashers import make_password
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from user import backends
+
+TOKEN_URL = reverse('user:token')
+
+
+def create_user(**params):
+    return get_user_model().objects.create_user(**params)
+
+
+@override_settings(PASSWORD_PBKDF2_ITERATIONS=1000)
+class PooledModelBackendTests(TestCase):
+    """Test logins hashing passwords on the hasher pool"""
+
+    def setUp(self):
+        self.user = create_user(
+            email='test@test.com', password='testPassword'
+        )
+
+    def login(self, password='testPassword'):
+        return authenticate(username='test@test.com', password=password)
+
+    def test_login(self):
+        """Test valid credentials authenticate the user"""
+        self.assertEqual(self.login(), self.user)
+        self.assertIsNone(self.login('wrongPassword'))
+        self.assertIsNone(authenticate(
+            username='nobody@test.com', password='testPassword'
+        ))
+
+    @override_settings(PASSWORD_VERIFY_POOL='inline')
+    def test_login_inline(self):
+        """Test passwords are checked in the request thread when asked"""
+        with patch.object(backends, 'HasherPool') as pool:
+            self.assertEqual(self.login(), self.user)
+
+        pool.assert_not_called()
+
+    def test_rehash_when_cost_changes(self):
+        """Test a login upgrades a hash made with another cost"""
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=2000):
+            self.login()
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.password.split('$')[1], '2000')
+        self.assertTrue(self.user.check_password('testPassword'))
+
+    def test_rehash_when_hasher_changes(self):
+        """Test a login replaces a hash made by another hasher"""
+        self.user.password = make_password(
+            'testPassword', hasher='pbkdf2_sha1'
+        )
+        self.user.save()
+
+        self.assertEqual(self.login(), self.user)
+
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$1000$'))
+
+    def test_no_rehash_on_failed_login(self):
+        """Test a wrong password leaves an outdated hash alone"""
+        password = self.user.password
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=2000):
+            self.login('wrongPassword')
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.password, password)
+
+    @contextlib.contextmanager
+    def full_pool(self):
+        """Patch in a hasher pool whose only slot is taken"""
+        pool = backends.HasherPool(workers=1, max_queue=0, timeout=0)
+        self.addCleanup(pool.shutdown)
+        release = threading.Event()
+        started = threading.Event()
+
+        def block():
+            started.set()
+            release.wait()
+
+        waiting = threading.Thread(target=pool.run, args=(block,))
+        waiting.start()
+        started.wait()
+        try:
+            with patch.object(backends, 'get_pool', return_value=pool):
+                yield
+        finally:
+            release.set()
+            waiting.join()
+
+    def test_busy_pool_answers_503(self):
+        """Test token logins are turned away once the pool is full"""
+        with self.full_pool():
+            res = APIClient().post(TOKEN_URL, {
+                'email': 'test@test.com', 'password': 'testPassword'
+            })
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(res['Retry-After'], '1')
+
+    def test_busy_pool_other_logins_inline(self):
+        """Test logins outside the API hash inline when the pool is full"""
+        with self.full_pool():
+            self.assertEqual(self.login(), self.user)
+            self.assertIsNone(self.login('wrongPassword'))
+            self.assertTrue(self.client.login(
+                username='test@test.com', password='testPassword'
+            ))
+
+    def test_process_pool(self):
+        """Test passwords can be checked in worker processes"""
+        pool = backends.HasherPool('process', workers=1)
+        self.addCleanup(pool.shutdown)
+
+        self.assertEqual(
+            pool.run(backends.verify, 'testPassword', self.user.password),
+            (True, None)
+        )
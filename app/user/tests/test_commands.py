@@ -0,0 +1,95 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+
+
+class UserCommandTests(TestCase):
+
+    @override_settings(PASSWORD_PBKDF2_ITERATIONS=100)
+    def test_benchmark_login(self):
+        """Test the login benchmark reports every way of hashing"""
+        out, err = StringIO(), StringIO()
+        call_command(
+            'benchmark_login', logins=4, concurrency=2, stdout=out,
+            stderr=err
+        )
+
+        output = out.getvalue()
+        for label in ('inline:', 'thread:', 'process:'):
+            self.assertIn(label, output)
+        self.assertEqual(err.getvalue(), '')
+
+    @override_settings(PASSWORD_PBKDF2_ITERATIONS=100)
+    def test_provision_users(self):
+        """Test users are created from the rows of a CSV file"""
+        with tempfile.NamedTemporaryFile('w', suffix='.csv') as source:
+            source.write(
+                'email,name,password\n'
+                'a@test.com,Ann,secretPassword\n'
+                'b@test.com,,\n'
+            )
+            source.flush()
+            out = StringIO()
+            call_command('provision_users', source.name, stdout=out)
+
+        self.assertIn('Created 2 users, skipped 0', out.getvalue())
+        users = get_user_model().objects.order_by('email')
+        self.assertEqual(
+            [(user.email, user.name) for user in users],
+            [('a@test.com', 'Ann'), ('b@test.com', '')]
+        )
+        self.assertTrue(users[0].check_password('secretPassword'))
+
+    @override_settings(PASSWORD_PBKDF2_ITERATIONS=100)
+    def test_provision_users_invalid_rows(self):
+        """Test invalid rows are skipped and reported by line"""
+        with tempfile.NamedTemporaryFile('w', suffix='.csv') as source:
+            source.write(
+                'email,name,password\n'
+                'not-an-email,Ann,secretPassword\n'
+                'b@test.com,Bob,x\n'
+                'c@test.com,Cat,secretPassword\n'
+            )
+            source.flush()
+            out, err = StringIO(), StringIO()
+            call_command(
+                'provision_users', source.name, stdout=out, stderr=err
+            )
+
+        self.assertIn('Created 1 users, skipped 2', out.getvalue())
+        self.assertIn('Line 2:', err.getvalue())
+        self.assertIn('Line 3:', err.getvalue())
+        self.assertEqual(get_user_model().objects.get().email, 'c@test.com')
+
+    def test_provision_users_unknown_column(self):
+        """Test unknown columns are rejected before any user is created"""
+        with tempfile.NamedTemporaryFile('w', suffix='.csv') as source:
+            source.write('email,phone\na@test.com,555\n')
+            source.flush()
+            with self.assertRaisesRegex(CommandError, 'phone'):
+                call_command('provision_users', source.name)
+
+        self.assertFalse(get_user_model().objects.exists())
+
+    def test_provision_users_missing_file(self):
+        """Test a missing file is reported"""
+        with self.assertRaises(CommandError):
+            call_command(
+                'provision_users', os.path.join(tempfile.gettempdir(), 'no')
+            )
+
+    @override_settings(PASSWORD_PBKDF2_ITERATIONS=100)
+    def test_benchmark_signup(self):
+        """Test the signup benchmark reports both ways of creating users"""
+        out = StringIO()
+        call_command('benchmark_signup', users=3, batch_size=2, stdout=out)
+
+        output = out.getvalue()
+        for label in ('signup API:', 'provisioning:'):
+            self.assertIn(label, output)
+        self.assertFalse(get_user_model().objects.exists())
@@ -0,0 +1,82 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models.signals import post_save
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from user.provisioning import provision_users
+
+
+@override_settings(PASSWORD_PBKDF2_ITERATIONS=1000)
+class ProvisionUsersTests(TestCase):
+    """Test creating users in bulk"""
+
+    def test_provision_users(self):
+        """Test each batch is written with one insert"""
+        rows = [
+            {'email': f'user{i}@TEST.com', 'name': f'User {i}',
+             'password': f'password{i}'}
+            for i in range(5)
+        ]
+
+        with CaptureQueriesContext(connection) as ctx:
+            created, skipped = provision_users(rows, batch_size=2)
+
+        self.assertEqual((created, skipped), (5, 0))
+        inserts = [
+            query for query in ctx.captured_queries
+            if query['sql'].startswith('INSERT')
+        ]
+        self.assertEqual(len(inserts), 3)
+        user = get_user_model().objects.get(email='user3@test.com')
+        self.assertEqual(user.name, 'User 3')
+        self.assertTrue(user.check_password('password3'))
+
+    def test_provision_users_skips_taken_emails(self):
+        """Test existing and repeated emails are skipped"""
+        get_user_model().objects.create_user('taken@test.com', 'password')
+
+        created, skipped = provision_users([
+            {'email': 'taken@test.com', 'password': 'otherPassword'},
+            {'email': 'new@test.com'},
+            {'email': 'new@test.com', 'password': 'againPassword'},
+        ])
+
+        self.assertEqual((created, skipped), (1, 2))
+        user = get_user_model().objects.get(email='new@test.com')
+        self.assertFalse(user.has_usable_password())
+
+    def test_provision_users_skips_invalid_rows(self):
+        """Test rows signing up would reject are skipped and reported"""
+        errors = []
+
+        created, skipped = provision_users([
+            {'name': 'Nobody'},
+            {'email': 'not-an-email', 'password': 'password'},
+            {'email': 'short@test.com', 'password': 'x'},
+            {'email': 'phone@test.com', 'phone': '555'},
+            {'email': 'valid@test.com', 'password': 'password'},
+        ], errors=errors)
+
+        self.assertEqual((created, skipped), (1, 4))
+        self.assertEqual([index for index, exc in errors], [0, 1, 2, 3])
+        self.assertEqual(
+            list(get_user_model().objects.values_list('email', flat=True)),
+            ['valid@test.com']
+        )
+
+    def test_provision_users_sends_post_save(self):
+        """Test created users get the signal bulk_create does not send"""
+        handler = mock.Mock()
+        post_save.connect(handler, sender=get_user_model())
+        self.addCleanup(post_save.disconnect, handler,
+                        sender=get_user_model())
+
+        provision_users([{'email': 'new@test.com'}])
+
+        user = get_user_model().objects.get()
+        handler.assert_called_once()
+        kwargs = handler.call_args[1]
+        self.assertEqual(kwargs['instance'].pk, user.pk)
+        self.assertTrue(kwargs['created'])
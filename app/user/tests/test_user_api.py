@@ -1,5 +1,7 @@
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
@@ -152,10 +154,16 @@ class PrivateUserApiTest(TestCase):
             'name': 'newName',
             'password': 'testNewPassword'
         }
-        res = self.client.patch(ME_URL, payload)
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.patch(ME_URL, payload)
         self.user.refresh_from_db()
 
         self.assertEqual(self.user.name, payload['name'])
         self.assertTrue(self.user.check_password(payload['password']))
+        updates = [
+            query for query in ctx.captured_queries
+            if query['sql'].startswith('UPDATE "core_user"')
+        ]
+        self.assertEqual(len(updates), 1)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
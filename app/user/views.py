@@ -1,7 +1,11 @@
-from rest_framework import generics, authentication, permissions
+from core.db.replicas import ReplicaReadMixin
+from django.contrib.auth import get_user_model
+from django.utils.translation import ugettext_lazy as _
+from rest_framework import exceptions, generics, permissions
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.settings import api_settings
 
+from user.authentication import CachedTokenAuthentication
 from user.serializers import UserSerializer, AuthTokenSerializer
 
 
@@ -18,12 +22,23 @@ class CreateTokenView(ObtainAuthToken):
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
 
 
-class ManageUserView(generics.RetrieveUpdateAPIView):
+class ManageUserView(ReplicaReadMixin, generics.RetrieveUpdateAPIView):
     """Manage autheticated user"""
     serializer_class = UserSerializer
-    authentication_classes = (authentication.TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (permissions.IsAuthenticated,)
 
     def get_object(self):
-        """Retreive and return autheticated user"""
-        return self.request.user
+        """Retreive and return autheticated user
+
+        The user is read again as request.user may come from the token
+        cache, and saving a stale copy would undo changes made since.
+        """
+        user = get_user_model().objects.filter(
+            pk=self.request.user.pk, is_active=True
+        ).first()
+        if user is None:
+            raise exceptions.AuthenticationFailed(
+                _('User inactive or deleted.')
+            )
+        return user